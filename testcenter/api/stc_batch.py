@@ -0,0 +1,91 @@
+"""
+Write batching and configuration changes tracking for STC API wrappers.
+"""
+import re
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Commands that do not change the configuration, performing them does not bump the API generation.
+READ_ONLY_COMMANDS = {
+    "expandresultviewdata",
+    "refreshresultview",
+    "resultssubscribe",
+    "resultdatasetsubscribe",
+    "resultdatasetunsubscribe",
+    "saveasxml",
+    "savetotcc",
+    "updatedynamicresultview",
+}
+
+# Results objects types, in addition to all types that end with "results" (GeneratorPortResults, TxStreamResults...).
+RESULTS_TYPES = ("resultdataset", "resultviewdata", "dynamicresultview", "presentationresultquery")
+
+
+def is_read_only_command(command: str) -> bool:
+    """Return True if the command does not change the configuration.
+
+    :param command: command name, with or without the Command suffix.
+    """
+    command = command.lower()
+    return command in READ_ONLY_COMMANDS or (command.endswith("command") and command[: -len("command")] in READ_ONLY_COMMANDS)
+
+
+def is_results_object(obj_ref: str) -> bool:
+    """Return True if the object is results object, results objects values change without configuration changes and
+    configuring them (e.g. ResultDataSet PageNumber) does not bump the API generation.
+
+    :param obj_ref: object reference.
+    """
+    obj_type = re.sub(r"\d+$", "", obj_ref.lower())
+    return obj_type in RESULTS_TYPES or obj_type.endswith("results")
+
+
+class StcConfigBatch:
+    """Coalesce config writes and apply requests of API wrapper.
+
+    While the batch is attached to the wrapper (api.batch), config calls are buffered and merged per object and apply
+    calls are deferred. Pending writes are sent, one config call per object, when:
+    - the batch is closed (see StcProject.batch).
+    - an object with pending writes is read - only the writes of this object are sent.
+    - a command is performed, an object is deleted or multiple objects are read - all pending writes are sent.
+    """
+
+    def __init__(self, api: object) -> None:
+        """Create empty batch.
+
+        :param api: API wrapper (StcRestWrapper or StcTclWrapper).
+        """
+        self.api = api
+        self.pending: Dict[str, Dict[str, object]] = OrderedDict()
+        self.apply_requested = False
+        self.writes = 0
+        self.configs = 0
+
+    def config(self, obj_ref: str, **attributes: object) -> None:
+        """Buffer object attributes, later values of the same attribute override earlier values.
+
+        :param obj_ref: object reference.
+        :param attributes: dictionary of {attributes: values} to configure.
+        """
+        self.pending.setdefault(obj_ref, {}).update(attributes)
+        self.writes += 1
+
+    def flush(self, obj_ref: Optional[str] = None) -> None:
+        """Send pending writes.
+
+        :param obj_ref: send pending writes of this object only, if None send all pending writes.
+        """
+        if obj_ref is not None and obj_ref not in self.pending:
+            return
+        obj_refs = [obj_ref] if obj_ref is not None else list(self.pending)
+        # Detach the batch so the wrapper sends the config calls instead of buffering them, then restore whatever was
+        # attached before so a batch that was already closed is not re-attached.
+        attached = self.api.batch
+        self.api.batch = None
+        try:
+            for ref in obj_refs:
+                self.api.config(ref, **self.pending[ref])
+                del self.pending[ref]
+                self.configs += 1
+        finally:
+            self.api.batch = attached
@@ -0,0 +1,331 @@
+"""
+Per call latency instrumentation of STC API wrappers.
+"""
+import functools
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Latency histogram buckets upper bounds, in seconds.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+INSTRUMENTED_METHODS = (
+    "apply",
+    "config",
+    "create",
+    "create_objects",
+    "delete",
+    "get",
+    "get_list",
+    "get_objects",
+    "perform",
+    "subscribe",
+    "unsubscribe",
+    "wait",
+)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_handle_index = re.compile(r"\d+$")
+
+
+def obj_type_of(obj_ref: str) -> str:
+    """Return object type from object reference (port1 -> port).
+
+    :param obj_ref: object reference.
+    """
+    return _handle_index.sub("", obj_ref)
+
+
+def payload_size(data: object) -> int:
+    """Return the approximate number of characters of API call arguments or result.
+
+    :param data: str, list, tuple or dict of arguments or result, nested up to one level.
+    """
+    if isinstance(data, str):
+        return len(data)
+    if isinstance(data, dict):
+        return sum(len(str(k)) + len(str(v)) for k, v in data.items())
+    if isinstance(data, (list, tuple)):
+        return sum(len(e) if isinstance(e, str) else payload_size(e) if isinstance(e, dict) else len(str(e)) for e in data)
+    return 0 if data is None else len(str(data))
+
+
+class StcCallStats:
+    """Aggregated statistics of API calls with the same method, object type and target (attribute or command)."""
+
+    __slots__ = ("count", "errors", "total_time", "max_time", "sent", "received", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.sent = 0
+        self.received = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, elapsed: float, sent: int, received: int, error: bool) -> None:
+        self.count += 1
+        self.errors += error
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.sent += sent
+        self.received += received
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def percentile(self, percent: float) -> float:
+        """Return upper bound of the histogram bucket that contains the requested percentile.
+
+        :param percent: requested percentile, 0-100.
+        """
+        rank = self.count * percent / 100
+        accumulated = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            accumulated += count
+            if accumulated >= rank:
+                return bound
+        return self.max_time
+
+
+class StcApiInstrumentation:
+    """Record latency and payload size of every API wrapper call.
+
+    The instrumentation wraps the public methods of one StcRestWrapper or StcTclWrapper and aggregates the calls by
+    (method, object type, attribute or command) into latency histograms and by the calling testcenter method
+    (e.g. StcPort.get_inventory). Calls are aggregated on the fly, nothing is stored per call, so it can be left on.
+
+    Usage:
+        instrumentation = StcApiInstrumentation(stc.api)
+        ...
+        print(instrumentation.report())
+        instrumentation.serve(9464)  # OpenMetrics endpoint, http://host:9464/metrics
+    """
+
+    def __init__(self, api: object, callers: bool = True) -> None:
+        """Install the instrumentation on the API wrapper (api.instrumentation).
+
+        :param api: API wrapper (StcRestWrapper or StcTclWrapper).
+        :param callers: True - attribute time to the calling testcenter methods, False - skip stack inspection.
+        """
+        self.api = api
+        self.callers = callers
+        self.calls: Dict[Tuple[str, str, str], StcCallStats] = {}
+        self.caller_calls: Dict[str, StcCallStats] = {}
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        for method in INSTRUMENTED_METHODS:
+            if hasattr(api, method):
+                setattr(api, method, self._instrument(method, getattr(api, method)))
+        api.instrumentation = self
+
+    def uninstall(self) -> None:
+        """Remove the instrumentation from the API wrapper and stop the OpenMetrics endpoint."""
+        for method in INSTRUMENTED_METHODS:
+            self.api.__dict__.pop(method, None)
+        self.api.instrumentation = None
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def reset(self) -> None:
+        """Clear all statistics."""
+        with self._lock:
+            self.calls = {}
+            self.caller_calls = {}
+
+    def record(self, method: str, obj_type: str, target: str, elapsed: float, sent: int, received: int, error: bool) -> None:
+        """Add one call to the statistics.
+
+        :param method: API method.
+        :param obj_type: type of the object the call refers to.
+        :param target: attribute or command.
+        :param elapsed: call latency in seconds.
+        :param sent: size of call arguments.
+        :param received: size of call result.
+        :param error: True if the call raised exception.
+        """
+        caller = self._caller() if self.callers else None
+        with self._lock:
+            key = (method, obj_type, target)
+            if key not in self.calls:
+                self.calls[key] = StcCallStats()
+            self.calls[key].add(elapsed, sent, received, error)
+            if caller:
+                if caller not in self.caller_calls:
+                    self.caller_calls[caller] = StcCallStats()
+                self.caller_calls[caller].add(elapsed, sent, received, error)
+
+    def statistics(self) -> List[Dict[str, object]]:
+        """Return statistics per (method, object type, target), sorted by total time."""
+        with self._lock:
+            calls = sorted(self.calls.items(), key=lambda item: -item[1].total_time)
+            return [
+                {
+                    "method": method,
+                    "obj_type": obj_type,
+                    "target": target,
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "total_time": stats.total_time,
+                    "average_time": stats.total_time / stats.count,
+                    "p50_time": stats.percentile(50),
+                    "p99_time": stats.percentile(99),
+                    "max_time": stats.max_time,
+                    "sent": stats.sent,
+                    "received": stats.received,
+                }
+                for (method, obj_type, target), stats in calls
+            ]
+
+    def report(self, top: int = 20) -> str:
+        """Return text report of the calls and the callers with the highest total time.
+
+        :param top: number of rows in each table.
+        """
+        with self._lock:
+            calls = sorted(self.calls.items(), key=lambda item: -item[1].total_time)[:top]
+            callers = sorted(self.caller_calls.items(), key=lambda item: -item[1].total_time)[:top]
+        lines = [f"{'call':<56} {'count':>8} {'total':>9} {'avg':>9} {'p99<=':>9} {'max':>9} {'sent':>10} {'received':>10}"]
+        for (method, obj_type, target), stats in calls:
+            name = f"{method} {obj_type} {target}".strip()
+            lines.append(
+                f"{name[:56]:<56} {stats.count:>8} {stats.total_time:>9.4f} {stats.total_time / stats.count:>9.4f} "
+                f"{stats.percentile(99):>9.4f} {stats.max_time:>9.4f} {stats.sent:>10} {stats.received:>10}"
+            )
+        if callers:
+            lines.append("")
+            lines.append(f"{'caller':<56} {'count':>8} {'total':>9} {'avg':>9}")
+            for caller, stats in callers:
+                lines.append(
+                    f"{caller[:56]:<56} {stats.count:>8} {stats.total_time:>9.4f} {stats.total_time / stats.count:>9.4f}"
+                )
+        return "\n".join(lines)
+
+    def openmetrics(self) -> str:
+        """Return the statistics in OpenMetrics text format."""
+        lines = [
+            "# TYPE stc_api_call_seconds histogram",
+            "# UNIT stc_api_call_seconds seconds",
+            "# HELP stc_api_call_seconds STC API calls latency.",
+        ]
+        with self._lock:
+            calls = list(self.calls.items())
+            callers = list(self.caller_calls.items())
+            for (method, obj_type, target), stats in calls:
+                labels = f'method="{method}",obj_type="{_escape(obj_type)}",target="{_escape(target)}"'
+                accumulated = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                    accumulated += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'stc_api_call_seconds_bucket{{{labels},le="{le}"}} {accumulated}')
+                lines.append(f"stc_api_call_seconds_count{{{labels}}} {stats.count}")
+                lines.append(f"stc_api_call_seconds_sum{{{labels}}} {stats.total_time}")
+            lines.append("# TYPE stc_api_call_errors counter")
+            lines.append("# HELP stc_api_call_errors STC API calls that raised exception.")
+            for (method, obj_type, target), stats in calls:
+                labels = f'method="{method}",obj_type="{_escape(obj_type)}",target="{_escape(target)}"'
+                lines.append(f"stc_api_call_errors_total{{{labels}}} {stats.errors}")
+            lines.append("# TYPE stc_api_payload_bytes counter")
+            lines.append("# UNIT stc_api_payload_bytes bytes")
+            lines.append("# HELP stc_api_payload_bytes STC API calls arguments (sent) and results (received) size.")
+            for (method, obj_type, target), stats in calls:
+                labels = f'method="{method}",obj_type="{_escape(obj_type)}",target="{_escape(target)}"'
+                lines.append(f'stc_api_payload_bytes_total{{{labels},direction="sent"}} {stats.sent}')
+                lines.append(f'stc_api_payload_bytes_total{{{labels},direction="received"}} {stats.received}')
+            lines.append("# TYPE stc_api_caller_seconds counter")
+            lines.append("# UNIT stc_api_caller_seconds seconds")
+            lines.append("# HELP stc_api_caller_seconds STC API calls time by calling testcenter method.")
+            for caller, stats in callers:
+                lines.append(f'stc_api_caller_seconds_total{{caller="{_escape(caller)}"}} {stats.total_time}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "") -> ThreadingHTTPServer:
+        """Start OpenMetrics endpoint (any path) on daemon thread.
+
+        :param port: TCP port, 0 - any free port.
+        :param host: interface to listen on, empty - all interfaces.
+        """
+        instrumentation = self
+
+        class OpenMetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, *_: object) -> None:
+                pass
+
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                body = instrumentation.openmetrics().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), OpenMetricsHandler)
+        threading.Thread(target=self.server.serve_forever, name="StcOpenMetrics", daemon=True).start()
+        return self.server
+
+    def _instrument(self, method: str, function: Callable) -> Callable:
+        local = self._local
+
+        @functools.wraps(function)
+        def instrumented(*args: object, **kwargs: object) -> object:
+            # Calls made by other instrumented calls (e.g. batch flush inside get) are part of the outer call.
+            if getattr(local, "active", False):
+                return function(*args, **kwargs)
+            local.active = True
+            error = True
+            result = None
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                local.active = False
+                obj_type, target = _call_target(method, args, kwargs)
+                sent = payload_size(args) + payload_size(kwargs)
+                self.record(method, obj_type, target, elapsed, sent, payload_size(result), error)
+
+        return instrumented
+
+    @staticmethod
+    def _caller() -> Optional[str]:
+        """Return the qualified name of the innermost testcenter (non API) function on the call stack."""
+        frame = sys._getframe(3)  # pylint: disable=protected-access
+        while frame:
+            module = frame.f_globals.get("__name__", "")
+            if module.startswith("testcenter.") and not module.startswith("testcenter.api."):
+                return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+            frame = frame.f_back
+        return None
+
+
+def _call_target(method: str, args: tuple, kwargs: dict) -> Tuple[str, str]:
+    """Return object type and target (attribute or command) of API call."""
+    if method in ("create", "create_objects"):
+        return args[0].lower() if args else "", ""
+    if method == "perform":
+        return "", args[0] if args else ""
+    if method == "get_objects":
+        obj_refs = args[0] if args else []
+        return obj_type_of(obj_refs[0]) if obj_refs else "", ",".join(args[1:])
+    if method in ("get", "get_list"):
+        attribute = args[1] if len(args) > 1 else kwargs.get("attribute", "")
+        return obj_type_of(args[0]) if args else "", ",".join(attribute) if isinstance(attribute, list) else attribute or ""
+    if method == "config":
+        return obj_type_of(args[0]) if args else "", ",".join(kwargs)
+    if method in ("delete", "unsubscribe"):
+        return obj_type_of(args[0]) if args else "", ""
+    return "", ""
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
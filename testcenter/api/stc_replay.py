@@ -0,0 +1,308 @@
+"""
+Record STC API traffic and replay it without chassis.
+"""
+import copy
+import functools
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Union
+
+from trafficgenerator import TgnError
+
+from testcenter.api.stc_rest import StcRestWrapper
+from testcenter.api.stc_tcl import StcTclWrapper
+
+# StcHttp methods used by StcRestWrapper and StcApp.
+RECORDED_CLIENT_METHODS = (
+    "apply",
+    "config",
+    "create",
+    "delete",
+    "download",
+    "get",
+    "perform",
+    "upload",
+    "wait_until_complete",
+)
+
+
+def call_key(method: str, args: tuple, kwargs: dict) -> str:
+    """Return the key that identifies call by method and arguments.
+
+    :param method: called method.
+    :param args: positional arguments.
+    :param kwargs: keyword arguments.
+    """
+    return json.dumps([method, args, kwargs], default=str, sort_keys=True)
+
+
+class StcApiRecording:
+    """Recorded API calls.
+
+    Calls are recorded at the lowest level that is common to all wrapper methods - StcHttp client methods for REST
+    and Tcl script evaluations for Tcl - so the wrapper logic (parsing, batching etc.) runs as is on replay.
+    The recording file is gzip compressed JSON lines file, the first line is the header, each following line is one
+    call [method, args, kwargs, result, error, elapsed].
+    """
+
+    def __init__(self, header: Dict[str, object], calls: Optional[List[list]] = None) -> None:
+        """Create recording.
+
+        :param header: recording properties - api (rest or tcl), session_id, version.
+        :param calls: recorded calls.
+        """
+        self.header = header
+        self.calls: List[list] = calls if calls is not None else []
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    @classmethod
+    def load(cls, file_name: str) -> "StcApiRecording":
+        """Load recording from file.
+
+        :param file_name: recording file name.
+        """
+        with gzip.open(file_name, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            return cls(header, [json.loads(line) for line in f])
+
+    def save(self, file_name: str) -> None:
+        """Save recording to file.
+
+        :param file_name: recording file name.
+        """
+        with gzip.open(file_name, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(self.header, separators=(",", ":")) + "\n")
+            for call in self.calls:
+                f.write(json.dumps(call, separators=(",", ":"), default=str) + "\n")
+
+    def total_time(self) -> float:
+        """Return the total recorded calls time."""
+        return sum(call[5] for call in self.calls)
+
+
+class StcApiRecorder:
+    """Record the calls of API wrapper.
+
+    Usage:
+        recorder = StcApiRecorder(stc.api)
+        stc.load_config(...)
+        recorder.save("load_config.stcrec.gz")
+    """
+
+    def __init__(self, api: Union[StcRestWrapper, StcTclWrapper]) -> None:
+        """Start recording (api.recorder).
+
+        :param api: API wrapper.
+        """
+        if isinstance(api, StcRestWrapper):
+            self.target = api.client
+            methods = RECORDED_CLIENT_METHODS
+            header = {"api": "rest", "session_id": api.session_id}
+        elif isinstance(api, StcTclWrapper):
+            self.target = api
+            methods = ("eval",)
+            header = {"api": "tcl", "version": api.ver}
+        else:
+            raise TgnError(f"Recording of {type(api).__name__} not supported - use Tcl or REST")
+        self.api = api
+        self.recording = StcApiRecording(header)
+        self._lock = threading.Lock()
+        for method in methods:
+            setattr(self.target, method, self._record(method, getattr(self.target, method)))
+        api.recorder = self
+
+    def stop(self) -> StcApiRecording:
+        """Stop recording and return the recording."""
+        for method in RECORDED_CLIENT_METHODS + ("eval",):
+            self.target.__dict__.pop(method, None)
+        self.api.recorder = None
+        return self.recording
+
+    def save(self, file_name: str) -> None:
+        """Save the calls recorded so far to file.
+
+        :param file_name: recording file name.
+        """
+        with self._lock:
+            self.recording.save(file_name)
+
+    def _record(self, method: str, function) -> object:
+        @functools.wraps(function)
+        def recorded(*args: object, **kwargs: object) -> object:
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as error:
+                self._append([method, args, kwargs, None, str(error) or type(error).__name__, time.perf_counter() - start])
+                raise
+            self._append([method, args, kwargs, result, None, time.perf_counter() - start])
+            return result
+
+        return recorded
+
+    def _append(self, call: list) -> None:
+        # Normalize the call to its JSON form so replay keys match the keys of the recorded calls.
+        call = json.loads(json.dumps(call, default=str))
+        with self._lock:
+            self.recording.calls.append(call)
+
+
+class StcApiReplayer:
+    """Serve recorded responses by call method and arguments.
+
+    Responses of identical calls are served in the recorded order, once all responses of a call were served the last
+    one is served again so polling loops that run more iterations than recorded still get responses.
+    """
+
+    def __init__(self, recording: Union[str, StcApiRecording], latency: Optional[Union[str, float]] = None) -> None:
+        """Index the recorded calls.
+
+        :param recording: recording or recording file name.
+        :param latency: None - no delay, "recorded" - the recorded latency of each call, float - fixed synthetic latency
+            in seconds.
+        """
+        self.recording = StcApiRecording.load(recording) if isinstance(recording, str) else recording
+        if latency is not None and latency != "recorded" and not isinstance(latency, (int, float)):
+            raise TgnError(f"Invalid replay latency {latency} - use None, 'recorded' or seconds")
+        self.latency = latency
+        self.replayed = 0
+        self.responses: Dict[str, Deque[list]] = defaultdict(deque)
+        for method, args, kwargs, result, error, elapsed in self.recording.calls:
+            self.responses[call_key(method, args, kwargs)].append([result, error, elapsed])
+        self._lock = threading.Lock()
+
+    def replay(self, method: str, *args: object, **kwargs: object) -> object:
+        """Return the recorded result of the call, raise TgnError if the call failed or was not recorded.
+
+        :param method: called method.
+        """
+        key = call_key(method, args, kwargs)
+        with self._lock:
+            responses = self.responses.get(key)
+            if not responses:
+                raise TgnError(f"Call {method}{args} {kwargs} was not recorded")
+            result, error, elapsed = responses.popleft() if len(responses) > 1 else responses[0]
+            self.replayed += 1
+        if self.latency == "recorded":
+            time.sleep(elapsed)
+        elif self.latency:
+            time.sleep(self.latency)
+        if error is not None:
+            raise TgnError(error)
+        return copy.deepcopy(result)
+
+
+class StcReplayClient:
+    """Stand-in for stcrestclient StcHttp that serves recorded responses."""
+
+    def __init__(self, replayer: StcApiReplayer) -> None:
+        self.replayer = replayer
+
+    def session_id(self) -> str:
+        return self.replayer.recording.header.get("session_id", "")
+
+    def end_session(self, end_tcsession: bool = True) -> None:
+        pass
+
+    def apply(self) -> None:
+        return self.replayer.replay("apply")
+
+    def config(self, handle: str, *args: object, **kwargs: object) -> None:
+        return self.replayer.replay("config", handle, *args, **kwargs)
+
+    def create(self, object_type: str, *args: object, **kwargs: object) -> str:
+        return self.replayer.replay("create", object_type, *args, **kwargs)
+
+    def delete(self, handle: str) -> None:
+        return self.replayer.replay("delete", handle)
+
+    def download(self, file_name: str, save_as: Optional[str] = None) -> str:
+        if save_as is not None:
+            return self.replayer.replay("download", file_name, save_as)
+        return self.replayer.replay("download", file_name)
+
+    def get(self, handle: str, *args: str) -> Union[str, list, dict]:
+        return self.replayer.replay("get", handle, *args)
+
+    def perform(self, command: str, params: Optional[dict] = None, **kwargs: object) -> dict:
+        if params is not None:
+            return self.replayer.replay("perform", command, params, **kwargs)
+        return self.replayer.replay("perform", command, **kwargs)
+
+    def upload(self, src_file_path: str, dst_file_name: Optional[str] = None) -> str:
+        if dst_file_name is not None:
+            return self.replayer.replay("upload", src_file_path, dst_file_name)
+        return self.replayer.replay("upload", src_file_path)
+
+    def wait_until_complete(self, timeout: Optional[float] = None) -> str:
+        if timeout is not None:
+            return self.replayer.replay("wait_until_complete", timeout)
+        return self.replayer.replay("wait_until_complete")
+
+
+class StcRestReplayWrapper(StcRestWrapper):
+    """STC REST wrapper that serves recorded responses instead of connecting to REST server.
+
+    Usage:
+        stc = StcApp(StcRestReplayWrapper(logger, "load_config.stcrec.gz", latency="recorded"))
+    """
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self, logger, recording: Union[str, StcApiRecording, StcApiReplayer], latency: Optional[Union[str, float]] = None
+    ) -> None:
+        """Init replay wrapper.
+
+        :param logger: Package logger.
+        :param recording: recording, recording file name or replayer to share with other wrappers.
+        :param latency: None - no delay, "recorded" - the recorded latency of each call, float - fixed latency.
+        """
+        self.replayer = recording if isinstance(recording, StcApiReplayer) else StcApiReplayer(recording, latency)
+        if self.replayer.recording.header.get("api") != "rest":
+            raise TgnError("Recording is not REST API recording")
+        self.logger = logger
+        self.server = "replay"
+        self.port = 0
+        self.pool_size = 1
+        self.gzip = False
+        self.client = StcReplayClient(self.replayer)
+        self.transport = None
+        self.session_id = self.client.session_id()
+        self.command_rc = None
+        self.generation = 0
+        self.batch = None
+
+    def disconnect(self, terminate: bool) -> None:
+        self.client.end_session(terminate)
+
+    def join(self) -> "StcRestReplayWrapper":
+        return StcRestReplayWrapper(self.logger, self.replayer)
+
+
+class StcTclReplayWrapper(StcTclWrapper):
+    """STC Tcl wrapper that serves recorded Tcl evaluations instead of running Tcl interpreter."""
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self, logger, recording: Union[str, StcApiRecording, StcApiReplayer], latency: Optional[Union[str, float]] = None
+    ) -> None:
+        """Init replay wrapper.
+
+        :param logger: Package logger.
+        :param recording: recording, recording file name or replayer to share with other wrappers.
+        :param latency: None - no delay, "recorded" - the recorded latency of each call, float - fixed latency.
+        """
+        self.replayer = recording if isinstance(recording, StcApiReplayer) else StcApiReplayer(recording, latency)
+        if self.replayer.recording.header.get("api") != "tcl":
+            raise TgnError("Recording is not Tcl API recording")
+        self.logger = logger
+        self.ver = self.replayer.recording.header.get("version")
+        self.command_rc = None
+        self.generation = 0
+        self.batch = None
+
+    def eval(self, command: str) -> str:
+        return self.replayer.replay("eval", command)
@@ -4,16 +4,26 @@ STC REST wrapper.
 import getpass
 import logging
 from random import randint
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
 from stcrestclient import stchttp
 
+from testcenter.api.stc_batch import StcConfigBatch, is_read_only_command, is_results_object
+from testcenter.api.stc_rest_transport import StcRestTransport
+
 
 class StcRestWrapper:
     """STC Python API over REST Server."""
 
     def __init__(
-        self, logger: logging.Logger, server: str, port: int = 80, user_name: str = getpass.getuser(), session_name: str = None
+        self,
+        logger: logging.Logger,
+        server: str,
+        port: int = 80,
+        user_name: str = getpass.getuser(),
+        session_name: str = None,
+        pool_size: int = 4,
+        gzip: bool = True,
     ):
         """Init STC REST client.
 
@@ -24,17 +34,47 @@ class StcRestWrapper:
         :param port: STC REST API HTTP port.
         :param user_name: user name, part of session ID.
         :param session_name: session, name part of session ID.
+        :param pool_size: maximum number of persistent HTTP connections.
+        :param gzip: True - accept gzip compressed responses.
         """
+        self.logger = logger
+        self.server = server
+        self.port = port
+        self.pool_size = pool_size
+        self.gzip = gzip
         self.client = stchttp.StcHttp(server, port, debug_print=logger.getEffectiveLevel() == logging.DEBUG)
+        # Replace the client per request connections with pooled keep-alive connections.
+        self.transport = StcRestTransport.from_rest(self.client._rest, pool_size, gzip)  # pylint: disable=protected-access
+        self.client._rest = self.transport  # pylint: disable=protected-access
         if session_name:
             self.session_id = self.client.join_session(session_name)
         else:
             session_name = "session" + str(randint(0, 99))
             self.session_id = self.client.new_session(user_name, session_name, kill_existing=True)
         self.command_rc = None
+        # Incremented after every operation that may change the configuration or the state of any object completes (or
+        # is buffered by the batch), see StcAttributeCache.
+        self.generation = 0
+        # Active write batch, see StcProject.batch.
+        self.batch: Optional[StcConfigBatch] = None
 
     def disconnect(self, terminate: bool) -> None:
         self.client.end_session(terminate)
+        self.transport.close()
+
+    def join(self) -> "StcRestWrapper":
+        """Return new REST client attached to the same session.
+
+        Use joined clients to send independent requests concurrently on the same session.
+        """
+        return StcRestWrapper(
+            self.logger,
+            self.server,
+            self.port,
+            session_name=self.client.session_id(),
+            pool_size=self.pool_size,
+            gzip=self.gzip,
+        )
 
     def create(self, obj_type: str, parent_obj_ref: str, **attributes: object) -> str:
         """Create one or more Spirent TestCenter Automation objects.
@@ -44,14 +84,34 @@ class StcRestWrapper:
         :param attributes: additional attributes.
         :return: STC object reference.
         """
-        return self.client.create(obj_type, under=parent_obj_ref, **attributes)
+        if self.batch:
+            self.batch.flush(parent_obj_ref)
+        obj_ref = self.client.create(obj_type, under=parent_obj_ref, **attributes)
+        self.generation += 1
+        return obj_ref
+
+    def create_objects(self, obj_type: str, parent_obj_ref: str, objects_attributes: List[Dict[str, object]]) -> List[str]:
+        """Create multiple objects of the same type under the same parent.
+
+        STC REST server has no bulk create so each object is created with a single request that sets all its
+        attributes (instead of create followed by config and get requests).
+
+        :param obj_type: object type.
+        :param parent_obj_ref: parent object ref - objects will be created under this parent.
+        :param objects_attributes: list of attributes dictionaries, one per object.
+        :return: STC objects references, in the same order as objects_attributes.
+        """
+        return [self.create(obj_type, parent_obj_ref, **attributes) for attributes in objects_attributes]
 
     def delete(self, obj_ref: str) -> None:
         """Delete Spirent TestCenter Automation object.
 
         :param obj_ref: object handle to delete.
         """
+        if self.batch:
+            self.batch.flush()
         self.client.delete(obj_ref)
+        self.generation += 1
 
     def perform(self, command: str, **arguments: object) -> dict:
         """Execute a command.
@@ -61,18 +121,51 @@ class StcRestWrapper:
         """
         if command in ["CSTestSessionConnect", "CSTestSessionDisconnect"]:
             return {}
+        if self.batch:
+            self.batch.flush()
         self.command_rc = self.client.perform(command, **arguments)
+        if not is_read_only_command(command):
+            self.generation += 1
         return self.command_rc
 
-    def get(self, obj_ref: str, attribute: Optional[str] = "") -> str:
+    def get(self, obj_ref: str, attribute: Optional[Union[str, List[str]]] = "") -> Union[str, Dict[str, str]]:
         """Return the value(s) of one or more object attributes or a set of object handles.
 
         :param obj_ref: requested object reference.
-        :param attribute: requested attribute. If empty - return values of all object attributes.
+        :param attribute: requested attribute or list of attributes. If empty - return values of all object attributes.
         :return: requested value(s) as returned by get command.
+            If list of attributes was requested, the return value is dictionary {attribute: value} read in one request.
+        """
+        if self.batch:
+            self.batch.flush(obj_ref)
+        if isinstance(attribute, list):
+            output = self.client.get(obj_ref, *attribute)
+            if not isinstance(output, dict):
+                return {attribute[0]: _output_2_str(output)}
+            values = {name.lower(): _output_2_str(value) for name, value in output.items()}
+            return {name: values[name.lower()] for name in attribute}
+        return _output_2_str(self.client.get(obj_ref, attribute))
+
+    def get_objects(self, obj_refs: List[str], *attributes: str) -> List[Dict[str, str]]:
+        """Return the values of attributes of multiple objects.
+
+        STC REST server has no multi-object get so each object is read with a single request that returns all
+        requested attributes (instead of one request per attribute).
+
+        :param obj_refs: requested objects references.
+        :param attributes: requested attributes. If empty - return values of all objects attributes.
+        :return: list of {attribute: value} dictionaries, one per requested object, in the same order as obj_refs.
         """
-        output = self.client.get(obj_ref, attribute)
-        return output if isinstance(output, str) else " ".join(output)
+        if self.batch:
+            self.batch.flush()
+        objects_values = []
+        for obj_ref in obj_refs:
+            output = self.client.get(obj_ref, *attributes)
+            if isinstance(output, dict):
+                objects_values.append({name: _output_2_str(value) for name, value in output.items()})
+            else:
+                objects_values.append({attributes[0]: _output_2_str(output)})
+        return objects_values
 
     def get_list(self, obj_ref: str, attribute: str) -> List[str]:
         """Return the value of the object attributes or a python list.
@@ -80,7 +173,9 @@ class StcRestWrapper:
         :param obj_ref: requested object reference.
         :param attribute: requested attribute.
         """
-        return self.client.get(obj_ref, attribute).split()
+        if self.batch:
+            self.batch.flush(obj_ref)
+        return _output_2_str(self.client.get(obj_ref, attribute)).split()
 
     def config(self, obj_ref: str, **attributes: object) -> None:
         """Set or modifies one or more object attributes, or a relation.
@@ -88,7 +183,12 @@ class StcRestWrapper:
         :param obj_ref: requested object reference.
         :param attributes: dictionary of {attributes: values} to configure.
         """
-        self.client.config(obj_ref, attributes)
+        if self.batch:
+            self.batch.config(obj_ref, **attributes)
+        else:
+            self.client.config(obj_ref, attributes)
+        if not is_results_object(obj_ref):
+            self.generation += 1
 
     def subscribe(self, **arguments: object) -> str:
         """Subscribe to statistics view.
@@ -108,8 +208,17 @@ class StcRestWrapper:
 
     def apply(self) -> None:
         """Send a test configuration to the Spirent TestCenter chassis."""
+        if self.batch:
+            self.batch.apply_requested = True
+            return
         self.client.apply()
+        self.generation += 1
 
     def wait(self) -> None:
         """Wait until sequencer is finished."""
         self.client.wait_until_complete()
+
+
+def _output_2_str(output: Union[str, List[str]]) -> str:
+    """Return REST get output as string, list values (children, relations) are joined like in STC Tcl API."""
+    return output if isinstance(output, str) else " ".join(output)
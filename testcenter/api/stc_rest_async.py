@@ -0,0 +1,126 @@
+"""
+asyncio wrapper for STC REST API.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from trafficgenerator import TgnError
+
+from testcenter.api.stc_rest import StcRestWrapper
+
+
+class AsyncStcRestWrapper:
+    """STC REST API with awaitable operations.
+
+    Each operation is scheduled when it is called and runs on worker thread, up to max_concurrency operations run
+    concurrently over the REST client connections pool.
+    Operations keep the synchronous API order:
+    - reads (get, get_list, get_objects) run concurrently with each other but after all previously called writes.
+    - writes (config, create, delete, perform, apply, subscribe, call) run after all previously called operations.
+
+    Usage:
+        async_api = AsyncStcRestWrapper.of(stc.api)
+        link_states = await gather(*[port.ais_online() for port in stc.project.ports.values()], limit=16)
+    """
+
+    def __init__(self, api: StcRestWrapper, max_concurrency: int = 8) -> None:
+        """Create async wrapper and attach it to the synchronous wrapper (api.async_api).
+
+        :param api: synchronous REST wrapper. For best results its pool_size should be >= max_concurrency.
+        :param max_concurrency: maximum number of concurrent requests.
+        """
+        if not isinstance(api, StcRestWrapper):
+            raise TgnError("Async API is supported over REST API only")
+        self.api = api
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="AsyncStcRest")
+        self._last_write: Optional[asyncio.Future] = None
+        self._reads: List[asyncio.Future] = []
+        api.async_api = self
+
+    @classmethod
+    def of(cls, api: StcRestWrapper) -> AsyncStcRestWrapper:
+        """Return the async wrapper attached to the synchronous wrapper, create one if needed.
+
+        :param api: synchronous REST wrapper.
+        """
+        async_api = getattr(api, "async_api", None)
+        return async_api if async_api else cls(api)
+
+    def close(self) -> None:
+        """Shutdown worker threads."""
+        self._executor.shutdown(wait=True)
+
+    def get(self, obj_ref: str, attribute: Optional[str] = "") -> Awaitable[str]:
+        return self._submit(False, self.api.get, obj_ref, attribute)
+
+    def get_list(self, obj_ref: str, attribute: str) -> Awaitable[List[str]]:
+        return self._submit(False, self.api.get_list, obj_ref, attribute)
+
+    def get_objects(self, obj_refs: List[str], *attributes: str) -> Awaitable[List[Dict[str, str]]]:
+        return self._submit(False, self.api.get_objects, obj_refs, *attributes)
+
+    def config(self, obj_ref: str, **attributes: object) -> Awaitable[None]:
+        return self._submit(True, self.api.config, obj_ref, **attributes)
+
+    def create(self, obj_type: str, parent_obj_ref: str, **attributes: object) -> Awaitable[str]:
+        return self._submit(True, self.api.create, obj_type, parent_obj_ref, **attributes)
+
+    def delete(self, obj_ref: str) -> Awaitable[None]:
+        return self._submit(True, self.api.delete, obj_ref)
+
+    def perform(self, command: str, **arguments: object) -> Awaitable[dict]:
+        return self._submit(True, self.api.perform, command, **arguments)
+
+    def subscribe(self, **arguments: object) -> Awaitable[str]:
+        return self._submit(True, self.api.subscribe, **arguments)
+
+    def apply(self) -> Awaitable[None]:
+        return self._submit(True, self.api.apply)
+
+    def call(self, function: Callable, *args: object, **kwargs: object) -> Awaitable[object]:
+        """Run any synchronous function that uses the API (e.g. StcStats.read_stats) in order, as write.
+
+        :param function: function to run.
+        """
+        return self._submit(True, function, *args, **kwargs)
+
+    def _submit(self, write: bool, function: Callable, *args: object, **kwargs: object) -> asyncio.Future:
+        self._reads = [read for read in self._reads if not read.done()]
+        depends = [self._last_write] if self._last_write and not self._last_write.done() else []
+        if write:
+            depends += self._reads
+        future = asyncio.ensure_future(self._run(depends, functools.partial(function, *args, **kwargs)))
+        if write:
+            self._last_write = future
+            self._reads = []
+        else:
+            self._reads.append(future)
+        return future
+
+    async def _run(self, depends: List[asyncio.Future], function: Callable) -> object:
+        if depends:
+            # Failures of previous operations are reported to their callers, here we only wait for them to finish.
+            await asyncio.wait(depends)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function)
+
+
+async def gather(*aws: Awaitable, limit: Optional[int] = None) -> list:
+    """Wait for all awaitables and return their results in the same order, run at most limit of them at a time.
+
+    :param aws: awaitables (coroutines, tasks or futures).
+    :param limit: maximum number of awaitables to run concurrently, None - no limit.
+    """
+    if not limit:
+        return await asyncio.gather(*aws)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def limited(aw: Awaitable) -> object:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*[limited(aw) for aw in aws])
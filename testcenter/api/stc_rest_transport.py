@@ -0,0 +1,131 @@
+"""
+Connection pooled HTTP transport for STC REST client.
+"""
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from stcrestclient import resthttp
+
+logger = logging.getLogger("tgn.testcenter")
+
+
+class StcRestTiming(NamedTuple):
+    """Timing of single REST request."""
+
+    method: str
+    url: str
+    status: int
+    elapsed: float
+
+
+class StcRestTransport(resthttp.RestHttp):
+    """stcrestclient RestHttp that sends all requests over one requests.Session.
+
+    The base RestHttp uses the module level requests functions so every request opens new TCP connection. The
+    transport keeps persistent keep-alive connections in pool and records the timing of each request.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        debug_print: bool = False,
+        timeout: Optional[float] = None,
+        pool_size: int = 4,
+        gzip: bool = True,
+        max_timings: int = 4096,
+        ssl_verify: bool = True,
+    ) -> None:
+        """Create transport with empty connections pool.
+
+        :param base_url: base URL for requests, e.g. http://server:port/stcapi/.
+        :param debug_print: enable debug print statements.
+        :param timeout: number of seconds to wait for a response.
+        :param pool_size: maximum number of persistent connections (concurrent requests).
+        :param gzip: True - accept gzip compressed responses, False - request uncompressed responses.
+        :param max_timings: number of latest requests timings to keep.
+        :param ssl_verify: set to False to disable SSL verification (not secure).
+        """
+        super().__init__(base_url, ssl_verify=ssl_verify, debug_print=debug_print, timeout=timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate" if gzip else "identity"
+        self.timings: Deque[StcRestTiming] = deque(maxlen=max_timings)
+        self.requests = 0
+        self.total_time = 0.0
+
+    @classmethod
+    def from_rest(cls, rest: resthttp.RestHttp, pool_size: int = 4, gzip: bool = True) -> "StcRestTransport":
+        """Create transport with the same base URL, headers (including authorization), credentials and settings
+        (debug print, timeout, SSL verification) as existing RestHttp.
+
+        :param rest: RestHttp to replace.
+        :param pool_size: maximum number of persistent connections (concurrent requests).
+        :param gzip: True - accept gzip compressed responses, False - request uncompressed responses.
+        """
+        # pylint: disable=protected-access
+        transport = cls(rest.base_url(), rest.debug_print(), rest.timeout(), pool_size, gzip, ssl_verify=rest._verify)
+        transport._user = rest._user
+        transport._password = rest._password
+        for header, value in rest._base_headers.items():  # pylint: disable=protected-access
+            transport.add_header(header, value)
+        return transport
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def statistics(self) -> Dict[str, float]:
+        """Return number of requests, total and average request time."""
+        return {
+            "requests": self.requests,
+            "total_time": self.total_time,
+            "average_time": self.total_time / self.requests if self.requests else 0.0,
+        }
+
+    def head_request(self, container, resource=None):
+        url = self.make_url(container, resource)
+        return self._request("HEAD", url, self._make_headers(None)).status_code
+
+    def get_request(self, container, resource=None, query_items=None, accept=None, to_lower=False):
+        url = self.make_url(container, resource)
+        if query_items and isinstance(query_items, (list, tuple, set)):
+            url += self._list_query_str(query_items)
+            query_items = None
+        rsp = self._request("GET", url, self._make_headers(accept), params=query_items)
+        return self._handle_response(rsp, to_lower)
+
+    def post_request(self, container, resource=None, params=None, accept=None):
+        url = self.make_url(container, resource)
+        return self._handle_response(self._request("POST", url, self._make_headers(accept), data=params))
+
+    def put_request(self, container, resource=None, params=None, accept=None):
+        url = self.make_url(container, resource)
+        return self._handle_response(self._request("PUT", url, self._make_headers(accept), data=params))
+
+    def delete_request(self, container, resource=None, query_items=None, accept=None):
+        url = self.make_url(container, resource)
+        if query_items and isinstance(query_items, (list, tuple, set)):
+            url += self._list_query_str(query_items)
+            query_items = None
+        rsp = self._request("DELETE", url, self._make_headers(accept), params=query_items)
+        return self._handle_response(rsp)
+
+    def _request(self, method: str, url: str, headers: Dict[str, str], **kwargs: object) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            rsp = self.session.request(method, url, headers=headers, verify=self._verify, timeout=self._timeout, **kwargs)
+        except requests.exceptions.ConnectionError as error:
+            self._raise_conn_error(error)
+        elapsed = time.perf_counter() - start
+        self.timings.append(StcRestTiming(method, url, rsp.status_code, elapsed))
+        self.requests += 1
+        self.total_time += elapsed
+        if self._dbg_print:
+            logger.debug(f"===> {method} {rsp.url} {elapsed:.4f}")
+        return rsp
@@ -0,0 +1,512 @@
+"""
+In-process STC objects model simulator with the same interface as STC API wrappers.
+"""
+import copy
+import logging
+import threading
+import time
+from collections import defaultdict
+from math import ceil
+from typing import Dict, List, Optional, Union
+
+from trafficgenerator import TgnError
+
+from testcenter.api.stc_batch import StcConfigBatch, is_read_only_command, is_results_object
+
+# Children created automatically with their parent, {parent type: [(child type, attributes)]}.
+type_2_auto_children = {
+    "port": [("Generator", {"State": "STOPPED"}), ("Analyzer", {"State": "STOPPED"}), ("Capture", {})],
+    "generator": [("GeneratorConfig", {"DurationMode": "CONTINUOUS", "Duration": "30"})],
+}
+
+type_2_defaults = {
+    "port": {"Location": "", "Online": "false"},
+    "streamblock": {"Load": "10", "LoadUnit": "PERCENT_LINE_RATE", "Active": "true"},
+    "emulateddevice": {"DeviceCount": "1", "Active": "true"},
+    "resultdataset": {"PageNumber": "1", "TotalPageCount": "0", "ResultHandleList": "", "RecordsPerPage": "100"},
+    "bgprouterconfig": {"RouterState": "IDLE"},
+    "dhcpv4blockconfig": {"BlockState": "IDLE"},
+    "dhcpv6blockconfig": {"BlockState": "IDLE"},
+    "dhcpv4serverconfig": {"ServerState": "NONE"},
+    "dhcpv6serverconfig": {"ServerState": "NONE"},
+}
+
+# {emulation type: (state attribute, state after start, state after stop)}.
+emulation_2_states = {
+    "bgprouterconfig": ("RouterState", "ESTABLISHED", "IDLE"),
+    "dhcpv4blockconfig": ("BlockState", "BOUND", "IDLE"),
+    "dhcpv6blockconfig": ("BlockState", "BOUND", "IDLE"),
+    "dhcpv4serverconfig": ("ServerState", "UP", "NONE"),
+    "dhcpv6serverconfig": ("ServerState", "UP", "NONE"),
+}
+
+# {command: (objects list argument, True - start, False - stop)} for commands that start and stop emulations. Listed
+# devices start and stop all their emulations.
+command_2_emulations_list = {
+    "devicestart": ("devicelist", True),
+    "devicestop": ("devicelist", False),
+    "protocolstart": ("protocollist", True),
+    "protocolstop": ("protocollist", False),
+    "dhcpv4bind": ("blocklist", True),
+    "dhcpv4release": ("blocklist", False),
+    "dhcpv6bind": ("blocklist", True),
+    "dhcpv6release": ("blocklist", False),
+    "dhcpv4startserver": ("serverlist", True),
+    "dhcpv4stopserver": ("serverlist", False),
+    "dhcpv6startserver": ("serverlist", True),
+    "dhcpv6stopserver": ("serverlist", False),
+}
+
+# Synthetic counters of views subscribed without ViewAttributeList.
+view_2_counters = {
+    "generatorportresults": ["GeneratorFrameCount", "GeneratorOctetCount", "GeneratorFrameRate", "TotalFrameCount"],
+    "analyzerportresults": ["TotalFrameCount", "TotalOctetCount", "SigFrameCount", "FcsErrorFrameCount"],
+    "portavglatencyresults": ["AvgLatency", "MinLatency", "MaxLatency"],
+    "rxstreamsummaryresults": ["FrameCount", "OctetCount", "AvgLatency", "AvgJitter", "DroppedFrameCount"],
+    "txstreamresults": ["FrameCount", "OctetCount", "FrameRate"],
+}
+default_counters = ["FrameCount", "OctetCount", "FrameRate"]
+
+LOAD_COMMANDS = ("loadfromxml", "loadfromdatabase")
+
+
+class StcSimObject:
+    """Simulated STC object."""
+
+    __slots__ = ("ref", "type", "parent", "attributes", "children", "affiliated", "state")
+
+    def __init__(self, ref: str, obj_type: str, parent: Optional["StcSimObject"]) -> None:
+        self.ref = ref
+        self.type = obj_type
+        self.parent = parent
+        # {attribute.lower(): (attribute, value)}
+        self.attributes: Dict[str, tuple] = {}
+        # {child type: {child ref: None}}, dictionaries keep creation order and allow O(1) delete.
+        self.children: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # Devices affiliated with port, returned as port children-emulateddevice.
+        self.affiliated: Dict[str, None] = {}
+        # Simulator run time state, e.g. generator stop time, results counters.
+        self.state: Dict[str, object] = {}
+
+
+class StcSimWrapper:
+    """STC API simulator.
+
+    Simulates STC objects tree in memory - create, delete, config and get attributes including children-<type>, parent
+    and -targets/-sources relations - and the commands the package uses:
+    - AttachPorts, ReleasePort, DetachPorts - ports link state (UP after link_up_delay seconds).
+    - GeneratorStart, GeneratorStop, GeneratorWaitForStop - generators state, generators with DurationMode SECONDS stop
+        after Duration seconds, GeneratorWaitForStop blocks until they stop or WaitTimeout expires.
+    - ResultsSubscribe, ResultDataSetUnsubscribe, RefreshResultView - ResultDataSets with paging and synthetic
+        counters that advance on each refresh while the port generator is running.
+    - DeviceStart/Stop, ProtocolStart/Stop, Dhcpv4/6 Bind/Release/StartServer/StopServer - BGP routers and DHCP
+        clients and servers state.
+    - ResetConfig.
+    Other commands succeed without effect. There is no chassis, configuration files cannot be loaded.
+
+    Usage:
+        stc = StcApp(StcSimWrapper(logger))
+        stc.connect()
+    """
+
+    def __init__(self, logger: logging.Logger, link_up_delay: float = 0, frames_per_refresh: int = 1000) -> None:
+        """Create simulator with system, project and physical chassis manager objects.
+
+        :param logger: Package logger.
+        :param link_up_delay: seconds from AttachPorts until the port link is UP.
+        :param frames_per_refresh: frames added to the counters of running port on each RefreshResultView.
+        """
+        self.logger = logger
+        self.link_up_delay = link_up_delay
+        self.frames_per_refresh = frames_per_refresh
+        self.session_id = "simulator"
+        self.objects: Dict[str, StcSimObject] = {}
+        self.type_counters: Dict[str, int] = defaultdict(int)
+        self.commands: Dict[str, int] = defaultdict(int)
+        self.command_rc = None
+        # Incremented by every operation that may change the configuration or the state of any object.
+        self.generation = 0
+        # Active write batch, see StcProject.batch.
+        self.batch: Optional[StcConfigBatch] = None
+        self._lock = threading.RLock()
+        system = self._new_object("system", None)
+        self._new_object("Project", system, Name="Project 1")
+        self._new_object("PhysicalChassisManager", system)
+
+    def disconnect(self, terminate: bool) -> None:
+        pass
+
+    def join(self) -> "StcSimWrapper":
+        """Return new session on the same in-process objects model, with its own batch, command_rc and generation."""
+        session = copy.copy(self)
+        session.command_rc = None
+        session.generation = 0
+        session.batch = None
+        return session
+
+    #
+    # STC API.
+    #
+
+    def apply(self) -> None:
+        if self.batch:
+            self.batch.apply_requested = True
+            return
+        self.generation += 1
+
+    def config(self, obj_ref: str, **attributes: object) -> None:
+        if self.batch:
+            self.batch.config(obj_ref, **attributes)
+        else:
+            with self._lock:
+                obj = self._object(obj_ref)
+                for attribute, value in attributes.items():
+                    self._set_attribute(obj, attribute, value)
+                if obj.type == "resultdataset" and "pagenumber" in (a.lower() for a in attributes):
+                    self._set_page(obj)
+        if not is_results_object(obj_ref):
+            self.generation += 1
+
+    def create(self, obj_type: str, parent_obj_ref: str, **attributes: object) -> str:
+        if self.batch:
+            self.batch.flush(parent_obj_ref)
+        with self._lock:
+            parent = self._object(parent_obj_ref)
+            if obj_type.lower() == "project" and parent.children["project"]:
+                return next(iter(parent.children["project"]))
+            obj_ref = self._new_object(obj_type, parent, **attributes).ref
+        self.generation += 1
+        return obj_ref
+
+    def create_objects(self, obj_type: str, parent_obj_ref: str, objects_attributes: List[Dict[str, object]]) -> List[str]:
+        return [self.create(obj_type, parent_obj_ref, **attributes) for attributes in objects_attributes]
+
+    def delete(self, obj_ref: str) -> None:
+        if self.batch:
+            self.batch.flush()
+        with self._lock:
+            self._delete(self._object(obj_ref))
+        self.generation += 1
+
+    def get(self, obj_ref: str, attribute: Optional[Union[str, List[str]]] = "") -> Union[str, Dict[str, str]]:
+        if self.batch:
+            self.batch.flush(obj_ref)
+        with self._lock:
+            obj = self._object(obj_ref)
+            if isinstance(attribute, list):
+                return {name: self._get_attribute(obj, name) for name in attribute}
+            if attribute:
+                return self._get_attribute(obj, attribute)
+            return self._get_all_attributes(obj)
+
+    def get_objects(self, obj_refs: List[str], *attributes: str) -> List[Dict[str, str]]:
+        if self.batch:
+            self.batch.flush()
+        with self._lock:
+            objects = [self._object(obj_ref) for obj_ref in obj_refs]
+            if attributes:
+                return [{name: self._get_attribute(obj, name) for name in attributes} for obj in objects]
+            return [self._get_all_attributes(obj) for obj in objects]
+
+    def get_list(self, obj_ref: str, attribute: str) -> List[str]:
+        return self.get(obj_ref, attribute).split()
+
+    def perform(self, command: str, **arguments: object) -> Dict[str, str]:
+        if self.batch:
+            self.batch.flush()
+        with self._lock:
+            self.commands[command.lower()] += 1
+            rc = {"Name": command, "State": "COMPLETED", "Status": ""}
+            rc.update({name: _value_2_str(value) for name, value in arguments.items()})
+            arguments = {name.lower(): _value_2_str(value) for name, value in arguments.items()}
+            rc.update(self._perform(command.lower(), arguments))
+        if not is_read_only_command(command):
+            self.generation += 1
+        self.command_rc = rc
+        return rc
+
+    def subscribe(self, **arguments: object) -> str:
+        return self.perform("ResultsSubscribe", **arguments)["ReturnedDataSet"]
+
+    def unsubscribe(self, result_data_set: str) -> None:
+        self.perform("ResultDataSetUnsubscribe", ResultDataSet=result_data_set)
+
+    def wait(self) -> None:
+        pass
+
+    #
+    # Objects model.
+    #
+
+    def _object(self, obj_ref: str) -> StcSimObject:
+        obj = self.objects.get(obj_ref.lower())
+        if not obj:
+            raise TgnError(f"Invalid object handle {obj_ref}")
+        return obj
+
+    def _new_object(self, obj_type: str, parent: Optional[StcSimObject], **attributes: object) -> StcSimObject:
+        type_lower = obj_type.lower()
+        self.type_counters[type_lower] += 1
+        index = self.type_counters[type_lower]
+        obj = StcSimObject(f"{type_lower}{index}", type_lower, parent)
+        self.objects[obj.ref] = obj
+        if parent:
+            parent.children[type_lower][obj.ref] = None
+        obj.attributes["name"] = ("Name", f"{obj_type[0].upper()}{obj_type[1:]} {index}")
+        for attribute, value in type_2_defaults.get(type_lower, {}).items():
+            obj.attributes[attribute.lower()] = (attribute, value)
+        for attribute, value in attributes.items():
+            self._set_attribute(obj, attribute, value)
+        for child_type, child_attributes in type_2_auto_children.get(type_lower, []):
+            self._new_object(child_type, obj, **child_attributes)
+        return obj
+
+    def _delete(self, obj: StcSimObject) -> None:
+        for children in list(obj.children.values()):
+            for child_ref in list(children):
+                self._delete(self.objects[child_ref])
+        for attribute in [a for a in obj.attributes if a.endswith(("-targets", "-sources"))]:
+            self._set_attribute(obj, attribute, "")
+        if obj.type == "emulateddevice":
+            self._set_attribute(obj, "AffiliatedPort", "")
+        if obj.parent:
+            obj.parent.children[obj.type].pop(obj.ref, None)
+        self.objects.pop(obj.ref, None)
+
+    def _set_attribute(self, obj: StcSimObject, attribute: str, value: object) -> None:
+        attribute_lower = attribute.lower()
+        value = _value_2_str(value)
+        if attribute_lower.endswith(("-targets", "-sources")):
+            relation, side = attribute_lower.rsplit("-", 1)
+            other_side = "sources" if side == "targets" else "targets"
+            _, old_value = obj.attributes.get(attribute_lower, (attribute, ""))
+            for ref in old_value.split():
+                if ref in self.objects:
+                    self._remove_from_list(self.objects[ref], f"{relation}-{other_side}", obj.ref)
+            for ref in value.split():
+                if ref.lower() in self.objects:
+                    self._add_to_list(self.objects[ref.lower()], f"{relation}-{other_side}", obj.ref)
+        elif attribute_lower == "affiliatedport":
+            _, old_port = obj.attributes.get(attribute_lower, (attribute, ""))
+            if old_port in self.objects:
+                self.objects[old_port].affiliated.pop(obj.ref, None)
+            if value.lower() in self.objects:
+                self.objects[value.lower()].affiliated[obj.ref] = None
+        obj.attributes[attribute_lower] = (attribute, value)
+
+    @staticmethod
+    def _add_to_list(obj: StcSimObject, attribute: str, ref: str) -> None:
+        name, value = obj.attributes.get(attribute, (attribute, ""))
+        if ref not in value.split():
+            obj.attributes[attribute] = (name, f"{value} {ref}".strip())
+
+    @staticmethod
+    def _remove_from_list(obj: StcSimObject, attribute: str, ref: str) -> None:
+        name, value = obj.attributes.get(attribute, (attribute, ""))
+        obj.attributes[attribute] = (name, " ".join(r for r in value.split() if r != ref))
+
+    def _get_attribute(self, obj: StcSimObject, attribute: str) -> str:
+        attribute_lower = attribute.lower()
+        if attribute_lower == "parent":
+            return obj.parent.ref if obj.parent else ""
+        if attribute_lower == "children":
+            return " ".join(ref for children in obj.children.values() for ref in children)
+        if attribute_lower.startswith("children-"):
+            child_type = attribute_lower[len("children-") :]
+            children = list(obj.children.get(child_type, {}))
+            if child_type == "emulateddevice" and obj.type == "port":
+                children.extend(obj.affiliated)
+            return " ".join(children)
+        if obj.type == "generator" and attribute_lower == "state":
+            self._update_generator(obj)
+        elif attribute_lower == "linkstatus" and "attached" in obj.state:
+            return "UP" if time.monotonic() >= obj.state["attached"] + self.link_up_delay else "DOWN"
+        return obj.attributes.get(attribute_lower, (attribute, ""))[1]
+
+    def _get_all_attributes(self, obj: StcSimObject) -> Dict[str, str]:
+        if obj.type == "generator":
+            self._update_generator(obj)
+        values = {name: self._get_attribute(obj, name) for name, _ in obj.attributes.values()}
+        values["parent"] = obj.parent.ref if obj.parent else ""
+        return values
+
+    #
+    # Commands.
+    #
+
+    def _perform(self, command: str, arguments: Dict[str, str]) -> Dict[str, str]:
+        if command in LOAD_COMMANDS:
+            raise TgnError(f"{command} is not supported by the simulator")
+        if command == "attachports":
+            for port in self._refs_objects(arguments.get("portlist", "")):
+                self._attach_port(port)
+        elif command in ("releaseport", "detachports"):
+            for port in self._refs_objects(arguments.get("portlist", "")):
+                port.state.pop("attached", None)
+                self._set_attribute(port, "Online", "false")
+                phy = port.attributes.get("activephy-targets", ("", ""))[1]
+                if phy in self.objects:
+                    self._set_attribute(self.objects[phy], "LinkStatus", "NONE")
+        elif command in ("generatorstart", "generatorstop"):
+            for generator in self._generators(arguments.get("generatorlist", "")):
+                if command == "generatorstart":
+                    self._start_generator(generator)
+                else:
+                    generator.state.pop("stop_time", None)
+                    self._set_attribute(generator, "State", "STOPPED")
+        elif command == "generatorwaitforstop":
+            self._wait_for_stop(self._generators(arguments.get("generatorlist", "")), float(arguments.get("waittimeout", 600)))
+        elif command in command_2_emulations_list:
+            list_argument, start = command_2_emulations_list[command]
+            for obj in self._refs_objects(arguments.get(list_argument, "")):
+                self._start_stop_emulations(obj, start)
+        elif command == "resultssubscribe":
+            return {"ReturnedDataSet": self._subscribe(arguments).ref}
+        elif command == "resultdatasetunsubscribe":
+            self._delete(self._object(arguments["resultdataset"]))
+        elif command == "refreshresultview":
+            self._refresh(self._object(arguments["resultdataset"]))
+        elif command == "resultsclearallcommand":
+            for obj in self.objects.values():
+                obj.state.pop("frames", None)
+        elif command == "resetconfig":
+            project = self.objects["project1"]
+            for children in list(project.children.values()):
+                for child_ref in list(children):
+                    self._delete(self.objects[child_ref])
+        elif command == "subscribedynamicresultview":
+            raise TgnError("Dynamic result views are not supported by the simulator")
+        return {}
+
+    def _start_stop_emulations(self, obj: StcSimObject, start: bool) -> None:
+        """Move the emulation, or all emulations of the device, to their state after start or stop."""
+        emulations = (
+            [obj] if obj.type in emulation_2_states else [self.objects[ref] for refs in obj.children.values() for ref in refs]
+        )
+        for emulation in emulations:
+            if emulation.type in emulation_2_states:
+                attribute, started, stopped = emulation_2_states[emulation.type]
+                self._set_attribute(emulation, attribute, started if start else stopped)
+
+    def _refs_objects(self, refs: str) -> List[StcSimObject]:
+        return [self._object(ref) for ref in refs.split()]
+
+    def _attach_port(self, port: StcSimObject) -> None:
+        phy_ref = port.attributes.get("activephy-targets", ("", ""))[1]
+        if phy_ref not in self.objects:
+            phy = self._new_object("EthernetCopper", port, LinkStatus="DOWN")
+            self._set_attribute(port, "activephy-Targets", phy.ref)
+        else:
+            phy = self.objects[phy_ref]
+        phy.state["attached"] = time.monotonic()
+        self._set_attribute(port, "Online", "true")
+
+    def _generators(self, refs: str) -> List[StcSimObject]:
+        if refs:
+            return self._refs_objects(refs)
+        return [self.objects[ref] for ref in list(self.objects) if self.objects[ref].type == "generator"]
+
+    def _start_generator(self, generator: StcSimObject) -> None:
+        self._set_attribute(generator, "State", "RUNNING")
+        generator.state.pop("stop_time", None)
+        for config_ref in generator.children.get("generatorconfig", {}):
+            config = self.objects[config_ref].attributes
+            if config.get("durationmode", ("", ""))[1].upper() == "SECONDS":
+                generator.state["stop_time"] = time.monotonic() + float(config["duration"][1])
+
+    def _wait_for_stop(self, generators: List[StcSimObject], wait_timeout: float) -> None:
+        running = [generator for generator in generators if self._get_attribute(generator, "State") == "RUNNING"]
+        if not running:
+            return
+        if all("stop_time" in generator.state for generator in running):
+            wait_timeout = min(wait_timeout, max(generator.state["stop_time"] for generator in running) - time.monotonic())
+        time.sleep(max(wait_timeout, 0))
+        for generator in running:
+            self._update_generator(generator)
+
+    def _update_generator(self, generator: StcSimObject) -> None:
+        stop_time = generator.state.get("stop_time")
+        if stop_time is not None and time.monotonic() >= stop_time:
+            generator.state.pop("stop_time")
+            self._set_attribute(generator, "State", "STOPPED")
+
+    #
+    # Results.
+    #
+
+    def _subscribe(self, arguments: Dict[str, str]) -> StcSimObject:
+        rds = self._new_object("ResultDataSet", self._object(arguments.get("parent", "project1")))
+        records_per_page = arguments.get("recordsperpage", "100")
+        self._set_attribute(rds, "RecordsPerPage", records_per_page)
+        rds.state["config_types"] = {t.lower() for t in arguments.get("configtype", "").split()}
+        rds.state["result_parents"] = arguments.get("resultparent", "project1").split()
+        rds.state["result_type"] = arguments.get("resulttype", "")
+        counters = arguments.get("viewattributelist", "").split()
+        rds.state["counters"] = counters or view_2_counters.get(rds.state["result_type"].lower(), default_counters)
+        rds.state["results"] = []
+        return rds
+
+    def _refresh(self, rds: StcSimObject) -> None:
+        result_type = rds.state["result_type"]
+        results = []
+        for config in self._config_objects(rds.state["result_parents"], rds.state["config_types"]):
+            results_ref = config.state.get(f"results-{result_type.lower()}")
+            if results_ref not in self.objects:
+                results_ref = self._new_object(result_type, config).ref
+                config.state[f"results-{result_type.lower()}"] = results_ref
+            results_object = self.objects[results_ref]
+            self._update_counters(results_object, config, rds.state["counters"], len(results))
+            results.append(results_ref)
+        rds.state["results"] = results
+        records_per_page = int(rds.attributes["recordsperpage"][1])
+        self._set_attribute(rds, "TotalPageCount", str(ceil(len(results) / records_per_page)))
+        self._set_page(rds)
+
+    def _set_page(self, rds: StcSimObject) -> None:
+        records_per_page = int(rds.attributes["recordsperpage"][1])
+        first = (int(rds.attributes["pagenumber"][1]) - 1) * records_per_page
+        self._set_attribute(rds, "ResultHandleList", " ".join(rds.state.get("results", [])[first : first + records_per_page]))
+
+    def _config_objects(self, result_parents: List[str], config_types: set) -> List[StcSimObject]:
+        config_objects = {}
+        stack = [self._object(ref) for ref in reversed(result_parents)]
+        while stack:
+            obj = stack.pop()
+            if obj.type in config_types:
+                config_objects[obj.ref] = obj
+            for child_type in reversed(list(obj.children)):
+                stack.extend(self.objects[ref] for ref in reversed(list(obj.children[child_type])))
+            if obj.type == "port":
+                stack.extend(self.objects[ref] for ref in reversed(list(obj.affiliated)))
+        return list(config_objects.values())
+
+    def _update_counters(self, results: StcSimObject, config: StcSimObject, counters: List[str], index: int) -> None:
+        port = config
+        while port and port.type != "port":
+            affiliated_port = port.attributes.get("affiliatedport", ("", ""))[1]
+            port = self.objects.get(affiliated_port) if affiliated_port else port.parent
+        running = False
+        if port:
+            for generator_ref in port.children.get("generator", {}):
+                running |= self._get_attribute(self.objects[generator_ref], "State") == "RUNNING"
+        frames = results.state.get("frames", 0) + (self.frames_per_refresh * (index + 1) if running else 0)
+        results.state["frames"] = frames
+        for counter in counters:
+            counter_lower = counter.lower()
+            if "latency" in counter_lower or "jitter" in counter_lower:
+                value = f"{1.5 + index / 1000:.3f}" if frames else "0"
+            elif "rate" in counter_lower:
+                value = str(self.frames_per_refresh * (index + 1) if running else 0)
+            elif "octet" in counter_lower or "byte" in counter_lower:
+                value = str(frames * 128)
+            elif "error" in counter_lower or "dropped" in counter_lower:
+                value = "0"
+            else:
+                value = str(frames)
+            results.attributes[counter_lower] = (counter, value)
+
+
+def _value_2_str(value: object) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
@@ -3,28 +3,288 @@ STC Tcl wrapper.
 """
 from os import path
 from sys import platform
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Union
 
-from trafficgenerator.tgn_tcl import TgnTclWrapper, get_args_pairs, tcl_file_name, tcl_list_2_py_list
+from trafficgenerator import TgnError
+from trafficgenerator.tgn_tcl import TgnTclWrapper, get_args_pairs, tcl_file_name
+
+from testcenter.api.stc_batch import StcConfigBatch, is_read_only_command, is_results_object
 
 if platform == "win32":
     APP_SUBDIR = "Spirent TestCenter Application"
 else:
     APP_SUBDIR = "Spirent_TestCenter_Application_Linux"
 
+ROWS_SEP = "RoWsSeP"
+COLUMNS_SEP = "CoLsSeP"
+
+tcl_escape_2_char = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+
+def _tcl_backslash(tcl_list: str, index: int) -> tuple:
+    """Return the character of the backslash sequence that starts at index and the index after the sequence."""
+    char = tcl_list[index + 1 : index + 2]
+    if char in tcl_escape_2_char:
+        return tcl_escape_2_char[char], index + 2
+    if char in ("x", "u"):
+        end = index + 2
+        while end < min(len(tcl_list), index + (4 if char == "x" else 6)) and tcl_list[end] in "0123456789abcdefABCDEF":
+            end += 1
+        if end > index + 2:
+            return chr(int(tcl_list[index + 2 : end], 16)), end
+    if char and char in "01234567":
+        end = index + 1
+        while end < min(len(tcl_list), index + 4) and tcl_list[end] in "01234567":
+            end += 1
+        return chr(int(tcl_list[index + 1 : end], 8)), end
+    if char == "\n":
+        end = index + 2
+        while end < len(tcl_list) and tcl_list[end] in " \t":
+            end += 1
+        return " ", end
+    return char, index + 2
+
+
+def tcl_list_2_list(tcl_list: str) -> List[str]:
+    """Split Tcl list to Python list of its elements, without Tcl interpreter round trip.
+
+    Elements are not split recursively, nested lists are returned as Tcl list strings.
+
+    :param tcl_list: Tcl list.
+    """
+    if "{" not in tcl_list and '"' not in tcl_list and "\\" not in tcl_list:
+        return tcl_list.split()
+    elements = []
+    index = 0
+    length = len(tcl_list)
+    while True:
+        while index < length and tcl_list[index].isspace():
+            index += 1
+        if index == length:
+            return elements
+        if tcl_list[index] == "{":
+            depth = 1
+            end = index + 1
+            while end < length and depth:
+                char = tcl_list[end]
+                if char == "\\":
+                    end += 1
+                elif char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                end += 1
+            if depth:
+                raise TgnError(f"Unmatched open brace in Tcl list: {tcl_list}")
+            elements.append(tcl_list[index + 1 : end - 1])
+        elif tcl_list[index] == '"':
+            element = []
+            end = index + 1
+            while end < length and tcl_list[end] != '"':
+                if tcl_list[end] == "\\":
+                    char, end = _tcl_backslash(tcl_list, end)
+                    element.append(char)
+                else:
+                    element.append(tcl_list[end])
+                    end += 1
+            if end == length:
+                raise TgnError(f"Unmatched open quote in Tcl list: {tcl_list}")
+            elements.append("".join(element))
+            end += 1
+        else:
+            element = []
+            end = index
+            while end < length and not tcl_list[end].isspace():
+                if tcl_list[end] == "\\":
+                    char, end = _tcl_backslash(tcl_list, end)
+                    element.append(char)
+                else:
+                    element.append(tcl_list[end])
+                    end += 1
+            elements.append("".join(element))
+        if end < length and not tcl_list[end].isspace():
+            raise TgnError(f"Tcl list element in braces or quotes followed by {tcl_list[end]!r}: {tcl_list}")
+        index = end
+
+
+def tcl_pairs_2_dict(tcl_pairs: str) -> Dict[str, str]:
+    """Convert Tcl list of -attribute value pairs, as returned by stc::get and stc::perform, to Python dictionary.
+
+    :param tcl_pairs: Tcl list of -attribute value pairs.
+    """
+    elements = tcl_list_2_list(tcl_pairs)
+    return {elements[i][1:]: elements[i + 1] for i in range(0, len(elements) - 1, 2)}
+
+
+class StcTclResult:
+    """Result of command queued in StcTclPipeline, available after the pipeline is executed."""
+
+    def __init__(self, command: str, parse: Optional[Callable[[str], object]] = None) -> None:
+        self.command = command
+        self.parse = parse
+        self.executed = False
+        self.error: Optional[str] = None
+        self._value: object = None
+
+    def __repr__(self) -> str:
+        if not self.executed:
+            return f"{self.command} - pending"
+        return f"{self.command} - {'error: ' + self.error if self.error is not None else self._value}"
+
+    @property
+    def value(self) -> object:
+        """Return the command result, raise TgnError if the command failed or was not executed."""
+        if not self.executed:
+            raise TgnError(f"Command {self.command} was not executed")
+        if self.error is not None:
+            raise TgnError(f"Command {self.command} failed: {self.error}")
+        return self._value
+
+    def set(self, code: str, output: str) -> None:
+        self.executed = True
+        if code == "0":
+            self._value = self.parse(output) if self.parse else output
+        else:
+            self.error = output
+
+
+class StcTclPipeline:
+    """Queue of stc:: commands executed with one Tcl evaluation.
+
+    Each command runs inside catch and its return code and output are collected to one Tcl list so all results are
+    returned in one reply. Execution stops at the first failed command, the following commands are not executed.
+
+    Usage:
+        with stc.api.pipeline() as pipeline:
+            port = pipeline.create("port", "project1", Location="//10.0.0.1/1/1")
+            name = pipeline.get("project1", "name")
+        port.value, name.value
+    """
+
+    def __init__(self, api: "StcTclWrapper", raise_errors: bool = True) -> None:
+        """Create empty pipeline.
+
+        :param api: Tcl wrapper.
+        :param raise_errors: True - execute raises TgnError on the first failed command, False - errors are reported
+            by the results only.
+        """
+        self.api = api
+        self.raise_errors = raise_errors
+        self.commands: List[str] = []
+        self.results: List[StcTclResult] = []
+        self.writes = False
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __enter__(self) -> "StcTclPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def apply(self) -> StcTclResult:
+        return self._queue(True, "apply")
+
+    def config(self, obj_ref: str, **attributes: object) -> StcTclResult:
+        return self._queue(True, "config", obj_ref, get_args_pairs(attributes))
+
+    def create(self, obj_type: str, parent_obj_ref: str, **attributes: object) -> StcTclResult:
+        return self._queue(True, f"create {obj_type} -under {parent_obj_ref}", get_args_pairs(attributes))
+
+    def delete(self, obj_ref: str) -> StcTclResult:
+        return self._queue(True, "delete", obj_ref)
+
+    def get(self, obj_ref: str, attribute: Optional[str] = None) -> StcTclResult:
+        return self._queue(
+            False, "get", obj_ref, "-" + attribute if attribute else "", parse=None if attribute else tcl_pairs_2_dict
+        )
+
+    def get_list(self, obj_ref: str, attribute: str) -> StcTclResult:
+        return self._queue(False, "get", obj_ref, "-" + attribute, parse=tcl_list_2_list)
+
+    def perform(self, command: str, **arguments: object) -> StcTclResult:
+        return self._queue(
+            not is_read_only_command(command), "perform", command, get_args_pairs(arguments), parse=tcl_pairs_2_dict
+        )
+
+    def execute(self) -> List[StcTclResult]:
+        """Execute all queued commands, one Tcl evaluation per max_pipeline_commands commands, and empty the queue.
+
+        :return: results of all executed commands, in the same order as the commands were queued.
+        """
+        commands, results = self.commands, self.results
+        self.commands, self.results = [], []
+        if not commands:
+            return results
+        if self.api.batch:
+            self.api.batch.flush()
+        writes, self.writes = self.writes, False
+        chunk_size = self.api.max_pipeline_commands
+        for i in range(0, len(commands), chunk_size):
+            script = "".join(
+                f"if {{[catch {{{command}}} r]}} {{lappend results 1 $r; break}} else {{lappend results 0 $r}}\n"
+                for command in commands[i : i + chunk_size]
+            )
+            output = tcl_list_2_list(self.api.eval(f"set results {{}}\nforeach _ {{1}} {{\n{script}}}\nset results"))
+            for result, code, value in zip(results[i : i + chunk_size], output[::2], output[1::2]):
+                result.set(code, value)
+            if len(output) < 2 * len(commands[i : i + chunk_size]) or output[-2] != "0":
+                break
+        if writes:
+            self.api.generation += 1
+        performs = [result for result in results if result.command.startswith("stc::perform") and result.executed]
+        if performs and performs[-1].error is None:
+            self.api.command_rc = performs[-1].value
+        failed = [result for result in results if result.error is not None]
+        if failed and self.raise_errors:
+            raise TgnError(f"Command {failed[0].command} failed: {failed[0].error}")
+        return results
+
+    def _queue(self, write: bool, command: str, *attributes: str, parse: Optional[Callable] = None) -> StcTclResult:
+        command = _stc_command(command, *attributes)
+        result = StcTclResult(command, parse)
+        self.commands.append(command)
+        self.results.append(result)
+        self.writes |= write
+        return result
+
+
+def _stc_command(command: str, *attributes: str) -> str:
+    return "stc::" + command + " " + " ".join(attributes)
+
 
 class StcTclWrapper(TgnTclWrapper):
     """STC Python API over Tcl interpreter."""
 
+    # Maximum number of attributes to read with single stc::get, keeps the output below Tcl over Telnet output limit.
+    max_get_attributes = 16
+    # Maximum number of objects to create with single Tcl evaluation.
+    max_create_objects = 256
+    # Maximum number of pipeline commands to execute with single Tcl evaluation.
+    max_pipeline_commands = 512
+
     def __init__(self, logger, stc_install_dir, tcl_interp=None) -> None:
         super().__init__(logger, tcl_interp)
         self.eval("set dir " + tcl_file_name(path.join(stc_install_dir, APP_SUBDIR)))
         self.source(path.join(stc_install_dir, APP_SUBDIR, "pkgIndex.tcl"))
         self.ver = self.eval("package require SpirentTestCenter")
         self.command_rc = None
+        # Incremented by every operation that may change the configuration or the state of any object.
+        self.generation = 0
+        # Active write batch, see StcProject.batch.
+        self.batch: Optional[StcConfigBatch] = None
 
     def stc_command(self, command, *attributes):
-        return self.eval("stc::" + command + " " + " ".join(attributes))
+        return self.eval(_stc_command(command, *attributes))
+
+    def pipeline(self, raise_errors: bool = True) -> StcTclPipeline:
+        """Return new pipeline that executes queued commands with one Tcl evaluation.
+
+        :param raise_errors: True - raise TgnError on the first failed command, False - report errors in results only.
+        """
+        return StcTclPipeline(self, raise_errors)
 
     #
     # SpirentTestCenter Tcl package commands.
@@ -32,7 +292,11 @@ class StcTclWrapper(TgnTclWrapper):
 
     def apply(self) -> None:
         """Send a test configuration to the Spirent TestCenter chassis."""
+        if self.batch:
+            self.batch.apply_requested = True
+            return
         self.stc_command("apply")
+        self.generation += 1
 
     def config(self, obj_ref: str, **attributes: object) -> None:
         """Set or modifies one or more object attributes, or a relation.
@@ -40,7 +304,12 @@ class StcTclWrapper(TgnTclWrapper):
         :param obj_ref: requested object reference.
         :param attributes: dictionary of {attributes: values} to configure.
         """
-        self.stc_command("config", obj_ref, get_args_pairs(attributes))
+        if self.batch:
+            self.batch.config(obj_ref, **attributes)
+        else:
+            self.stc_command("config", obj_ref, get_args_pairs(attributes))
+        if not is_results_object(obj_ref):
+            self.generation += 1
 
     def create(self, obj_type: str, parent_obj_ref: str, **attributes: object) -> str:
         """Create one or more Spirent TestCenter Automation objects.
@@ -50,30 +319,96 @@ class StcTclWrapper(TgnTclWrapper):
         :param attributes: additional attributes.
         :return: STC object reference.
         """
-        return self.stc_command(f"create {obj_type} -under {parent_obj_ref}", get_args_pairs(attributes))
+        if self.batch:
+            self.batch.flush(parent_obj_ref)
+        obj_ref = self.stc_command(f"create {obj_type} -under {parent_obj_ref}", get_args_pairs(attributes))
+        self.generation += 1
+        return obj_ref
+
+    def create_objects(self, obj_type: str, parent_obj_ref: str, objects_attributes: List[Dict[str, object]]) -> List[str]:
+        """Create multiple objects of the same type under the same parent with one Tcl evaluation per
+        max_create_objects objects.
+
+        :param obj_type: object type.
+        :param parent_obj_ref: parent object ref - objects will be created under this parent.
+        :param objects_attributes: list of attributes dictionaries, one per object.
+        :return: STC objects references, in the same order as objects_attributes.
+        """
+        if self.batch:
+            self.batch.flush(parent_obj_ref)
+        obj_refs = []
+        for i in range(0, len(objects_attributes), self.max_create_objects):
+            creates = [
+                f"lappend created [stc::create {obj_type} -under {parent_obj_ref} {get_args_pairs(attributes)}]"
+                for attributes in objects_attributes[i : i + self.max_create_objects]
+            ]
+            obj_refs.extend(self.eval("set created {}; " + "; ".join(creates) + "; join $created").split())
+            self.generation += 1
+        return obj_refs
 
     def delete(self, obj_ref: str) -> None:
         """Delete the specified object.
 
         :param obj_ref: object reference of the object to delete.
         """
+        if self.batch:
+            self.batch.flush()
         self.stc_command("delete", obj_ref)
+        self.generation += 1
 
-    def get(self, obj_ref: str, attribute: Optional[str] = None) -> Union[str, Dict[str, str]]:
+    def get(self, obj_ref: str, attribute: Optional[Union[str, List[str]]] = None) -> Union[str, Dict[str, str]]:
         """Return the value(s) of one or more object attributes or a set of object handles.
 
         :param obj_ref: requested object reference.
-        :param attribute: requested attribute. If empty - return values of all object attributes.
+        :param attribute: requested attribute or list of attributes. If empty - return values of all object attributes.
         :return: requested value(s) as returned by get command.
             If all attributes were requested the return value is dictionary
             {attrib_name:attrib_val, attrib_name:attrib_val, ..}
+            If list of attributes was requested, the return value is dictionary {attribute: value}, attributes are
+            read with one stc::get per max_get_attributes attributes.
             If single attribute was requested, the returned value is simple str.
         """
+        if self.batch:
+            self.batch.flush(obj_ref)
+        if isinstance(attribute, list):
+            values = {}
+            for i in range(0, len(attribute), self.max_get_attributes):
+                chunk = attribute[i : i + self.max_get_attributes]
+                output = self.stc_command("get", obj_ref, " ".join("-" + name for name in chunk))
+                # stc::get of single attribute returns the bare value, not attribute value pair.
+                if len(chunk) == 1:
+                    values[chunk[0].lower()] = output
+                else:
+                    values.update({name.lower(): value for name, value in tcl_pairs_2_dict(output).items()})
+            return {name: values[name.lower()] for name in attribute}
         output = self.stc_command("get", obj_ref, "-" + attribute if attribute else "")
         if attribute:
             return output
-        attributes_dict = dict(zip(*[iter(tcl_list_2_py_list(output))] * 2))
-        return dict(zip([s[1:] for s in attributes_dict.keys()], attributes_dict.values()))
+        return tcl_pairs_2_dict(output)
+
+    def get_objects(self, obj_refs: List[str], *attributes: str) -> List[Dict[str, str]]:
+        """Return the values of attributes of multiple objects in a single Tcl evaluation.
+
+        :param obj_refs: requested objects references.
+        :param attributes: requested attributes. If empty - return values of all objects attributes.
+        :return: list of {attribute: value} dictionaries, one per requested object, in the same order as obj_refs.
+        """
+        if not obj_refs:
+            return []
+        if self.batch:
+            self.batch.flush()
+        if attributes:
+            get_row = f"foreach a {{{' '.join('-' + a for a in attributes)}}} {{lappend row [stc::get $h $a]}}"
+        else:
+            get_row = "foreach {a v} [stc::get $h] {lappend row [string range $a 1 end] $v}"
+        output = self.eval(
+            f"set rows {{}}; foreach h {{{' '.join(obj_refs)}}} "
+            f"{{set row {{}}; {get_row}; lappend rows [join $row {COLUMNS_SEP}]}}; join $rows {ROWS_SEP}"
+        )
+        rows = [row.split(COLUMNS_SEP) for row in output.split(ROWS_SEP)]
+        if attributes:
+            return [dict(zip(attributes, row)) for row in rows]
+        return [dict(zip(*[iter(row)] * 2)) for row in rows]
 
     def get_list(self, obj_ref: str, attribute: str) -> List[str]:
         """Return the value of the object attributes or a python list.
@@ -81,8 +416,10 @@ class StcTclWrapper(TgnTclWrapper):
         :param obj_ref: requested object reference.
         :param attribute: requested attribute.
         """
+        if self.batch:
+            self.batch.flush(obj_ref)
         output = self.stc_command("get", obj_ref, "-" + attribute if attribute else "")
-        return tcl_list_2_py_list(output)
+        return tcl_list_2_list(output)
 
     def perform(self, command, **arguments):
         """Execute a command.
@@ -91,8 +428,12 @@ class StcTclWrapper(TgnTclWrapper):
         :param arguments: additional arguments.
         :return: dictionary {attribute, value} as returned by 'perform command'.
         """
+        if self.batch:
+            self.batch.flush()
         rc = self.stc_command("perform", command, get_args_pairs(arguments))
-        self.command_rc = {k[1:]: v for k, v in dict(zip(*[iter(tcl_list_2_py_list(rc))] * 2)).items()}
+        if not is_read_only_command(command):
+            self.generation += 1
+        self.command_rc = tcl_pairs_2_dict(rc)
         return self.command_rc
 
     def subscribe(self, **arguments):
@@ -103,6 +444,8 @@ class StcTclWrapper(TgnTclWrapper):
             + additional arguments.
         :return: ResultDataSet handler
         """
+        if self.batch:
+            self.batch.flush()
         return self.stc_command("subscribe", get_args_pairs(arguments))
 
     def unsubscribe(self, result_data_set: str) -> None:
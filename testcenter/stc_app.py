@@ -4,7 +4,6 @@ This module implements classes and utility functions to manage STC application.
 from __future__ import annotations
 
 import logging
-import time
 from enum import Enum
 from os import path
 from typing import Optional, Union
@@ -16,6 +15,7 @@ from testcenter.api.stc_rest import StcRestWrapper
 from testcenter.api.stc_tcl import StcTclWrapper
 from testcenter.stc_object import StcObject
 from testcenter.stc_project import StcProject
+from testcenter.stc_statistics_view import StcStats
 
 logger = logging.getLogger("tgn.testcenter")
 
@@ -112,11 +112,13 @@ class StcApp(TgnApp):
             self.api.perform("LoadFromXml", FileName=path.normpath(config_file_name))
         else:
             raise ValueError(f"Configuration file type {ext} not supported.")
+        StcStats.subscriptions.clear()
         self.project.objects = {}
-        self.project.get_children("port")
+        self.project.prefetch(types=["port"])
 
     def reset_config(self) -> None:
         self.api.perform("ResetConfig", config="system1")
+        StcStats.subscriptions.clear()
 
     def save_config(self, config_file_name: str, server_folder: Optional[str] = "c:\\temp") -> None:
         """Save configuration file as tcc or xml.
@@ -172,7 +174,6 @@ class StcApp(TgnApp):
     def _command_devices(self, command: str) -> None:
         self.project.command_devices(command, 4)
         self.project.test_command_rc("Status")
-        time.sleep(4)
 
     #
     # Traffic commands.
@@ -186,9 +187,13 @@ class StcApp(TgnApp):
         """Stop traffic on all ports."""
         self.project.stop_ports()
 
-    def wait_traffic(self) -> None:
-        """Wait for traffic to end on all ports."""
-        self.project.wait_traffic()
+    def wait_traffic(self, timeout: Optional[float] = None) -> float:
+        """Wait for traffic to end on all ports.
+
+        :param timeout: how long (seconds) to wait for traffic end, None - wait forever.
+        :return: seconds until the last port stopped.
+        """
+        return self.project.wait_traffic(timeout=timeout)
 
     #
     # Sequencer commands.
@@ -0,0 +1,115 @@
+"""
+Read-through cache of STC objects attributes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from testcenter.api.stc_batch import is_results_object
+
+# Attributes that reflect run time state, and all attributes of results objects, are never cached.
+VOLATILE_ATTRIBUTES = ("resulthandlelist", "pagenumber", "totalpagecount")
+VOLATILE_SUFFIXES = ("state", "status")
+
+
+class StcAttributeCache:
+    """LRU cache of objects attributes values with TTL.
+
+    The cache is opt-in, assign it to StcObject.attribute_cache to cache the attributes of all objects or to
+    obj.attribute_cache to cache the attributes of specific object:
+        StcObject.attribute_cache = StcAttributeCache(max_size=4096, ttl=60)
+
+    Entries are tagged with the API generation (see StcRestWrapper.generation) so any config, apply, create, delete or
+    command that changes the configuration (see is_read_only_command) invalidates all entries once it completes.
+    Results objects (see is_results_object) are never cached, so reading statistics does not invalidate the cache.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: Optional[float] = 60) -> None:
+        """Create empty cache.
+
+        :param max_size: maximum number of cached attributes, least recently used attributes are evicted first.
+        :param ttl: time to live in seconds of cached attribute, None - until invalidated or evicted.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: Dict[Tuple[str, str], Tuple[str, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def is_volatile(attribute: str, obj_ref: Optional[str] = None) -> bool:
+        """Return True if the attribute reflects run time state and should not be cached.
+
+        :param attribute: attribute name.
+        :param obj_ref: object reference, all attributes of results objects are volatile.
+        """
+        attribute = attribute.lower()
+        if obj_ref is not None and is_results_object(obj_ref):
+            return True
+        return attribute in VOLATILE_ATTRIBUTES or attribute.endswith(VOLATILE_SUFFIXES)
+
+    def get(self, obj_ref: str, attribute: str, generation: int) -> Optional[str]:
+        """Return cached attribute value or None if not cached, expired or invalidated.
+
+        :param obj_ref: object reference.
+        :param attribute: attribute name.
+        :param generation: current API generation.
+        """
+        key = (obj_ref, attribute.lower())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] != generation or (self.ttl is not None and entry[1] < time.monotonic()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, obj_ref: str, attribute: str, value: str, generation: int) -> None:
+        """Cache attribute value, evict least recently used attributes if the cache is full.
+
+        :param obj_ref: object reference.
+        :param attribute: attribute name.
+        :param value: attribute value.
+        :param generation: API generation at the time the value was read.
+        """
+        if self.is_volatile(attribute, obj_ref):
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0
+        with self._lock:
+            self._entries[(obj_ref, attribute.lower())] = (value, expires, generation)
+            self._entries.move_to_end((obj_ref, attribute.lower()))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, obj_ref: Optional[str] = None) -> None:
+        """Invalidate the cached attributes of the requested object.
+
+        :param obj_ref: object reference, if None invalidate all objects.
+        """
+        with self._lock:
+            if obj_ref is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == obj_ref]:
+                    del self._entries[key]
+
+    def statistics(self) -> Dict[str, float]:
+        """Return cache hits, misses, evictions, size and hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -29,6 +29,8 @@ class StcDevice(StcObject):
         if "objRef" not in data:
             self.set_attributes(AffiliatedPort=parent.ref)
             port = parent
+        elif parent is not None and parent.type == "port":
+            port = parent
         else:
             port = parent.get_object_by_ref(self.get_attribute("AffiliatedPort"))
 
@@ -86,6 +88,9 @@ class StcDevice(StcObject):
 class StcEmulation(StcObject):
     """Base class for all STC emulations."""
 
+    # Emulation state attribute, used to wait for steady state after commands (see StcSettlePolicy).
+    state_attribute: Optional[str] = None
+
     def command(self, command, wait_after=4, **arguments) -> None:
         """Perform emulation command."""
         self.project.command_emulations(command, wait_after, self, **arguments)
@@ -93,14 +98,17 @@ class StcEmulation(StcObject):
 
 class StcRouter(StcEmulation):
     objects_list = "RouterList"
+    state_attribute = "RouterState"
 
 
 class StcClient(StcEmulation):
     objects_list = "BlockList"
+    state_attribute = "BlockState"
 
 
 class StcServer(StcEmulation):
     objects_list = "ServerList"
+    state_attribute = "ServerState"
 
 
 class StcOseSwitch(StcEmulation):
@@ -8,7 +8,7 @@ from __future__ import annotations
 import re
 import time
 from collections import OrderedDict
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from trafficgenerator import TgnError
 from trafficgenerator.tgn_object import TgnObject
@@ -16,6 +16,9 @@ from trafficgenerator.tgn_tcl import build_obj_ref_list
 
 import testcenter
 from testcenter.api.stc_rest import StcRestWrapper
+from testcenter.api.stc_rest_async import AsyncStcRestWrapper
+from testcenter.stc_attribute_cache import StcAttributeCache
+from testcenter.stc_object_index import StcObjectsDict, indexed, is_in_subtree
 
 child_type_wo_number = re.compile(r"(.*\D+)\d+")
 
@@ -30,6 +33,25 @@ def extract_stc_obj_type_from_obj_ref(obj_ref: str) -> str:
     return match.group(1) if match else obj_ref
 
 
+def expand_specs(specs: Union[int, List[Dict[str, object]]], template: Dict[str, object], start: int = 1) -> List[dict]:
+    """Return attributes dictionary per object, template attributes overridden by the object spec attributes.
+
+    String template values are formatted with the object index so name="StreamBlock {index}" gives unique names.
+
+    :param specs: list of objects specs (attributes dictionaries) or number of objects with no specific attributes.
+    :param template: attributes common to all objects.
+    :param start: index of the first object.
+    """
+    if isinstance(specs, int):
+        specs = [{}] * specs
+    objects_attributes = []
+    for index, spec in enumerate(specs, start):
+        attributes = {k: v.format(index=index) if isinstance(v, str) else v for k, v in template.items()}
+        attributes.update(spec)
+        objects_attributes.append(attributes)
+    return objects_attributes
+
+
 class StcObject(TgnObject):
     """Base class for all STC objects."""
 
@@ -37,6 +59,12 @@ class StcObject(TgnObject):
 
     project: Optional[testcenter.stc_project.StcProject] = None
 
+    # Opt-in attributes cache, set on StcObject for all objects or on specific object instance.
+    attribute_cache: Optional[StcAttributeCache] = None
+
+    # Attribute that holds the object name, read by get_name and prefetch.
+    name_attribute = "Name"
+
     def __init__(self, parent: Union[StcObject, None], **data: str) -> None:
         if "objRef" in data:
             data["objType"] = extract_stc_obj_type_from_obj_ref(data["objRef"])
@@ -47,6 +75,21 @@ class StcObject(TgnObject):
             self.__class__ = self.get_obj_class(data["objType"])
         super().__init__(parent, **data)
 
+    def get_objects_dict(self) -> StcObjectsDict:
+        """Children objects stored in memory, {objRef: object}."""
+        return self._objects
+
+    def set_objects_dict(self, objects: dict) -> None:
+        """Replace the children objects, the replaced children are removed from the project index."""
+        old_objects = self.__dict__.get("_objects")
+        if old_objects:
+            for obj in old_objects.values():
+                old_objects.unlinked(obj)
+            old_objects.owner = None
+        self._objects = StcObjectsDict(self, objects)
+
+    objects = property(get_objects_dict, set_objects_dict)
+
     def get_obj_class(self, obj_type: str) -> StcObject:
         """Return object class if specific class else StcObject.
 
@@ -66,6 +109,33 @@ class StcObject(TgnObject):
         self._data["name"] = self._get_name(self.api.get(stc_obj, "name"), stc_obj)
         return stc_obj
 
+    def _create_objects(
+        self, obj_type: str, objects_attributes: List[Dict[str, object]], parents: Optional[List[StcObject]] = None
+    ) -> List[StcObject]:
+        """Create multiple children on STC with the fewest API calls and register them without reading them back.
+
+        :param obj_type: objects type.
+        :param objects_attributes: list of attributes dictionaries, one per object. Objects without name (or Name)
+            attribute get the name STC assigns, all these names are read with one bulk read.
+        :param parents: parent of each new object in the objects tree, if None - self.
+        """
+        parents = parents if parents else [self] * len(objects_attributes)
+        names = [next((v for k, v in a.items() if k.lower() == "name"), None) for a in objects_attributes]
+        obj_refs = self.api.create_objects(obj_type, self.ref, objects_attributes)
+        unnamed = [i for i, name in enumerate(names) if name is None]
+        if unnamed:
+            rows = self.api.get_objects([obj_refs[i] for i in unnamed], "Name")
+            for i, row in zip(unnamed, rows):
+                names[i] = row["Name"]
+        return [StcObject(parent=p, objRef=r, name=n) for p, r, n in zip(parents, obj_refs, names)]
+
+    def _next_index(self, obj_type: str) -> int:
+        """Return the index of the next object of the requested type, objects are counted in the whole project.
+
+        :param obj_type: object type.
+        """
+        return len(self.project.get_objects_by_type_in_subtree(obj_type)) + 1
+
     def command(self, command, wait_after=0, **arguments):
         rc = self.api.perform(command, **arguments)
         time.sleep(wait_after)
@@ -77,7 +147,14 @@ class StcObject(TgnObject):
         :param attribute: attribute name.
         :return: attribute value.
         """
-        return self.api.get(self.ref, attribute)
+        if self.attribute_cache is None or self.attribute_cache.is_volatile(attribute, self.ref):
+            return self.api.get(self.ref, attribute)
+        generation = self.api.generation
+        value = self.attribute_cache.get(self.ref, attribute, generation)
+        if value is None:
+            value = self.api.get(self.ref, attribute)
+            self.attribute_cache.put(self.ref, attribute, value, generation)
+        return value
 
     def get_list_attribute(self, attribute):
         """
@@ -94,32 +171,90 @@ class StcObject(TgnObject):
             objects.append(obj)
         return objects
 
+    def get_object_by_ref(self, obj_ref: str) -> Optional[StcObject]:
+        """Return the object with the requested object reference in the object branch.
+
+        Indexed objects (see StcObjectIndex) are looked up in the project index, others are searched in the tree.
+
+        :param obj_ref: requested object reference.
+        """
+        index = indexed(self)
+        if index is None:
+            return super().get_object_by_ref(obj_ref)
+        obj = index.get(obj_ref)
+        return obj if obj is not None and is_in_subtree(obj, self) else None
+
+    def get_object_by_name(self, obj_name: str) -> Optional[StcObject]:
+        """Return the first object with the requested object name in the object branch.
+
+        :param obj_name: requested object name.
+        """
+        index = indexed(self)
+        if index is None:
+            return super().get_object_by_name(obj_name)
+        return next((obj for obj in index.get_by_name(obj_name) if is_in_subtree(obj, self)), None)
+
+    def get_objects_by_type(self, *types: str) -> List[StcObject]:
+        """Return children objects stored in memory (without re-reading them from the STC).
+
+        Indexed objects with more children than project objects of the requested type are served from the index.
+
+        :param types: requested object types.
+        """
+        index = indexed(self) if len(types) == 1 else None
+        if index is None:
+            return super().get_objects_by_type(*types)
+        objects = index.get_by_type(types[0])
+        if len(objects) >= len(self.objects):
+            return super().get_objects_by_type(*types)
+        return [obj for obj in objects if self.objects.get(obj.ref) is obj]
+
+    def get_objects_by_type_in_subtree(self, *types: str) -> List[StcObject]:
+        """Return all objects of the requested types in the object branch (without the object itself).
+
+        The project objects are served from the index, other branches are searched in the tree.
+
+        :param types: requested object types.
+        """
+        if self is not self.project or indexed(self) is None:
+            return super().get_objects_by_type_in_subtree(*types)
+        return self.project.objects_index.get_by_type(*types)
+
     def append_attribute(self, attribute, value, apply_=False):
         cur_value = self.api.get(self.obj_ref(), attribute)
         attributes = {attribute: cur_value + " " + str(value)}
         self.set_attributes(apply_=apply_, **attributes)
 
-    def get_attributes(self, *attributes):
+    def get_attributes(self, *attributes: str) -> Dict[str, str]:
         """Get multiple attributes values.
 
-        Some low level APIs (like Tcl over Telnet) supports limited output length.
+        All requested attributes are read with single get request (see api.get). Some low level APIs (like Tcl over
+        Telnet) supports limited output length so the Tcl API splits long attributes lists to chunks.
         When using get_attributes() the method will use simple stc::get to read all attributes. This is efficient but
         the output might exceed the output limit and will be truncated.
-        When using attributes(*attributes) the method will use stc::get -attribute to read the attributes one by one.
-        This is less efficient but less likely to exceed the output length.
 
         :param attributes: list of attributes to retrieve. If empty (default) return all attribute values.
         :return: dictionary {attribute: value} of all requested attributes.
         """
         if not attributes:
             if isinstance(self.api, StcRestWrapper):
-                attributes = self.api.get(self.ref).split()
-            else:
-                return self.api.get(self.ref)
+                return self.api.get_objects([self.ref])[0]
+            return self.api.get(self.ref)
+        if self.attribute_cache is None:
+            return self.api.get(self.ref, list(attributes))
+        generation = self.api.generation
         values = {}
         for attribute in attributes:
-            values[attribute] = self.get_attribute(attribute)
-        return values
+            if not self.attribute_cache.is_volatile(attribute, self.ref):
+                value = self.attribute_cache.get(self.ref, attribute, generation)
+                if value is not None:
+                    values[attribute] = value
+        missing = [attribute for attribute in attributes if attribute not in values]
+        if missing:
+            for attribute, value in self.api.get(self.ref, missing).items():
+                self.attribute_cache.put(self.ref, attribute, value, generation)
+                values[attribute] = value
+        return {attribute: values[attribute] for attribute in attributes}
 
     def get_children(self, *types: str) -> List[StcObject]:
         """Get list of all children of the object.
@@ -134,18 +269,90 @@ class StcObject(TgnObject):
             children_objects.update(self._build_children_objs(child_type, output.split(" ")))
         return list(children_objects.values())
 
+    def prefetch(self, types: Optional[List[str]] = None) -> List[StcObject]:
+        """Read the object subtree into the objects tree with bulk reads, see prefetch_subtrees.
+
+        :param types: object types to read, if None - read the whole subtree.
+        """
+        return self.prefetch_subtrees([self], types)
+
+    @classmethod
+    def prefetch_subtrees(cls, objects: List[StcObject], types: Optional[List[str]] = None) -> List[StcObject]:
+        """Read the subtrees of the objects into the objects tree with one bulk read per tree level.
+
+        Children and names of all objects in the same level are read together, new objects are created without
+        reading them one by one and objects already in the tree are kept. Devices are placed under their ports so when
+        devices are requested ports are read as well.
+        Use it after load_config to pull the parts of the configuration the test works on in bulk:
+            stc.project.prefetch(types=["port", "generator", "generatorconfig", "streamblock"])
+
+        :param objects: roots of the subtrees.
+        :param types: object types to read, objects of other types and their subtrees are skipped. If None - read the
+            whole subtrees.
+        :return: the new objects.
+        """
+        types = {obj_type.lower() for obj_type in types} if types else None
+        if types and "emulateddevice" in types:
+            types.add("port")
+        new_objects = []
+        level = [(obj, False) for obj in objects]
+        visited = {id(obj) for obj in objects}
+        while level:
+            children_refs = []
+            for attributes, group in _group_by_read(level).items():
+                rows = group[0].api.get_objects([obj.ref for obj in group], *attributes)
+                for obj, row in zip(group, rows):
+                    if len(attributes) > 1:
+                        obj._set_data(name=obj._read_name(row[attributes[0]], obj.ref))
+                    children_refs.extend((obj, child_ref) for child_ref in row["children"].split())
+            level = []
+            devices = []
+            for parent, child_ref in children_refs:
+                child_type = extract_stc_obj_type_from_obj_ref(child_ref).lower()
+                if types is not None and child_type not in types:
+                    continue
+                child = parent.objects.get(child_ref)
+                if child is None and child_type == "emulateddevice" and parent.project:
+                    child = parent.project.get_object_by_ref(child_ref)
+                if child is not None:
+                    if id(child) not in visited:
+                        visited.add(id(child))
+                        level.append((child, False))
+                elif child_type == "emulateddevice" and parent.type == "project":
+                    devices.append(child_ref)
+                else:
+                    child = StcObject(parent=parent, objRef=child_ref)
+                    new_objects.append(child)
+                    visited.add(id(child))
+                    level.append((child, True))
+            if devices:
+                project = StcObject.project
+                rows = project.api.get_objects(devices, "AffiliatedPort")
+                for device_ref, row in zip(devices, rows):
+                    # Device without port in the tree reads its port itself.
+                    port = project.get_object_by_ref(row["AffiliatedPort"]) if row["AffiliatedPort"] else None
+                    device = StcObject(parent=port or project, objRef=device_ref)
+                    new_objects.append(device)
+                    visited.add(id(device))
+                    level.append((device, True))
+        return new_objects
+
     def get_all_child_types(self) -> List[str]:
         children = self.get_attribute("children").split()
         return list({m for c in children for m in child_type_wo_number.findall(c)})
 
     def set_attributes(self, apply_: bool = False, **attributes: object) -> None:
         self.api.config(self.ref, **attributes)
+        if self.attribute_cache is not None:
+            self.attribute_cache.invalidate(self.ref)
         if apply_:
             self.api.apply()
 
     def set_attributes_serializer(self, _apply, attributes):
         """Set attributes from serialized key value dictionary."""
         self.api.config(self.obj_ref(), **attributes)
+        if self.attribute_cache is not None:
+            self.attribute_cache.invalidate(self.ref)
         if _apply:
             self.api.apply()
 
@@ -169,7 +376,7 @@ class StcObject(TgnObject):
         self.del_object_from_parent()
 
     def get_name(self):
-        self._data["name"] = self._get_name(self.get_attribute("Name"), self.obj_ref())
+        self._set_data(name=self._read_name(self.get_attribute(self.name_attribute), self.obj_ref()))
         return self._data["name"]
 
     def get_active(self):
@@ -184,6 +391,36 @@ class StcObject(TgnObject):
         """Wait until sequencer is finished."""
         self.api.wait()
 
+    #
+    # Async variants of hot methods, see AsyncStcRestWrapper. REST API only.
+    #
+
+    async def aget_attribute(self, attribute: str) -> str:
+        """Get single attribute value, bypass attributes cache.
+
+        :param attribute: attribute name.
+        """
+        return await AsyncStcRestWrapper.of(self.api).get(self.ref, attribute)
+
+    async def aget_attributes(self, *attributes: str) -> Dict[str, str]:
+        """Get multiple attributes values in single request.
+
+        :param attributes: list of attributes to retrieve. If empty return all attribute values.
+        """
+        return (await AsyncStcRestWrapper.of(self.api).get_objects([self.ref], *attributes))[0]
+
+    async def aset_attributes(self, apply_: bool = False, **attributes: object) -> None:
+        async_api = AsyncStcRestWrapper.of(self.api)
+        config = async_api.config(self.ref, **attributes)
+        if apply_:
+            await async_api.apply()
+        await config
+        if self.attribute_cache is not None:
+            self.attribute_cache.invalidate(self.ref)
+
+    async def acommand(self, command: str, **arguments: object) -> dict:
+        return await AsyncStcRestWrapper.of(self.api).perform(command, **arguments)
+
     @classmethod
     def send_arp_ns(cls, *objects: StcObject) -> None:
         """Send ARP and NS for ports, devices or stream blocks."""
@@ -198,8 +435,29 @@ class StcObject(TgnObject):
             arp_table += arp_cache.get_list_attribute("ArpCacheData")
         return arp_table
 
+    def _set_data(self, **data: object) -> None:
+        old_name = self._data.get("name")
+        super()._set_data(**data)
+        if "name" in data and data["name"] != old_name and "objRef" in self._data:
+            index = indexed(self)
+            if index is not None:
+                index.rename(self, old_name)
+
+    def _read_name(self, read_name: str, obj_ref: str) -> str:
+        """Return the object name from the name attribute value read from existing object, see get_name and prefetch."""
+        return self._get_name(read_name, obj_ref)
+
     def _get_name(self, read_name, obj_ref):
         name = read_name
         if read_name.replace(" ", "").lower() == obj_ref:
             name = self.obj_parent().obj_name() + "/" + self.obj_type()
         return name
+
+
+def _group_by_read(level: List[tuple]) -> Dict[tuple, List[StcObject]]:
+    """Group prefetch level objects by the attributes to read - children and, for new objects, name."""
+    groups: Dict[tuple, List[StcObject]] = {}
+    for obj, new in level:
+        attributes = (obj.name_attribute, "children") if new else ("children",)
+        groups.setdefault(attributes, []).append(obj)
+    return groups
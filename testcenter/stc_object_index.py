@@ -0,0 +1,216 @@
+"""
+Project wide index of STC objects by reference, name and type.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from trafficgenerator.tgn_object import TgnObject
+
+
+def indexed(obj: TgnObject) -> Optional[StcObjectIndex]:
+    """Return the project index if the object is indexed, else None.
+
+    :param obj: STC object.
+    """
+    index = getattr(obj.project, "objects_index", None)
+    return index if index is not None and index.by_ref.get(obj.ref) is obj else None
+
+
+def is_in_subtree(obj: TgnObject, root: TgnObject) -> bool:
+    """Return True if the object is the root object or one of its descendants.
+
+    :param obj: STC object.
+    :param root: root object of the subtree.
+    """
+    while obj is not None:
+        if obj is root:
+            return True
+        obj = obj.parent
+    return False
+
+
+class StcObjectIndex:
+    """Index of all objects in the project objects tree by reference, by name, by (type, name) and by type.
+
+    The index is maintained incrementally by the objects dictionaries (see StcObjectsDict) so objects are indexed
+    when they are added to the tree (create, get_children, StcDevice re-parenting...) and removed with their subtree
+    when they are removed from the tree (delete, del_objects_by_type, project.objects = {} on load_config...).
+    Lookups do not depend on the tree size, each index keeps the objects in the order they were indexed.
+
+    The project index is project.objects_index:
+        stc.project.objects_index.get("streamblock1")
+        stc.project.objects_index.get_by_name("Port 1", "port")
+        stc.project.objects_index.get_by_type("emulateddevice")
+    """
+
+    def __init__(self) -> None:
+        self.by_ref: Dict[str, TgnObject] = {}
+        self.by_name: Dict[str, Dict[str, TgnObject]] = {}
+        self.by_type_name: Dict[Tuple[str, str], Dict[str, TgnObject]] = {}
+        self.by_type: Dict[str, Dict[str, TgnObject]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_ref)
+
+    def __contains__(self, obj: TgnObject) -> bool:
+        return self.by_ref.get(obj.ref) is obj
+
+    def get(self, obj_ref: str) -> Optional[TgnObject]:
+        """Return the object with the requested reference or None if the reference is not indexed.
+
+        :param obj_ref: requested object reference.
+        """
+        return self.by_ref.get(obj_ref)
+
+    def get_by_name(self, name: str, obj_type: Optional[str] = None) -> List[TgnObject]:
+        """Return all objects with the requested name.
+
+        :param name: requested object name.
+        :param obj_type: requested object type, if None - objects of all types.
+        """
+        if obj_type is None:
+            return list(self.by_name.get(name, {}).values())
+        return list(self.by_type_name.get((obj_type.lower(), name), {}).values())
+
+    def get_by_type(self, *types: str) -> List[TgnObject]:
+        """Return all objects of the requested types.
+
+        :param types: requested object types.
+        """
+        return [obj for obj_type in types for obj in self.by_type.get(obj_type.lower(), {}).values()]
+
+    def add(self, obj: TgnObject) -> None:
+        """Index object and its subtree.
+
+        Object that replaces other object with the same reference keeps its position in the indexes.
+
+        :param obj: object to index.
+        """
+        stack = [obj]
+        while stack:
+            obj = stack.pop()
+            old = self.by_ref.get(obj.ref)
+            if old is obj:
+                continue
+            if old is not None:
+                for child in old.objects.values():
+                    self.remove(child)
+                self._remove_names(old, old.name)
+                if old.type.lower() != obj.type.lower():
+                    self.by_type[old.type.lower()].pop(old.ref)
+            self.by_ref[obj.ref] = obj
+            self.by_type.setdefault(obj.type.lower(), {})[obj.ref] = obj
+            self._add_names(obj)
+            stack.extend(obj.objects.values())
+
+    def remove(self, obj: TgnObject) -> None:
+        """Remove object and its subtree from the index.
+
+        :param obj: object to remove.
+        """
+        stack = [obj]
+        while stack:
+            obj = stack.pop()
+            if self.by_ref.get(obj.ref) is not obj:
+                continue
+            del self.by_ref[obj.ref]
+            self.by_type[obj.type.lower()].pop(obj.ref)
+            self._remove_names(obj, obj.name)
+            stack.extend(obj.objects.values())
+
+    def rename(self, obj: TgnObject, old_name: str) -> None:
+        """Move indexed object from its old name to its current name.
+
+        :param obj: renamed object.
+        :param old_name: object name before the rename.
+        """
+        self._remove_names(obj, old_name)
+        self._add_names(obj)
+
+    def clear(self) -> None:
+        self.by_ref.clear()
+        self.by_name.clear()
+        self.by_type_name.clear()
+        self.by_type.clear()
+
+    def _add_names(self, obj: TgnObject) -> None:
+        self.by_name.setdefault(obj.name, {})[obj.ref] = obj
+        self.by_type_name.setdefault((obj.type.lower(), obj.name), {})[obj.ref] = obj
+
+    def _remove_names(self, obj: TgnObject, name: str) -> None:
+        for index, key in ((self.by_name, name), (self.by_type_name, (obj.type.lower(), name))):
+            objects = index.get(key)
+            if objects is not None:
+                objects.pop(obj.ref, None)
+                if not objects:
+                    del index[key]
+
+
+class StcObjectsDict(OrderedDict):
+    """Children dictionary of STC object (obj.objects) that keeps the project index up to date.
+
+    Children added to indexed object are indexed, children removed from their parent are removed from the index with
+    their subtree. Removing child from object that is not its parent (like project after StcDevice moved the device
+    to its port) only removes the link.
+    """
+
+    def __init__(self, owner: Optional[TgnObject], objects: Optional[dict] = None) -> None:
+        super().__init__()
+        self.owner = owner
+        if objects:
+            self.update(objects)
+
+    def __setitem__(self, obj_ref: str, obj: TgnObject) -> None:
+        super().__setitem__(obj_ref, obj)
+        index = self._index()
+        if index is not None:
+            index.add(obj)
+
+    def __delitem__(self, obj_ref: str) -> None:
+        obj = self[obj_ref]
+        super().__delitem__(obj_ref)
+        self.unlinked(obj)
+
+    def pop(self, obj_ref: str, *default: object) -> object:
+        if obj_ref not in self:
+            return super().pop(obj_ref, *default)
+        obj = super().pop(obj_ref)
+        self.unlinked(obj)
+        return obj
+
+    def popitem(self, last: bool = True) -> Tuple[str, TgnObject]:
+        obj_ref, obj = super().popitem(last)
+        self.unlinked(obj)
+        return obj_ref, obj
+
+    def clear(self) -> None:
+        objects = list(self.values())
+        super().clear()
+        for obj in objects:
+            self.unlinked(obj)
+
+    def setdefault(self, obj_ref: str, default: Optional[TgnObject] = None) -> TgnObject:
+        if obj_ref not in self:
+            self[obj_ref] = default
+        return self[obj_ref]
+
+    def update(self, *args: object, **kwargs: object) -> None:  # pylint: disable=arguments-differ
+        for obj_ref, obj in dict(*args, **kwargs).items():
+            self[obj_ref] = obj
+
+    def copy(self) -> OrderedDict:
+        return OrderedDict(self)
+
+    def unlinked(self, obj: TgnObject) -> None:
+        """Remove the object subtree from the index if the object was removed from its parent.
+
+        :param obj: object removed from the dictionary.
+        """
+        index = self._index()
+        if index is not None and obj.parent is self.owner:
+            index.remove(obj)
+
+    def _index(self) -> Optional[StcObjectIndex]:
+        return indexed(self.owner) if self.owner is not None else None
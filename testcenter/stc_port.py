@@ -3,14 +3,15 @@ This module implements classes and utility functions to manage STC port.
 """
 import re
 import time
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 from trafficgenerator import TgnError
 from trafficgenerator.tgn_utils import is_local_host
 
 from testcenter.stc_device import StcDevice
-from testcenter.stc_object import StcObject
+from testcenter.stc_object import StcObject, expand_specs
 from testcenter.stc_stream import StcStream
 
 
@@ -20,11 +21,19 @@ class StcPort(StcObject):
     def __init__(self, parent: Optional[StcObject], **data: str) -> None:
         data["objType"] = "port"
         super().__init__(parent, **data)
-        self.generator = self.get_child("generator")
-        self.capture = self.get_child("capture")
         self.location: str = None
         self.active_phy: StcObject = None
 
+    @cached_property
+    def generator(self) -> "StcGenerator":
+        """Port generator, read on first access (or taken from the objects tree if already read, see prefetch)."""
+        return self.get_object_or_child_by_type("generator")
+
+    @cached_property
+    def capture(self) -> "StcCapture":
+        """Port capture, read on first access."""
+        return self.get_object_or_child_by_type("capture")
+
     def get_devices(self) -> Dict[str, StcDevice]:
         """Return all devices."""
         return {o.name: o for o in self.get_objects_or_children_by_type("EmulatedDevice")}
@@ -37,6 +46,22 @@ class StcPort(StcObject):
 
     stream_blocks = property(get_stream_blocks)
 
+    def create_stream_blocks(self, specs: Union[int, List[Dict[str, object]]], **template: object) -> List[StcStream]:
+        """Create multiple stream blocks with the fewest API calls.
+
+        Unlike StcStream, each stream block is created with all its attributes (including the empty FrameConfig) in
+        one call and without reading its name back.
+
+        Usage:
+            port.create_stream_blocks(1000, name="Port 1 SB {index}", Load=10)
+
+        :param specs: list of stream blocks specific attributes or number of stream blocks.
+        :param template: attributes common to all stream blocks, string values are formatted with the stream block index
+            (counted across the project).
+        """
+        template.setdefault("FrameConfig", "")
+        return self._create_objects("StreamBlock", expand_specs(specs, template, self._next_index("StreamBlock")))
+
     def reserve(self, location=None, force=False, wait_for_up=True, timeout=40) -> None:
         """Reserve physical port.
 
@@ -85,6 +110,14 @@ class StcPort(StcObject):
         """Return port link status."""
         return self.active_phy.get_attribute("LinkStatus").lower() == "up"
 
+    async def ais_online(self) -> bool:
+        """Return port link status, async variant of is_online."""
+        return (await self.active_phy.aget_attribute("LinkStatus")).lower() == "up"
+
+    async def ais_running(self) -> bool:
+        """Return running state of the port, async variant of is_running."""
+        return await self.generator.aget_attribute("state") == "RUNNING"
+
     def is_running(self) -> bool:
         """Return running state of the port."""
         return self.generator.get_attribute("state") == "RUNNING"
@@ -153,14 +186,15 @@ class StcPort(StcObject):
     # Override inherited methods.
     #
 
-    def get_name(self) -> str:
+    def _read_name(self, read_name: str, obj_ref: str) -> str:
         """Get port name.
 
         Remove the 'offline' tag that STC adds to off lined ports..
+        Names of new ports created without name are set by the inherited _get_name.
 
         :returns: port name without the 'offline' tag added by STC.
         """
-        return re.sub(r" \(offline\)$", "", self.get_attribute("Name"))
+        return re.sub(r" \(offline\)$", "", read_name)
 
     def get_children(self, *types: str) -> List[StcObject]:
         """Get all port children including emulated devices.
@@ -184,9 +218,10 @@ class StcPort(StcObject):
 class StcGenerator(StcObject):
     """Represent STC port generator."""
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        self.config = self.get_child("GeneratorConfig")
+    @cached_property
+    def config(self) -> StcObject:
+        """GeneratorConfig object, read on first access."""
+        return self.get_object_or_child_by_type("GeneratorConfig")
 
     def get_attributes(self):
         """Get generator attribute from generatorConfig object."""
@@ -4,13 +4,19 @@ This module implements classes and utility functions to manage STC project.
 Any command that can act on list of objects (ports, devices, emulations etc.) should be implemented by StcProject.
 """
 import time
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
 
+from trafficgenerator import TgnError
 from trafficgenerator.tgn_tcl import build_obj_ref_list
+from trafficgenerator.tgn_utils import is_local_host
 
+from testcenter.api.stc_batch import StcConfigBatch
 from testcenter.stc_device import StcDevice
-from testcenter.stc_object import StcObject
+from testcenter.stc_object import StcObject, expand_specs
+from testcenter.stc_object_index import StcObjectIndex
 from testcenter.stc_port import StcPort
+from testcenter.stc_settle import StcSettlePolicy
 
 command_2_config_object = {
     "Dhcpv4Bind": "dhcpv4blockconfig",
@@ -24,16 +30,54 @@ command_2_config_object = {
 }
 
 
+GENERATOR_RUNNING_STATES = ("RUNNING", "PENDING_START", "PENDING_STOP")
+
+# Error messages (lower case) of commands the STC version does not support and of wait commands that timed out.
+UNSUPPORTED_COMMAND_ERRORS = ("invalid command", "unknown command", "no such command", "not supported", "unsupported")
+TIMEOUT_ERRORS = ("timeout", "timed out")
+
+
+def _is_error(error: Exception, messages: tuple) -> bool:
+    """Return True if the error message contains any of the messages.
+
+    :param error: exception raised by API call (TgnError, RestHttpError...).
+    :param messages: lower case messages to look for.
+    """
+    text = f"{error} {getattr(error, 'msg', '') or ''}".lower()
+    return any(message in text for message in messages)
+
+
+class StcPortReservation(NamedTuple):
+    """Reservation timeline of single port, times are seconds from the start of the reservation.
+
+    attached - AttachPorts and apply completed (same time for all ports), up - link status UP was first read, None if
+    the port did not come up or was not waited for.
+    """
+
+    port: str
+    location: str
+    attached: Optional[float]
+    up: Optional[float]
+    link_status: str
+
+
 class StcProject(StcObject):
     """Represents STC project object.
 
     StcProject serves as manager for its children - ports and devices.
     """
 
+    # Maximum time (seconds) to wait for generators steady state after GeneratorStart/Stop, see settle_policy.
     wait_for_ports = 4
+    # Maximum WaitTimeout of single GeneratorWaitForStop, longer waits are split to multiple commands.
+    max_server_wait = 60
 
     def __init__(self, parent: StcObject, **data: object) -> None:
         super().__init__(parent, objType="project", **data)
+        self.objects_index = StcObjectIndex()
+        self.objects_index.add(self)
+        self.reservations: Dict[str, StcPortReservation] = {}
+        self.settle_policy = StcSettlePolicy()
 
     def get_ports(self) -> Dict[str, StcPort]:
         """Returns all ports."""
@@ -41,10 +85,104 @@ class StcProject(StcObject):
 
     ports = property(get_ports)
 
+    @contextmanager
+    def batch(self, apply_: bool = True) -> Iterator[StcConfigBatch]:
+        """Coalesce all config writes inside the context and send them on exit, one config call per object.
+
+        Apply calls inside the context are deferred and a single apply is sent on exit.
+        Nested batches join the outer batch, apply_ of nested batch requests apply on the outer batch exit.
+        If the context exits with exception, pending writes are discarded. If a config fails on exit, the batch is
+        detached anyway and the writes that were not sent stay in batch.pending.
+
+        Usage:
+            with stc.project.batch():
+                for stream_block in stream_blocks:
+                    stream_block.set_attributes(Load=10, LoadUnit="PERCENT_LINE_RATE")
+
+        :param apply_: True - apply on exit, False - apply on exit only if apply was requested inside the context.
+        """
+        if self.api.batch:
+            self.api.batch.apply_requested |= apply_
+            yield self.api.batch
+            return
+        batch = StcConfigBatch(self.api)
+        self.api.batch = batch
+        try:
+            yield batch
+        finally:
+            self.api.batch = None
+        batch.flush()
+        if apply_ or batch.apply_requested:
+            self.api.apply()
+        self.logger.debug(f"Batch sent {batch.writes} writes in {batch.configs} config calls")
+
     #
     # Port command.
     #
 
+    def reserve_ports(
+        self,
+        locations: Union[List[str], Dict[str, str]],
+        force: bool = False,
+        timeout: float = 40,
+        wait_for_up: bool = True,
+        poll_interval: float = 0.5,
+    ) -> Dict[str, StcPortReservation]:
+        """Reserve multiple physical ports with single AttachPorts and apply and wait for all of them to come up.
+
+        Link status of all ports is read with one bulk read per poll interval.
+
+        :param locations: ports locations in the form ip/slot/port, list in the same order as the project ports or
+            dictionary {port name: location}.
+        :param force: whether to revoke existing reservations (True) or not (False).
+        :param timeout: how long (seconds) to wait for all ports to come up.
+        :param wait_for_up: True - wait for ports to come up, False - return after attach.
+        :param poll_interval: seconds between link status reads.
+        :return: reservation timeline per port name, also saved in self.reservations.
+        """
+        start = time.perf_counter()
+        if isinstance(locations, dict):
+            ports_locations = [(self.ports[name], location) for name, location in locations.items()]
+        else:
+            ports_locations = list(zip(self.ports.values(), locations))
+        with self.batch(apply_=False):
+            for port, location in ports_locations:
+                port.location = location
+                port.set_attributes(location=location)
+        ports = [port for port, location in ports_locations if not is_local_host(location)]
+        self.reservations = {port.name: StcPortReservation(port.name, port.location, None, None, "") for port in ports}
+        if not ports:
+            return self.reservations
+
+        self.api.perform("AttachPorts", PortList=build_obj_ref_list(ports), AutoConnect=True, RevokeOwner=force)
+        self.api.apply()
+        attached = time.perf_counter() - start
+        phys = self.api.get_objects([port.ref for port in ports], "activephy-Targets")
+        for port, phy in zip(ports, phys):
+            port.active_phy = StcObject(parent=port, objRef=phy["activephy-Targets"])
+            self.reservations[port.name] = self.reservations[port.name]._replace(attached=attached)
+        if not wait_for_up:
+            return self.reservations
+
+        pending = ports
+        deadline = start + timeout
+        while True:
+            link_states = self.api.get_objects([port.active_phy.ref for port in pending], "LinkStatus")
+            now = time.perf_counter() - start
+            for port, link_state in zip(pending, link_states):
+                up = now if link_state["LinkStatus"].upper() == "UP" else None
+                self.reservations[port.name] = self.reservations[port.name]._replace(
+                    up=up, link_status=link_state["LinkStatus"]
+                )
+            pending = [port for port in pending if self.reservations[port.name].up is None]
+            if not pending:
+                self.logger.debug(f"Reserved {len(ports)} ports in {now:.3f} seconds")
+                return self.reservations
+            if time.perf_counter() > deadline:
+                states = {port.name: self.reservations[port.name].link_status for port in pending}
+                raise TgnError(f"Ports failed to reach state UP after {timeout} seconds, ports states {states}")
+            time.sleep(poll_interval)
+
     def start_ports(self, blocking=False, *ports):
         """Start traffic on ports.
 
@@ -63,14 +201,59 @@ class StcProject(StcObject):
         """
         self._command_generator("GeneratorStop", *ports)
 
-    def wait_traffic(self, *ports):
-        """Wait for traffic end on ports.
+    def wait_traffic(
+        self,
+        *ports: StcPort,
+        timeout: Optional[float] = None,
+        server_wait: bool = True,
+        min_interval: float = 0.02,
+        max_interval: float = 0.5,
+    ) -> float:
+        """Wait for traffic end on all ports together and return as soon as the last port stops.
+
+        The wait runs on STC with GeneratorWaitForStop, one command per max_server_wait seconds. If the command is not
+        supported, or server_wait is False, the states of all generators are polled with one bulk read per poll,
+        starting with short poll interval and doubling it up to max_interval. Other command errors are raised.
 
         :param ports: list of ports to wait for, if empty wait for all ports.
+        :param timeout: how long (seconds) to wait for traffic end before raising TgnError, None - wait forever.
+        :param server_wait: True - wait on STC, False - poll generators states.
+        :param min_interval: first poll interval in seconds.
+        :param max_interval: maximum poll interval in seconds.
+        :return: seconds until the last port stopped.
         """
-        for port in self._get_ports(*ports):
-            while port.is_running():
-                time.sleep(1)
+        start = time.perf_counter()
+        generators = self._get_generators(*ports)
+        running = self._running_generators(generators)
+        while server_wait and running:
+            remaining = timeout - (time.perf_counter() - start) if timeout is not None else self.max_server_wait
+            if remaining <= 0:
+                break
+            try:
+                self.api.perform(
+                    "GeneratorWaitForStop",
+                    GeneratorList=build_obj_ref_list(running),
+                    WaitTimeout=max(1, min(int(remaining), self.max_server_wait)),
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                if _is_error(error, UNSUPPORTED_COMMAND_ERRORS):
+                    self.logger.debug(f"GeneratorWaitForStop not supported ({error}), poll generators states")
+                    server_wait = False
+                elif _is_error(error, TIMEOUT_ERRORS):
+                    self.logger.debug(f"GeneratorWaitForStop timed out ({error}), wait again")
+                else:
+                    raise
+            running = self._running_generators(running)
+        interval = min_interval
+        while running:
+            if timeout is not None and time.perf_counter() - start > timeout:
+                break
+            time.sleep(interval)
+            interval = min(interval * 2, max_interval)
+            running = self._running_generators(running)
+        if running:
+            raise TgnError(f"Traffic did not end after {timeout} seconds on {build_obj_ref_list(running)}")
+        return time.perf_counter() - start
 
     def clear_results(self, *ports):
         """Clear emulations and traffic results on ports.
@@ -79,7 +262,7 @@ class StcProject(StcObject):
         """
         self.api.perform("ResultsClearAllCommand", PortList=build_obj_ref_list(self._get_ports(*ports)))
         self.api.perform("ResultsClearAllProtocolCommand")
-        time.sleep(1)
+        self.settle_policy.settle("ResultsClearAllCommand", [], 1)
 
     #
     # Device command.
@@ -95,6 +278,28 @@ class StcProject(StcObject):
             devices.extend(port.get_children("emulateddevice"))
         return devices
 
+    def create_devices(self, specs: Union[int, List[Dict[str, object]]], **template: object) -> List[StcDevice]:
+        """Create multiple emulated devices with the fewest API calls.
+
+        Each device is created under the project with its AffiliatedPort and all other attributes in one call and is
+        registered under its port without reading it back.
+
+        Usage:
+            stc.project.create_devices([{"port": port_1}, {"port": port_2}], name="Device {index}", DeviceCount=10)
+
+        :param specs: list of devices specific attributes or number of devices. The port attribute (StcPort) of each
+            device, or of the template, is the device port.
+        :param template: attributes common to all devices, string values are formatted with the device index (counted
+            across the project).
+        """
+        objects_attributes = expand_specs(specs, template, self._next_index("EmulatedDevice"))
+        if any("port" not in attributes for attributes in objects_attributes):
+            raise TgnError("Each device must have port, set port in the template or in each device spec")
+        ports = [attributes.pop("port") for attributes in objects_attributes]
+        for attributes, port in zip(objects_attributes, ports):
+            attributes["AffiliatedPort"] = port.ref
+        return self._create_objects("EmulatedDevice", objects_attributes, ports)
+
     def get_emulations(self, emulation, *ports):
         """Returns list of requested emulations for the given ports.
 
@@ -110,12 +315,14 @@ class StcProject(StcObject):
         """Perform device command on list of devices.
 
         :param command: requested command.
-        :param wait_after: time to wait after command execution in seconds.
+        :param wait_after: maximum time to wait for steady state after command execution in seconds.
         :param devices: list of devices to act on. If list is empty - perform on all devices.
         :param arguments: additional optional arguments per requested command.
         """
-        arguments["DeviceList"] = build_obj_ref_list(self._get_devices(*devices))
-        self.command(command, wait_after, **arguments)
+        devices = self._get_devices(*devices)
+        arguments["DeviceList"] = build_obj_ref_list(devices)
+        self.command(command, **arguments)
+        self.settle_policy.settle(command, devices, wait_after)
 
     def command_device_emulations(self, command, wait_after=4, *devices, **arguments):
         """Perform emulation command on list of devices.
@@ -124,7 +331,7 @@ class StcProject(StcObject):
         For emulation start/stop use start_emulation and stop_emulation accordingly.
 
         :param command: requested command.
-        :param wait_after: time to wait after command execution in seconds.
+        :param wait_after: maximum time to wait for steady state after command execution in seconds.
         :param devices: list of devices to act on. If list is empty - perform on all devices.
         :param arguments: additional optional arguments per requested command.
         """
@@ -144,28 +351,28 @@ class StcProject(StcObject):
         For emulation start/stop use start_emulation and stop_emulation accordingly.
 
         :param command: requested command.
-        :param wait_after: time to wait after command execution in seconds.
+        :param wait_after: maximum time to wait for steady state after command execution in seconds.
         :param emulations: list of emulations to act on.
         :param arguments: additional optional arguments per requested command.
         """
         arguments[emulations[0].objects_list] = build_obj_ref_list(emulations)
-        self._command_emulations(command, wait_after, **arguments)
+        self._command_emulations(command, wait_after, emulations, **arguments)
 
     def start_emulations(self, emulations, wait_after=4):
         """Start emulations.
 
         :param emulations: list of emulations to act on.
-        :param wait_after: time to wait after command execution in seconds.
+        :param wait_after: maximum time to wait for steady state after command execution in seconds.
         """
-        self._command_emulations("ProtocolStart", wait_after, ProtocolList=build_obj_ref_list(emulations))
+        self._command_emulations("ProtocolStart", wait_after, emulations, ProtocolList=build_obj_ref_list(emulations))
 
     def stop_emulations(self, emulations, wait_after=4):
         """Start emulations.
 
         :param emulations: list of emulations to act on.
-        :param wait_after: time to wait after command execution in seconds.
+        :param wait_after: maximum time to wait for steady state after command execution in seconds.
         """
-        self._command_emulations("ProtocolStop", wait_after, ProtocolList=build_obj_ref_list(emulations))
+        self._command_emulations("ProtocolStop", wait_after, emulations, ProtocolList=build_obj_ref_list(emulations))
 
     def get_stream_blocks(self) -> dict:
         """Return all stream blocks in the configuration."""
@@ -184,16 +391,27 @@ class StcProject(StcObject):
     def _get_devices(self, *devices):
         return devices if devices else self.get_devices()
 
-    def _command_emulations(self, command, wait_after, **arguments):
+    def _command_emulations(self, command, wait_after, emulations, **arguments):
         self.command(command, **arguments)
-        time.sleep(wait_after)
+        self.settle_policy.settle(command, emulations, wait_after)
+
+    def _running_generators(self, generators: List[StcObject]) -> List[StcObject]:
+        """Return the generators that did not stop yet, all states are read with one bulk read."""
+        if not generators:
+            return []
+        states = self.api.get_objects([generator.ref for generator in generators], "State")
+        return [generator for generator, state in zip(generators, states) if state["State"] in GENERATOR_RUNNING_STATES]
+
+    def _get_generators(self, *ports: StcPort) -> List[StcObject]:
+        """Return the generators of the ports, generators that were not read yet are read with one bulk read."""
+        ports = self._get_ports(*ports)
+        StcObject.prefetch_subtrees([port for port in ports if not port.get_objects_by_type("generator")], ["generator"])
+        return [generator for port in ports for generator in port.get_objects_by_type("generator")]
 
     def _command_generator(self, command, *ports):
-        generators = []
-        for port in self._get_ports(*ports):
-            generators.extend(port.get_objects_by_type("generator"))
+        generators = self._get_generators(*ports)
         self.api.perform(command, GeneratorList=build_obj_ref_list(generators))
-        time.sleep(self.wait_for_ports)
+        self.settle_policy.settle(command, generators, self.wait_for_ports)
 
 
 class StcIpGroup(StcObject):
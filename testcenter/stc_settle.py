@@ -0,0 +1,219 @@
+"""
+Settle policy - how long to wait after STC commands before the objects they act on are ready.
+"""
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+from testcenter.stc_object import StcObject, extract_stc_obj_type_from_obj_ref
+
+# Emulations state values (RouterState, BlockState, ServerState...) after start and after stop commands complete.
+EMULATION_STARTED_STATES = ("BOUND", "UP", "ESTABLISHED", "FULL")
+EMULATION_STOPPED_STATES = ("IDLE", "NONE")
+
+
+def is_emulation_started(state: str) -> bool:
+    """Return True if the emulation reached started state (DHCP client bound, server up, BGP session established...).
+
+    :param state: emulation state attribute value.
+    """
+    return state.upper() in EMULATION_STARTED_STATES
+
+
+def is_emulation_stopped(state: str) -> bool:
+    """Return True if the emulation reached stopped state.
+
+    :param state: emulation state attribute value.
+    """
+    return state.upper() in EMULATION_STOPPED_STATES
+
+
+def is_generator_started(state: str) -> bool:
+    """Return True if the generator started.
+
+    Generator that is still STOPPED right after GeneratorStart did not start yet, see StcSettlePolicy.
+
+    :param state: generator State attribute value.
+    """
+    return state.upper() not in ("STOPPED", "PENDING_START", "STARTING")
+
+
+def is_generator_stopped(state: str) -> bool:
+    """Return True if the generator is not running.
+
+    :param state: generator State attribute value.
+    """
+    return state.upper() not in ("RUNNING", "PENDING_START", "PENDING_STOP", "STOPPING")
+
+
+# {command: state check} for commands that act on generators.
+command_2_generator_check: Dict[str, Callable[[str], bool]] = {
+    "generatorstart": is_generator_started,
+    "generatorstop": is_generator_stopped,
+}
+
+# {command: state check} for commands that act on devices and emulations, the check is applied to the emulations
+# state_attribute.
+command_2_emulation_check: Dict[str, Callable[[str], bool]] = {
+    "devicestart": is_emulation_started,
+    "protocolstart": is_emulation_started,
+    "dhcpv4bind": is_emulation_started,
+    "dhcpv4startserver": is_emulation_started,
+    "dhcpv6bind": is_emulation_started,
+    "dhcpv6startserver": is_emulation_started,
+    "devicestop": is_emulation_stopped,
+    "protocolstop": is_emulation_stopped,
+    "dhcpv4release": is_emulation_stopped,
+    "dhcpv4stopserver": is_emulation_stopped,
+    "dhcpv6release": is_emulation_stopped,
+    "dhcpv6stopserver": is_emulation_stopped,
+}
+
+
+class StcSettleTiming(NamedTuple):
+    """Settle time of single command.
+
+    waited - seconds waited, settled - True if all objects reached steady state, False if the wait ended with the
+    fixed delay or the timeout.
+    """
+
+    command: str
+    objects: int
+    waited: float
+    settled: bool
+
+
+class StcSettlePolicy:
+    """Wait after commands until the objects they act on reach steady state instead of sleeping fixed time.
+
+    Generators are ready when their State was observed started (after start) or not running (after stop), emulations
+    (routers, clients, servers) are ready when their state attribute (RouterState, BlockState...) reached the target
+    state of the command (BOUND, UP, ESTABLISHED, FULL after start, IDLE or NONE after stop), devices are ready when
+    all their emulations are ready. Device emulations are taken from the objects tree, if there
+    are none in the tree (e.g. after load_config) the emulations are read with one bulk read of the devices children.
+    States of objects that are not ready yet are read with one bulk read per poll, starting with short poll interval
+    and doubling it up to max_interval. Generators that run shorter than the poll interval may never be observed
+    started, then the wait ends with the timeout.
+    Commands without state check (e.g. ResultsClearAllCommand or emulation specific commands not in
+    command_2_emulation_check), objects without emulations and all commands in fixed mode wait the fixed delay.
+    The readiness wait never exceeds the fixed delay unless longer timeout is configured for the command.
+
+    The policy is per project (project.settle_policy), configure it to tune the waits:
+        stc.project.settle_policy = StcSettlePolicy(delays={"DeviceStart": 2}, timeouts={"ProtocolStart": 30})
+    """
+
+    def __init__(
+        self,
+        adaptive: bool = True,
+        delays: Optional[Dict[str, float]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        min_interval: float = 0.02,
+        max_interval: float = 0.5,
+        max_timings: int = 1024,
+    ) -> None:
+        """Create settle policy.
+
+        :param adaptive: True - wait for steady state, False - always wait the fixed delay.
+        :param delays: {command: seconds} fixed delays that override the callers default delays.
+        :param timeouts: {command: seconds} maximum readiness waits, default - the fixed delay.
+        :param min_interval: first poll interval in seconds.
+        :param max_interval: maximum poll interval in seconds.
+        :param max_timings: number of latest settle timings to keep.
+        """
+        self.adaptive = adaptive
+        self.delays = {command.lower(): delay for command, delay in (delays or {}).items()}
+        self.timeouts = {command.lower(): timeout for command, timeout in (timeouts or {}).items()}
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timings: Deque[StcSettleTiming] = deque(maxlen=max_timings)
+
+    def settle(self, command: str, objects: List[StcObject], delay: float) -> StcSettleTiming:
+        """Wait until the objects the command acted on are ready.
+
+        :param command: performed command.
+        :param objects: objects the command acted on (generators, devices or emulations).
+        :param delay: default fixed delay in seconds, as used before adaptive settling.
+        """
+        start = time.perf_counter()
+        delay = self.delays.get(command.lower(), delay)
+        checks = self._checks(command, objects) if self.adaptive else []
+        settled = False
+        if checks:
+            timeout = self.timeouts.get(command.lower(), delay)
+            interval = self.min_interval
+            while True:
+                checks = [check for check in (self._not_ready(check) for check in checks) if check[1]]
+                if not checks:
+                    settled = True
+                    break
+                if time.perf_counter() - start + interval > timeout:
+                    break
+                time.sleep(interval)
+                interval = min(interval * 2, self.max_interval)
+        else:
+            time.sleep(delay)
+        timing = StcSettleTiming(command, len(objects), time.perf_counter() - start, settled)
+        self.timings.append(timing)
+        return timing
+
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        """Return number of waits, settled waits, average and maximum wait time per command."""
+        statistics: Dict[str, Dict[str, float]] = {}
+        for timing in self.timings:
+            command = statistics.setdefault(timing.command, {"count": 0, "settled": 0, "total_time": 0.0, "max_time": 0.0})
+            command["count"] += 1
+            command["settled"] += timing.settled
+            command["total_time"] += timing.waited
+            command["max_time"] = max(command["max_time"], timing.waited)
+        for command in statistics.values():
+            command["average_time"] = command["total_time"] / command["count"]
+        return statistics
+
+    @staticmethod
+    def _checks(command: str, objects: List[StcObject]) -> List[tuple]:
+        """Return list of (api, objects references, state attribute, state check), one per state attribute."""
+        generator_check = command_2_generator_check.get(command.lower())
+        if generator_check:
+            generators = [obj.ref for obj in objects if obj.type == "generator"]
+            return [(objects[0].api, generators, "State", generator_check)] if generators else []
+        emulation_check = command_2_emulation_check.get(command.lower())
+        if not emulation_check:
+            return []
+        attribute_2_refs: Dict[str, List[str]] = {}
+        for obj in _emulations(objects):
+            attribute_2_refs.setdefault(obj.state_attribute, []).append(obj.ref)
+        devices = [obj for obj in objects if obj.type.lower() == "emulateddevice"]
+        if not attribute_2_refs and devices:
+            attribute_2_refs = _devices_emulations(devices)
+        return [(objects[0].api, refs, attribute, emulation_check) for attribute, refs in attribute_2_refs.items()]
+
+    @staticmethod
+    def _not_ready(check: tuple) -> tuple:
+        """Return the check with the objects that are not ready yet."""
+        api, refs, attribute, check_state = check
+        states = api.get_objects(refs, attribute)
+        return api, [ref for ref, state in zip(refs, states) if not check_state(state[attribute])], attribute, check_state
+
+
+def _emulations(objects: List[StcObject]) -> List[StcObject]:
+    """Return the objects and the objects descendants (in the objects tree) that have state attribute."""
+    emulations = []
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if getattr(obj, "state_attribute", None):
+            emulations.append(obj)
+        stack.extend(obj.objects.values())
+    return emulations
+
+
+def _devices_emulations(devices: List[StcObject]) -> Dict[str, List[str]]:
+    """Read the devices children and return {state attribute: emulations references}."""
+    attribute_2_refs: Dict[str, List[str]] = {}
+    for row in devices[0].api.get_objects([device.ref for device in devices], "children"):
+        for child_ref in row["children"].split():
+            child_class = StcObject.str_2_class.get(extract_stc_obj_type_from_obj_ref(child_ref).lower())
+            state_attribute = getattr(child_class, "state_attribute", None)
+            if state_attribute:
+                attribute_2_refs.setdefault(state_attribute, []).append(child_ref)
+    return attribute_2_refs
@@ -0,0 +1,174 @@
+"""
+Streaming export of STC statistics snapshots to disk.
+"""
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from trafficgenerator import TgnError
+
+from testcenter.stc_statistics_snapshot import StcStatsSnapshot, np
+
+# PyArrow is required only for Arrow IPC and Parquet export, CSV export does not require it.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ModuleNotFoundError:
+    pa = None
+    pq = None
+
+suffix_2_format = {".arrow": "arrow", ".ipc": "arrow", ".feather": "arrow", ".parquet": "parquet", ".csv": "csv"}
+
+
+class StcStatsExporter:
+    """Append statistics snapshots to chunked file as they are read, so memory stays flat during long runs.
+
+    Supported formats:
+    arrow - Arrow IPC file, one record batch per chunk, can be read with memory mapping (see open_export).
+    parquet - Parquet file, one row group per chunk.
+    csv - CSV file, does not require pyarrow.
+
+    The file schema is taken from the first snapshot - timestamp column followed by the view columns. Columns missing
+    in later snapshots are written as nulls and new columns are ignored. Values of later snapshots are cast to the file
+    schema, values that cannot be cast (e.g. after the view schema promoted int64 column to float64 or string) are
+    written as nulls and counted in invalid_values.
+
+    Usage:
+        with StcStatsExporter("rx_streams.arrow") as exporter:
+            while running:
+                exporter.append(stats.read_snapshot())
+    """
+
+    def __init__(self, path: Union[str, Path], fmt: Optional[str] = None, chunk_rows: int = 4096) -> None:
+        """Create exporter, the file is created on first append.
+
+        :param path: output file path.
+        :param fmt: arrow, parquet or csv. If None, format is taken from the path suffix.
+        :param chunk_rows: number of rows to buffer before writing chunk to disk.
+        """
+        self.path = Path(path)
+        self.fmt = fmt if fmt else suffix_2_format.get(self.path.suffix.lower())
+        if self.fmt not in ("arrow", "parquet", "csv"):
+            raise TgnError(f"Unsupported statistics export format {self.fmt} for {self.path}")
+        if self.fmt != "csv" and pa is None:
+            raise TgnError(f"{self.fmt} export requires pyarrow, install it with 'pip install pytestcenter[export]'")
+        self.chunk_rows = chunk_rows
+        self.columns: List[str] = []
+        self.rows = 0
+        self.invalid_values: Dict[str, int] = {}
+        self._dtypes: Dict[str, str] = {}
+        self._chunk: Dict[str, list] = {}
+        self._chunk_rows = 0
+        self._schema = None
+        self._writer = None
+        self._file = None
+
+    def __enter__(self) -> StcStatsExporter:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def append(self, snapshot: StcStatsSnapshot) -> None:
+        """Append snapshot rows to the current chunk and write the chunk if it is full.
+
+        :param snapshot: snapshot to append.
+        """
+        if not self.columns:
+            self._open(snapshot)
+        num_rows = len(snapshot)
+        self._chunk["timestamp"].append(np.full(num_rows, snapshot.timestamp))
+        for column in self.columns[1:]:
+            if column in snapshot:
+                self._chunk[column].append(snapshot[column])
+            else:
+                self._chunk[column].append(np.full(num_rows, None, dtype=object))
+        self._chunk_rows += num_rows
+        if self._chunk_rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the current chunk to disk."""
+        if not self._chunk_rows:
+            return
+        if self.fmt == "csv":
+            columns = [[v for values in self._chunk[c] for v in self._csv_column(values)] for c in self.columns]
+            csv.writer(self._file).writerows(zip(*columns))
+            self._file.flush()
+        else:
+            columns = [pa.concat_arrays([self._arrow_column(c, values) for values in self._chunk[c]]) for c in self.columns]
+            batch = pa.RecordBatch.from_arrays(columns, schema=self._schema)
+            if self.fmt == "arrow":
+                self._writer.write_batch(batch)
+            else:
+                self._writer.write_table(pa.Table.from_batches([batch]))
+        self.rows += self._chunk_rows
+        self._chunk = {column: [] for column in self.columns}
+        self._chunk_rows = 0
+
+    def close(self) -> None:
+        """Write the last chunk and close the file."""
+        self.flush()
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _open(self, snapshot: StcStatsSnapshot) -> None:
+        self.columns = ["timestamp"] + list(snapshot.columns)
+        self._dtypes = {"timestamp": "f"}
+        self._dtypes.update({column: values.dtype.kind for column, values in snapshot.columns.items()})
+        self._chunk = {column: [] for column in self.columns}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "csv":
+            self._file = open(self.path, "w", newline="")  # pylint: disable=consider-using-with
+            csv.writer(self._file).writerow(self.columns)
+            return
+        kind_2_type = {"i": pa.int64(), "u": pa.int64(), "f": pa.float64(), "M": pa.timestamp("us")}
+        self._schema = pa.schema([(c, kind_2_type.get(self._dtypes[c], pa.string())) for c in self.columns])
+        if self.fmt == "arrow":
+            self._file = pa.OSFile(self.path.as_posix(), "wb")
+            self._writer = pa.ipc.new_file(self._file, self._schema)
+        else:
+            self._writer = pq.ParquetWriter(self.path.as_posix(), self._schema)
+
+    def _arrow_column(self, column: str, values: np.ndarray) -> pa.Array:
+        field_type = self._schema.field(column).type
+        if values.dtype == object:
+            array = pa.array(values.tolist())
+        else:
+            array = pa.array(np.ma.getdata(values), mask=np.ma.getmaskarray(values) if np.ma.isMaskedArray(values) else None)
+        try:
+            return array.cast(field_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+        cast_values = []
+        for value in array.to_pylist():
+            try:
+                cast_values.append(pa.scalar(value).cast(field_type).as_py() if value is not None else None)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                cast_values.append(None)
+                self.invalid_values[column] = self.invalid_values.get(column, 0) + 1
+        return pa.array(cast_values, type=field_type)
+
+    @staticmethod
+    def _csv_column(values: np.ndarray) -> list:
+        # Masked (null) values of masked arrays are None.
+        return ["" if v is None else v for v in values.tolist()]
+
+
+def open_export(path: Union[str, Path]) -> pa.Table:
+    """Open exported Arrow IPC file with memory mapping, or Parquet file, and return it as Arrow table.
+
+    :param path: exported file path.
+    """
+    if pa is None:
+        raise TgnError("Reading statistics export requires pyarrow, install it with 'pip install pytestcenter[export]'")
+    path = Path(path)
+    if suffix_2_format.get(path.suffix.lower()) == "parquet":
+        return pq.read_table(path.as_posix(), memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path.as_posix(), "r")).read_all()
@@ -0,0 +1,86 @@
+"""
+Incremental polling of STC statistics views.
+"""
+from typing import Dict, Optional
+
+from testcenter.stc_statistics_snapshot import StcStatsSnapshot, np
+from testcenter.stc_statistics_view import StcStats
+
+
+class StcStatsDelta:
+    """Changes between two consecutive polls of statistics view.
+
+    changed - {object ID: {counter: delta}} only for objects and counters that changed since the previous poll.
+    rates - {object ID: {counter: per second rate}} for changed cumulative counters (counters named *Count).
+        For octet counters (*OctetCount) the bits per second rate is added as *BitRate.
+    """
+
+    def __init__(self, snapshot: StcStatsSnapshot, interval: Optional[float]) -> None:
+        """Create empty delta.
+
+        :param snapshot: current snapshot.
+        :param interval: seconds since the previous poll, None for the first poll.
+        """
+        self.snapshot = snapshot
+        self.interval = interval
+        self.changed: Dict[str, Dict[str, object]] = {}
+        self.rates: Dict[str, Dict[str, float]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.changed)
+
+
+class StcStatsPoller:
+    """Poll statistics view and report only what changed since the previous poll.
+
+    The poller keeps the previous snapshot, on each poll it diffs the new snapshot against it in one vectorized pass and
+    builds Python values only for rows and counters that actually changed.
+    """
+
+    def __init__(self, stats: StcStats, obj_id_stat: Optional[str] = "topLevelName") -> None:
+        """Create poller for subscribed statistics view.
+
+        :param stats: subscribed statistics view (N/A for custom views).
+        :param obj_id_stat: which statistics name to use as object ID.
+        """
+        self.stats = stats
+        self.obj_id_stat = obj_id_stat
+        self.snapshot: StcStatsSnapshot = None
+
+    def poll(self) -> StcStatsDelta:
+        """Read the statistics view and return the changes since the previous poll.
+
+        On first poll all counters values are reported as changed (delta from zero) and no rates are calculated.
+        """
+        previous = self.snapshot
+        self.snapshot = self.stats.read_snapshot(self.obj_id_stat)
+        if previous is None:
+            delta = StcStatsDelta(self.snapshot, None)
+            for name in self.snapshot.names.tolist():
+                row = self.snapshot.row(name)
+                delta.changed[name] = {counter: row[counter] for counter in self.snapshot.counters()}
+            return delta
+
+        interval = self.snapshot.timestamp - previous.timestamp
+        delta = StcStatsDelta(self.snapshot, interval)
+        diff = self.snapshot.diff(previous)
+        for counter in diff.counters():
+            values = diff[counter]
+            # Null counters (masked integers, NaN floats) are not changes.
+            changed = np.ma.filled(values != 0, False)
+            if values.dtype.kind == "f":
+                changed &= ~np.isnan(np.ma.getdata(values))
+            for i in changed.nonzero()[0]:
+                name = diff.names[i].item()
+                value = values[i].item()
+                delta.changed.setdefault(name, {})[counter] = value
+                if interval > 0 and counter.endswith("Count"):
+                    rates = delta.rates.setdefault(name, {})
+                    rates[counter] = value / interval
+                    if counter.endswith("OctetCount"):
+                        rates[counter[: -len("OctetCount")] + "BitRate"] = value * 8 / interval
+        return delta
+
+    def reset(self) -> None:
+        """Forget the previous snapshot so the next poll is treated as first poll (e.g. after clear results)."""
+        self.snapshot = None
@@ -0,0 +1,179 @@
+"""
+Background sampling of STC statistics views.
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from trafficgenerator import TgnError
+
+from testcenter.api.stc_tcl import StcTclWrapper
+from testcenter.stc_object import StcObject
+from testcenter.stc_statistics_snapshot import StcStatsSnapshot
+from testcenter.stc_statistics_view import StcStats
+
+
+class StcStatsRingBuffer:
+    """Fixed size ring buffer of statistics snapshots.
+
+    The buffer slots are preallocated and hold references to the snapshots (each snapshot owns its arrays). When the
+    buffer is full, new snapshots overwrite the oldest ones so memory stays bounded regardless of run length.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Preallocate buffer slots.
+
+        :param capacity: maximum number of snapshots to keep.
+        """
+        self.capacity = capacity
+        self.dropped = 0
+        self._slots: List[Optional[StcStatsSnapshot]] = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, snapshot: StcStatsSnapshot) -> None:
+        """Add snapshot, overwrite the oldest snapshot if the buffer is full.
+
+        :param snapshot: snapshot to add.
+        """
+        with self._lock:
+            self._slots[(self._head + self._count) % self.capacity] = snapshot
+            if self._count < self.capacity:
+                self._count += 1
+            else:
+                self._head = (self._head + 1) % self.capacity
+                self.dropped += 1
+
+    def snapshots(self) -> List[StcStatsSnapshot]:
+        """Return all snapshots in the buffer, oldest first, without removing them."""
+        with self._lock:
+            return [self._slots[(self._head + i) % self.capacity] for i in range(self._count)]
+
+    def latest(self) -> Optional[StcStatsSnapshot]:
+        """Return the newest snapshot or None if the buffer is empty."""
+        with self._lock:
+            return self._slots[(self._head + self._count - 1) % self.capacity] if self._count else None
+
+    def drain(self) -> List[StcStatsSnapshot]:
+        """Remove and return all snapshots in the buffer, oldest first."""
+        with self._lock:
+            snapshots = [self._slots[(self._head + i) % self.capacity] for i in range(self._count)]
+            self._slots = [None] * self.capacity
+            self._head = 0
+            self._count = 0
+            return snapshots
+
+
+class StcStatsSampler:
+    """Sample statistics view on background thread at fixed interval.
+
+    The first sample is taken synchronously by start() so all results parents and objects are resolved on the caller
+    thread, the background thread only reads the view and does not modify the objects tree. The background thread
+    reads on its own joined API session so it does not share the caller session state (write batch, command_rc,
+    generation) with the calls of the caller thread. The joined session is closed (without terminating the test
+    session) when the sampler stops.
+    The sampler owns its StcStats object, do not read the same StcStats from other threads while the sampler is running.
+    Background sampling is supported for REST API only - Tcl interpreter can be accessed only from the thread that
+    created it.
+
+    Usage:
+        sampler = StcStatsSampler(StcStats("generatorportresults"), interval=1, capacity=12 * 3600)
+        sampler.start()
+        stc.start_traffic(blocking=True)
+        sampler.stop()
+        snapshots = sampler.drain()
+    """
+
+    def __init__(
+        self, stats: StcStats, interval: float = 1, capacity: int = 3600, obj_id_stat: Optional[str] = "topLevelName"
+    ) -> None:
+        """Create sampler for subscribed statistics view.
+
+        :param stats: subscribed statistics view (N/A for custom views).
+        :param interval: sampling interval in seconds.
+        :param capacity: ring buffer capacity (number of snapshots).
+        :param obj_id_stat: which statistics name to use as object ID.
+        """
+        if isinstance(StcObject.project.api, StcTclWrapper):
+            raise TgnError("Background statistics sampling is not supported over Tcl API")
+        self.stats = stats
+        self.interval = interval
+        self.obj_id_stat = obj_id_stat
+        self.buffer = StcStatsRingBuffer(capacity)
+        self.errors: Deque[Exception] = deque(maxlen=64)
+        self.overruns = 0
+        self._objects_by_name = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._api = None
+        self._api_lock = threading.Lock()
+
+    def is_running(self) -> bool:
+        """Return True if the sampling thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Take first sample and start sampling thread."""
+        if self.is_running():
+            raise TgnError("Sampler is already running")
+        snapshot = self.stats.read_snapshot(self.obj_id_stat)
+        self._objects_by_name = dict(zip(snapshot.names.tolist(), snapshot.objects))
+        self.buffer.append(snapshot)
+        self._api = StcObject.project.api.join()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"StcStatsSampler-{self.stats.rds.ref}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop sampling thread and wait for it to finish the current sample.
+
+        :param timeout: how long (seconds) to wait for the thread, None - wait forever.
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                raise TgnError(f"Sampler did not stop after {timeout} seconds")
+            self._thread = None
+        self._close_api()
+
+    def drain(self) -> List[StcStatsSnapshot]:
+        """Remove and return all sampled snapshots, oldest first. Can be called while the sampler is running."""
+        return self.buffer.drain()
+
+    def _close_api(self) -> None:
+        """Close the joined API session, only the first call (stop or sampling thread exit) closes it."""
+        with self._api_lock:
+            api, self._api = self._api, None
+        if api is not None:
+            api.disconnect(False)
+
+    def _run(self) -> None:
+        try:
+            self._sample(self._api)
+        finally:
+            self._close_api()
+
+    def _sample(self, api: object) -> None:
+        next_sample = time.monotonic() + self.interval
+        while not self._stop_event.wait(max(0.0, next_sample - time.monotonic())):
+            try:
+                table = self.stats.read_table(api)
+                snapshot = StcStatsSnapshot.from_table(
+                    table, self.obj_id_stat, objects_by_name=self._objects_by_name, schema=self.stats.schema
+                )
+                self.buffer.append(snapshot)
+            except Exception as error:  # pylint: disable=broad-except
+                self.stats.rds.logger.warning(f"Statistics sample failed: {error}")
+                self.errors.append(error)
+            next_sample += self.interval
+            # If sampling took longer than interval skip the missed samples instead of sampling back to back.
+            if next_sample < time.monotonic():
+                missed = int((time.monotonic() - next_sample) // self.interval) + 1
+                self.overruns += missed
+                next_sample += missed * self.interval
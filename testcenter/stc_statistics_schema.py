@@ -0,0 +1,158 @@
+"""
+Typed schemas of STC statistics views.
+"""
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+INT64 = "int64"
+FLOAT64 = "float64"
+STRING = "string"
+TIMESTAMP = "timestamp"
+
+ID_COLUMNS = ("object", "parents", "topLevelName")
+
+# Values STC returns for counters that have no value yet (e.g. before the first sample), parsed as nulls.
+NULL_VALUES = ("", "N/A")
+
+# When value does not match its column type, the column is promoted to the next type and all values are parsed again.
+type_2_promotion = {INT64: FLOAT64, FLOAT64: STRING, TIMESTAMP: STRING}
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse ISO format timestamp to naive UTC datetime (as NumPy datetime64).
+
+    :param value: timestamp as returned by STC.
+    """
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+type_2_parser: Dict[str, Callable[[str], object]] = {
+    INT64: int,
+    FLOAT64: float,
+    TIMESTAMP: parse_timestamp,
+    STRING: str,
+}
+
+# Column types that cannot be learned from the first page, e.g. latency counters that are integral on idle ports.
+view_2_column_types = {
+    "portavglatencyresults": {"AvgLatency": FLOAT64, "MinLatency": FLOAT64, "MaxLatency": FLOAT64},
+    "rxstreamsummaryresults": {
+        "AvgLatency": FLOAT64,
+        "MinLatency": FLOAT64,
+        "MaxLatency": FLOAT64,
+        "AvgJitter": FLOAT64,
+        "MinJitter": FLOAT64,
+        "MaxJitter": FLOAT64,
+    },
+    "rxstreamblockresults": {
+        "AvgLatency": FLOAT64,
+        "MinLatency": FLOAT64,
+        "MaxLatency": FLOAT64,
+        "AvgJitter": FLOAT64,
+        "MinJitter": FLOAT64,
+        "MaxJitter": FLOAT64,
+    },
+    "rxstreamresults": {"AvgLatency": FLOAT64, "MinLatency": FLOAT64, "MaxLatency": FLOAT64},
+}
+
+
+def parse_list(column_type: str, values: List[str]) -> list:
+    """Parse column values to list of Python values of the requested type, null values of typed columns are None.
+
+    :param column_type: column type.
+    :param values: column values as returned by STC.
+    """
+    if column_type == STRING:
+        return list(values)
+    parser = type_2_parser[column_type]
+    return [None if value in NULL_VALUES else parser(value) for value in values]
+
+
+def infer_type(values: List[str]) -> Optional[str]:
+    """Return the narrowest type that matches all non null values, None if all values are null.
+
+    :param values: column values as returned by STC.
+    """
+    values = [value for value in values if value not in NULL_VALUES]
+    if not values:
+        return None
+    for column_type in (INT64, FLOAT64, TIMESTAMP):
+        try:
+            parse_list(column_type, values)
+            return column_type
+        except ValueError:
+            pass
+    return STRING
+
+
+class StcViewSchema:
+    """Column types of single statistics view.
+
+    Column types are taken from view_2_column_types and the types of all other columns are learned from the first page
+    read that has non null values. Null values ('' and N/A) match all types. If a value does not match its column type
+    later on, the column is promoted (int64 -> float64 -> string, timestamp -> string) and the schema is updated so the
+    next reads use the promoted type.
+    Each subscription has its own schema (see StcSubscription) so promotions are dropped with the subscriptions.
+    """
+
+    def __init__(self, view: str, column_types: Optional[Dict[str, str]] = None) -> None:
+        """Create schema.
+
+        :param view: statistics view name.
+        :param column_types: known {column: type}.
+        """
+        self.view = view
+        self.column_types: Dict[str, str] = {column: STRING for column in ID_COLUMNS}
+        self.column_types.update(column_types or {})
+        self._lock = threading.Lock()
+
+    def learn(self, table: Dict[str, List[str]]) -> None:
+        """Learn the types of unknown columns from the table values.
+
+        :param table: columnar table {column name: list of values}.
+        """
+        for column, values in table.items():
+            if column not in self.column_types:
+                column_type = infer_type(values)
+                if column_type:
+                    with self._lock:
+                        self.column_types.setdefault(column, column_type)
+
+    def parse_column(self, column: str, values: List[str], parse: Callable[[str, List[str]], object] = parse_list) -> object:
+        """Parse column values according to the column type, promote the column type if needed.
+
+        :param column: column name.
+        :param values: column values as returned by STC.
+        :param parse: parser function(column type, values), the default parser returns list of Python values.
+        """
+        column_type = self.column_types.get(column)
+        if not column_type:
+            self.learn({column: values})
+            column_type = self.column_types.get(column, STRING)
+        while True:
+            try:
+                return parse(column_type, values)
+            except ValueError:
+                column_type = type_2_promotion[column_type]
+                with self._lock:
+                    self.column_types[column] = column_type
+
+    def parse_table(self, table: Dict[str, List[str]]) -> Dict[str, list]:
+        """Parse all table columns according to the schema.
+
+        :param table: columnar table {column name: list of values}.
+        """
+        return {column: self.parse_column(column, values) for column, values in table.items()}
+
+
+def create_view_schema(view: str) -> StcViewSchema:
+    """Return new schema of the requested view with the known column types of the view.
+
+    :param view: statistics view name.
+    """
+    view = view.lower()
+    return StcViewSchema(view, view_2_column_types.get(view))
@@ -0,0 +1,190 @@
+"""
+Columnar, NumPy backed, snapshots of STC statistics views.
+"""
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional
+
+from trafficgenerator import TgnError
+
+from testcenter.stc_object import StcObject
+from testcenter.stc_statistics_schema import (
+    FLOAT64,
+    ID_COLUMNS,
+    INT64,
+    NULL_VALUES,
+    STRING,
+    TIMESTAMP,
+    StcViewSchema,
+    parse_timestamp,
+)
+
+# NumPy is required only for statistics snapshots, so it is OK if it is not installed as long as snapshots are not used.
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+
+def column_2_array(values: List[str]) -> np.ndarray:
+    """Convert column of string values to typed NumPy array in one vectorized pass.
+
+    Try int64, then float64 and fallback to string array.
+
+    :param values: column values as returned by STC.
+    """
+    array = np.array(values, dtype=str)
+    for dtype in (np.int64, np.float64):
+        try:
+            return array.astype(dtype)
+        except ValueError:
+            pass
+    return array
+
+
+def parse_array(column_type: str, values: List[str]) -> np.ndarray:
+    """Parse column values to NumPy array of the requested type in one vectorized pass.
+
+    Null values are NaN in float64 columns, NaT in timestamp columns and masked in int64 columns (masked array).
+
+    :param column_type: column type as defined by StcViewSchema.
+    :param values: column values as returned by STC.
+    """
+    array = np.array(values, dtype=str)
+    if column_type == STRING:
+        return array
+    nulls = np.isin(array, NULL_VALUES)
+    if column_type == TIMESTAMP:
+        return np.array(
+            [None if null else parse_timestamp(value) for value, null in zip(values, nulls)], dtype="datetime64[us]"
+        )
+    if column_type == FLOAT64:
+        return np.where(nulls, "nan", array).astype(np.float64) if nulls.any() else array.astype(np.float64)
+    if nulls.any():
+        return np.ma.masked_array(np.where(nulls, "0", array).astype(np.int64), mask=nulls)
+    return array.astype(np.int64)
+
+
+class StcStatsSnapshot:
+    """Columnar snapshot of statistics view.
+
+    The snapshot holds one NumPy array per column, all arrays are parallel to the objects list and names array, so
+    snapshot["GeneratorFrameCount"][i] is the GeneratorFrameCount of objects[i] which is names[i].
+    """
+
+    def __init__(
+        self, objects: List[StcObject], names: List[str], columns: Dict[str, np.ndarray], timestamp: Optional[float] = None
+    ) -> None:
+        """Create snapshot from already typed columns.
+
+        :param objects: snapshot objects.
+        :param names: snapshot objects IDs.
+        :param columns: {column name: array of values}.
+        :param timestamp: snapshot time as returned by time.time(). If None, use current time.
+        """
+        if np is None:
+            raise TgnError("Statistics snapshot requires numpy, install it with 'pip install pytestcenter[numpy]'")
+        self.objects = objects
+        self.names = np.array(names, dtype=str)
+        self.columns = columns
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self._index = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def from_table(
+        cls,
+        table: Dict[str, list],
+        obj_id_stat: Optional[str] = "topLevelName",
+        timestamp: Optional[float] = None,
+        objects_by_name: Optional[Dict[str, StcObject]] = None,
+        schema: Optional[StcViewSchema] = None,
+    ) -> StcStatsSnapshot:
+        """Create snapshot from columnar table as returned by StcStats.read_table().
+
+        :param table: columnar table {column name: list of values}.
+        :param obj_id_stat: which column to use as object ID.
+        :param timestamp: snapshot time as returned by time.time(). If None, use current time.
+        :param objects_by_name: known {object ID: object}, objects not in the dictionary are searched in the objects tree.
+        :param schema: view schema, if None guess the type of each column from its values.
+        """
+        if np is None:
+            raise TgnError("Statistics snapshot requires numpy, install it with 'pip install pytestcenter[numpy]'")
+        objects_by_name = objects_by_name if objects_by_name is not None else {}
+        names = [str(name) for name in table.get(obj_id_stat, [])]
+        objects = [objects_by_name.get(name) or StcObject.project.get_object_by_name(name) for name in names]
+        if schema:
+            columns = {column: schema.parse_column(column, values, parse_array) for column, values in table.items()}
+        else:
+            columns = {column: column_2_array(values) for column, values in table.items()}
+        return cls(objects, names, columns, timestamp)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """Return the values of the requested column.
+
+        :param column: requested column (statistics) name.
+        """
+        return self.columns[column]
+
+    def counters(self) -> List[str]:
+        """Return the names of all numeric columns."""
+        return [c for c, v in self.columns.items() if c not in ID_COLUMNS and v.dtype.kind in "iuf"]
+
+    def index(self, name: str) -> int:
+        """Return the index of the requested object in the snapshot arrays.
+
+        :param name: requested object ID.
+        """
+        return self._index[name]
+
+    def row(self, name: str) -> Dict[str, object]:
+        """Return all values of the requested object.
+
+        :param name: requested object ID.
+        """
+        i = self._index[name]
+        return {column: values[i].item() for column, values in self.columns.items()}
+
+    def select(self, *names: str) -> StcStatsSnapshot:
+        """Return new snapshot with the requested objects only, in the requested order.
+
+        :param names: requested objects IDs.
+        """
+        indices = np.array([self._index[name] for name in names], dtype=np.int64)
+        columns = {column: values[indices] for column, values in self.columns.items()}
+        return StcStatsSnapshot([self.objects[i] for i in indices], list(names), columns, self.timestamp)
+
+    def sum(self, column: str, *names: str) -> object:  # noqa: A003
+        """Return the sum of the requested column over the requested objects.
+
+        :param column: requested column (statistics) name.
+        :param names: requested objects IDs, if empty sum over all objects.
+        """
+        values = self.columns[column]
+        if names:
+            values = values[[self._index[name] for name in names]]
+        return values.sum().item()
+
+    def diff(self, other: StcStatsSnapshot) -> StcStatsSnapshot:
+        """Return new snapshot with self - other values of all numeric columns.
+
+        Objects are aligned by name and objects that do not exist in other snapshot are dropped.
+
+        :param other: older snapshot to subtract.
+        """
+        common = [i for i, name in enumerate(self.names) if name in other._index]
+        other_indices = np.array([other.index(self.names[i]) for i in common], dtype=np.int64)
+        indices = np.array(common, dtype=np.int64)
+        columns = {c: self.columns[c][indices] for c in ID_COLUMNS if c in self.columns}
+        for column in self.counters():
+            if column in other and other[column].dtype.kind in "iuf":
+                columns[column] = self.columns[column][indices] - other[column][other_indices]
+        return StcStatsSnapshot([self.objects[i] for i in common], self.names[indices].tolist(), columns, self.timestamp)
+
+    __sub__ = diff
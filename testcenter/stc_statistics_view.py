@@ -1,13 +1,323 @@
 """
 Classes and utilities to manage STC statistics views.
 """
+import queue
+import threading
 import time
-from typing import Optional
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 
+from trafficgenerator import TgnError
 from trafficgenerator.tgn_object import TgnObjectsDict
 from trafficgenerator.tgn_utils import is_false
 
+from testcenter.api.stc_rest import StcRestWrapper
+from testcenter.api.stc_rest_async import AsyncStcRestWrapper
+from testcenter.api.stc_tcl import StcTclWrapper
 from testcenter.stc_object import StcObject
+from testcenter.stc_statistics_schema import StcViewSchema, create_view_schema
+from testcenter.stc_statistics_snapshot import StcStatsSnapshot
+
+
+class StcPageTiming(NamedTuple):
+    """Timing of single results page read.
+
+    ready - seconds from page request until the page was ready on STC, read - seconds to read the page values.
+    """
+
+    page_number: int
+    ready: float
+    read: float
+
+
+class StcResultsPager:
+    """Readiness driven pages reader for ResultDataSet.
+
+    Instead of sleeping fixed time after each page change, the pager polls the ResultDataSet until the requested page
+    lands, starting with short poll interval and doubling it up to max_interval.
+    The next page is requested before the current page is returned to the caller so STC prepares the next page while
+    the caller parses the current page. Pending configuration is applied once before paging starts, page requests only
+    configure the PageNumber.
+    """
+
+    def __init__(
+        self,
+        rds: StcObject,
+        counters: Optional[List[str]] = None,
+        deadline: float = 8,
+        min_interval: float = 0.02,
+        max_interval: float = 0.5,
+    ) -> None:
+        """Create pager for ResultDataSet.
+
+        :param rds: ResultDataSet object.
+        :param counters: results attributes to read, if empty read all results attributes.
+        :param deadline: how long (seconds) to wait for page change before raising TgnError.
+        :param min_interval: first poll interval in seconds.
+        :param max_interval: maximum poll interval in seconds.
+        """
+        self.rds = rds
+        self.attributes = ["parent"] + list(counters) if counters else []
+        self.deadline = deadline
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timings: List[StcPageTiming] = []
+
+    def pages(
+        self, api: Optional[Union[StcRestWrapper, StcTclWrapper]] = None
+    ) -> Iterator[Tuple[List[str], List[Dict[str, str]]]]:
+        """Yield results objects references and results objects values of each page.
+
+        :param api: API session to read with, if None - the ResultDataSet API.
+        """
+        api = api if api is not None else self.rds.api
+        self.timings = []
+        rds_values = api.get_objects([self.rds.ref], "TotalPageCount", "PageNumber", "ResultHandleList")[0]
+        total_page_count = int(rds_values["TotalPageCount"])
+        results_refs = rds_values["ResultHandleList"].split()
+        if total_page_count > 1 or (total_page_count and int(rds_values["PageNumber"]) != 1):
+            api.apply()
+        requested = time.perf_counter()
+        if total_page_count and int(rds_values["PageNumber"]) != 1:
+            requested = self._request_page(api, 1)
+            results_refs = self._wait_for_page(api, 1, results_refs)
+        for page_number in range(1, total_page_count + 1):
+            if page_number > 1:
+                results_refs = self._wait_for_page(api, page_number, results_refs)
+            ready = time.perf_counter()
+            results_values = api.get_objects(results_refs, *self.attributes)
+            read = time.perf_counter()
+            self.timings.append(StcPageTiming(page_number, ready - requested, read - ready))
+            self.rds.logger.debug(f"{self.rds.ref} page {page_number} ready {ready - requested:.3f} read {read - ready:.3f}")
+            if page_number < total_page_count:
+                requested = self._request_page(api, page_number + 1)
+            yield results_refs, results_values
+
+    def _request_page(self, api: Union[StcRestWrapper, StcTclWrapper], page_number: int) -> float:
+        api.config(self.rds.ref, PageNumber=page_number)
+        return time.perf_counter()
+
+    def _wait_for_page(
+        self, api: Union[StcRestWrapper, StcTclWrapper], page_number: int, previous_refs: List[str]
+    ) -> List[str]:
+        """Wait until the ResultHandleList changes from the previous page and return the new results references."""
+        interval = self.min_interval
+        deadline = time.perf_counter() + self.deadline
+        while True:
+            results_refs = api.get_list(self.rds.ref, "ResultHandleList")
+            if results_refs and results_refs != previous_refs:
+                return results_refs
+            if time.perf_counter() > deadline:
+                raise TgnError(f"{self.rds.ref} page {page_number} not ready after {self.deadline} seconds")
+            time.sleep(interval)
+            interval = min(interval * 2, self.max_interval)
+
+
+class StcResultViewReader:
+    """Level by level reader of DynamicResultView ResultViewData tree.
+
+    Each tree level is expanded in one batch, nodes of the same level are independent so when multiple API sessions
+    are provided they are processed concurrently, one thread per session.
+    The result is flat list of rows in the same (depth first) order as the recursive traversal.
+    """
+
+    def __init__(
+        self,
+        apis: Optional[List[Union[StcRestWrapper, StcTclWrapper]]] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+    ) -> None:
+        """Create reader.
+
+        :param apis: API sessions pool (see StcRestWrapper.join). If None, use the project API sequentially.
+        :param max_depth: maximum levels to expand below the top level rows, None - no limit.
+        :param max_nodes: maximum number of ResultViewData nodes to read, None - no limit.
+        """
+        self.apis = apis
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.truncated = False
+
+    def read(self, presentation_result_query: str, num_columns: int) -> List[List[str]]:
+        """Expand and read all ResultViewData nodes under PresentationResultQuery.
+
+        :param presentation_result_query: PresentationResultQuery object reference.
+        :param num_columns: number of selected properties.
+        """
+        apis = self.apis if self.apis else [StcObject.project.api]
+        self.truncated = False
+        rows: Dict[str, List[str]] = {}
+        children: Dict[str, List[str]] = {}
+        top_refs = apis[0].get_list(presentation_result_query, "children-ResultViewData")
+        level = self._limit(top_refs, 0)
+        depth = 0
+        with ThreadPoolExecutor(max_workers=len(apis)) as executor:
+            sessions: queue.Queue = queue.Queue()
+            for api in apis:
+                sessions.put(api)
+            while level:
+                expand = self.max_depth is None or depth < self.max_depth
+                nodes = self._map(executor, sessions, lambda api, ref: self._read_node(api, ref, depth, expand), level)
+                next_level = []
+                for ref, (row, node_children) in zip(level, nodes):
+                    if row is not None:
+                        rows[ref] = row[:num_columns]
+                    children[ref] = node_children
+                    next_level.extend(node_children)
+                level = self._limit(next_level, len(children))
+                depth += 1
+        objs_stats = []
+        stack = list(reversed(top_refs))
+        while stack:
+            ref = stack.pop()
+            if ref in rows:
+                objs_stats.append(rows[ref])
+            stack.extend(reversed(children.get(ref, [])))
+        return objs_stats
+
+    def _limit(self, refs: List[str], num_read: int) -> List[str]:
+        if self.max_nodes is not None and num_read + len(refs) > self.max_nodes:
+            if not self.truncated:
+                StcObject.project.logger.warning(f"Custom view truncated after {self.max_nodes} nodes")
+            self.truncated = True
+            return refs[: max(0, self.max_nodes - num_read)]
+        return refs
+
+    @staticmethod
+    def _map(executor: ThreadPoolExecutor, sessions: queue.Queue, func: Callable, refs: List[str]) -> list:
+        """Run func(api, ref) for all refs, each call uses a free API session from the pool."""
+        if sessions.qsize() == 1:
+            api = sessions.queue[0]
+            return [func(api, ref) for ref in refs]
+
+        def run(ref: str) -> object:
+            api = sessions.get()
+            try:
+                return func(api, ref)
+            finally:
+                sessions.put(api)
+
+        return list(executor.map(run, refs))
+
+    @staticmethod
+    def _read_node(
+        api: Union[StcRestWrapper, StcTclWrapper], ref: str, depth: int, expand: bool
+    ) -> Tuple[Optional[List[str]], List[str]]:
+        """Return node row (None for dummy nodes) and node children references."""
+        row = None
+        if depth == 0 or is_false(api.get(ref, "IsDummy")):
+            row = api.get_list(ref, "ResultData")
+        if not expand:
+            return row, []
+        api.perform("ExpandResultViewDataCommand", ResultViewData=ref)
+        return row, api.get_list(ref, "children-ResultViewData")
+
+
+class StcSubscription:
+    """Results subscription shared by all StcStats objects that subscribe to the same view with the same configuration.
+
+    The subscription holds the ResultDataSet (or DynamicResultView), its pager, the view schema and the results parents
+    cache, so additional subscribers pay no subscribe or parents resolution round trips.
+    Reads of shared subscription must be done under lock as paging changes the ResultDataSet state on STC.
+    """
+
+    def __init__(self, key: Tuple[str, object, tuple], rds: StcObject, counters: Tuple[str, ...] = ()) -> None:
+        """Create subscription with no holders.
+
+        :param key: registry key - (view, config type, filters).
+        :param rds: subscribed ResultDataSet or DynamicResultView.
+        :param counters: subscribed counters, if empty all view counters are subscribed.
+        """
+        self.key = key
+        self.rds = rds
+        self.pager = StcResultsPager(rds, list(counters)) if rds.type == "resultdataset" else None
+        self.schema = create_view_schema(key[0]) if self.pager else None
+        self.parents: Dict[str, Tuple[str, str]] = {}
+        self.holders = 0
+        self.lock = threading.RLock()
+
+
+class StcSubscriptions:
+    """Registry of shared results subscriptions keyed by (view, config type, filters), with reference counting.
+
+    The view is unsubscribed when the last holder releases it. The registry must be cleared whenever the configuration
+    is reset or reloaded as all subscriptions are deleted on STC.
+    """
+
+    def __init__(self) -> None:
+        self.subscriptions: Dict[Tuple[str, object, tuple], StcSubscription] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def acquire(
+        self,
+        view: str,
+        config_type: Optional[object] = None,
+        result_parents: Tuple[str, ...] = (),
+        counters: Tuple[str, ...] = (),
+    ) -> StcSubscription:
+        """Return existing subscription for the requested key or subscribe to view and register new subscription.
+
+        :param view: statistics view to subscribe to.
+        :param config_type: configuration type to subscribe to, None for custom views.
+        :param result_parents: references of the objects to subscribe to, if empty subscribe to all project objects.
+        :param counters: counters to subscribe to, if empty subscribe to all view counters.
+        """
+        key = (view.lower(), config_type, (result_parents, counters))
+        with self._lock:
+            subscription = self.subscriptions.get(key)
+            if not subscription:
+                rds = self._subscribe(view, config_type, result_parents, counters)
+                subscription = StcSubscription(key, rds, counters)
+                self.subscriptions[key] = subscription
+            subscription.holders += 1
+            return subscription
+
+    def release(self, subscription: StcSubscription) -> None:
+        """Release one holder of the subscription and unsubscribe if it was the last holder.
+
+        Does nothing for subscriptions forgotten by clear (after reset, load config or disconnect) or when there is no
+        project API to unsubscribe with.
+
+        :param subscription: subscription to release.
+        """
+        with self._lock:
+            subscription.holders -= 1
+            if subscription.holders > 0 or self.subscriptions.get(subscription.key) is not subscription:
+                return
+            del self.subscriptions[subscription.key]
+        project = StcObject.project
+        if project is None or project.api is None:
+            return
+        project.api.unsubscribe(subscription.rds.ref)
+
+    def clear(self) -> None:
+        """Forget all subscriptions without unsubscribing (after reset or load config)."""
+        with self._lock:
+            self.subscriptions.clear()
+
+    @staticmethod
+    def _subscribe(view: str, config_type: Optional[object], result_parents: tuple, counters: tuple) -> StcObject:
+        if config_type:
+            arguments = {"ViewAttributeList": " ".join(counters)} if counters else {}
+            rds = StcObject.project.api.subscribe(
+                Parent=StcObject.project.ref,
+                ResultParent=" ".join(result_parents) if result_parents else StcObject.project.ref,
+                ConfigType=config_type,
+                ResultType=view,
+                RecordsPerPage=256,
+                **arguments,
+            )
+            return StcObject(objType="ResultDataSet", parent=StcObject.project, objRef=rds)
+        if result_parents or counters:
+            raise TgnError(f"Custom view {view} does not support objects or counters filters")
+        StcObject.project.get_children("DynamicResultView")
+        drv = StcObject.project.get_object_by_name(view)
+        rc = StcObject.project.command("SubscribeDynamicResultView", DynamicResultView=drv.ref)
+        return StcObject(objType="DynamicResultView", parent=StcObject.project, objRef=rc["DynamicResultView"])
 
 
 class StcStats:
@@ -28,45 +338,72 @@ class StcStats:
     topLevelName        | Port 1                   | Port 2
     GeneratorFrameCount | 1000                     | 2000
     ...
+
+    Each results page is read with a single bulk request and the parents and topLevelName of each results object are
+    resolved once per subscription. Pages are read by StcResultsPager, use pager.timings to get per page latency.
+
+    Subscriptions are shared through the subscriptions registry - all StcStats objects of the same view and
+    configuration type read the same ResultDataSet, which is unsubscribed when the last of them is unsubscribed or
+    garbage collected.
     """
 
-    def __init__(self, view: str) -> None:
+    subscriptions = StcSubscriptions()
+
+    def __init__(self, view: str, objects: Optional[List[StcObject]] = None, counters: Optional[List[str]] = None) -> None:
         """Subscribe to view with default configuration type as defined by config_2_type.
 
         :param view: statistics view to subscribe to. If view is None it is the test responsibility to subscribe with
             specific config_type.
+        :param objects: ports, stream blocks or devices to subscribe to, if empty subscribe to all project objects.
+        :param counters: counters to subscribe to, if empty subscribe to all view counters.
         """
         self.rds = None
+        self.pager: StcResultsPager = None
+        self.subscription: StcSubscription = None
+        self.schema: StcViewSchema = None
+        self.view_reader = StcResultViewReader()
         self.statistics = TgnObjectsDict()
+        self._parents: Dict[str, Tuple[str, str]] = {}
+        self._release = None
         if view:
-            self.subscribe(view)
+            self.subscribe(view, objects=objects, counters=counters)
 
-    def subscribe(self, view: str, config_type: Optional[str] = None) -> None:
+    def subscribe(
+        self,
+        view: str,
+        config_type: Optional[str] = None,
+        objects: Optional[List[StcObject]] = None,
+        counters: Optional[List[str]] = None,
+    ) -> None:
         """Subscribe to statistics view.
 
+        When objects and/or counters are specified, STC returns results only for the requested objects and the
+        requested counters so reading the view is faster in proportion.
+
         :param view: statistics view to subscribe to.
         :param config_type: configuration type to subscribe to.
+        :param objects: ports, stream blocks or devices to subscribe to, if empty subscribe to all project objects.
+        :param counters: counters to subscribe to, if empty subscribe to all view counters.
         """
-        if view.lower() in view_2_config_type:
-            if not config_type:
-                config_type = view_2_config_type[view.lower()]
-            rds = StcObject.project.api.subscribe(
-                Parent=StcObject.project.ref,
-                ResultParent=StcObject.project.ref,
-                ConfigType=config_type,
-                ResultType=view,
-                RecordsPerPage=256,
-            )
-            self.rds = StcObject(objType="ResultDataSet", parent=StcObject.project, objRef=rds)
-        else:
-            StcObject.project.get_children("DynamicResultView")
-            drv = StcObject.project.get_object_by_name(view)
-            rc = StcObject.project.command("SubscribeDynamicResultView", DynamicResultView=drv.ref)
-            self.rds = StcObject(objType="DynamicResultView", parent=StcObject.project, objRef=rc["DynamicResultView"])
+        if self._release:
+            self._release()
+        if view.lower() in view_2_config_type and not config_type:
+            config_type = view_2_config_type[view.lower()]
+        result_parents = tuple(sorted(obj.ref for obj in objects)) if objects else ()
+        self.subscription = self.subscriptions.acquire(view, config_type, result_parents, tuple(counters or ()))
+        self._release = weakref.finalize(self, self.subscriptions.release, self.subscription)
+        # At interpreter exit the session may already be closed, STC drops its subscriptions anyway.
+        self._release.atexit = False
+        self.rds = self.subscription.rds
+        self.pager = self.subscription.pager
+        self.schema = self.subscription.schema
+        self._parents = self.subscription.parents
 
     def unsubscribe(self) -> None:
-        """Unsubscribe from statistics view."""
-        StcObject.project.api.unsubscribe(self.rds.ref)
+        """Unsubscribe from statistics view, the view is unsubscribed on STC only if no other StcStats holds it."""
+        if self._release:
+            self._release()
+            self._release = None
 
     def read_stats(self, obj_id_stat: Optional[str] = "topLevelName") -> TgnObjectsDict:
         """Read the statistics view from STC and saves it in statistics dictionary.
@@ -75,12 +412,57 @@ class StcStats:
             not meaningful and it is better to use other unique identifier like stream ID.
         """
         self.statistics = TgnObjectsDict()
-        if self.rds.type == "dynamicresultview":
-            self._read_custom_view()
-        else:
-            self._read_view(obj_id_stat)
+        with self.subscription.lock:
+            if self.rds.type == "dynamicresultview":
+                self._read_custom_view()
+            else:
+                self._read_view(obj_id_stat)
         return self.statistics
 
+    async def aread_stats(self, obj_id_stat: Optional[str] = "topLevelName") -> TgnObjectsDict:
+        """Async variant of read_stats, the view is read on worker thread in order with other async operations.
+
+        :param obj_id_stat: which statistics name to use as object ID.
+        """
+        return await AsyncStcRestWrapper.of(StcObject.project.api).call(self.read_stats, obj_id_stat)
+
+    async def aread_snapshot(self, obj_id_stat: Optional[str] = "topLevelName") -> StcStatsSnapshot:
+        """Async variant of read_snapshot.
+
+        :param obj_id_stat: which statistics name to use as object ID.
+        """
+        return await AsyncStcRestWrapper.of(StcObject.project.api).call(self.read_snapshot, obj_id_stat)
+
+    def read_table(self, api: Optional[Union[StcRestWrapper, StcTclWrapper]] = None) -> Dict[str, list]:
+        """Read the statistics view from STC and return it as one columnar table.
+
+        The table columns are object, parents, topLevelName and all statistics of the view, each column holds one value
+        per results object.
+
+        N/A for custom views.
+
+        :param api: API session to read with (e.g. joined session of background reader), if None - the project API.
+        """
+        api = api if api is not None else StcObject.project.api
+        table: Dict[str, list] = {}
+        with self.subscription.lock:
+            api.perform("RefreshResultView", ResultDataSet=self.rds.ref)
+            for results_refs, results_values in self.pager.pages(api):
+                page = self._parse_page(results_refs, results_values)
+                self.schema.learn(page)
+                for column, values in page.items():
+                    table.setdefault(column, []).extend(values)
+        return table
+
+    def read_snapshot(self, obj_id_stat: Optional[str] = "topLevelName") -> StcStatsSnapshot:
+        """Read the statistics view from STC and return it as columnar snapshot with one NumPy array per statistics.
+
+        N/A for custom views.
+
+        :param obj_id_stat: which statistics name to use as object ID.
+        """
+        return StcStatsSnapshot.from_table(self.read_table(), obj_id_stat, schema=self.schema)
+
     def get_column_stats(self, name: str) -> TgnObjectsDict:
         """Return all statistics values for the requested statistics.
 
@@ -102,44 +484,48 @@ class StcStats:
         StcObject.project.command("UpdateDynamicResultViewCommand", DynamicResultView=self.rds.ref)
         presentationResultQuery = self.rds.get_child("PresentationResultQuery")
         selectedProperties = presentationResultQuery.get_list_attribute("SelectProperties")
-        self.objs_stats = []
-        for rvd in presentationResultQuery.get_children("ResultViewData"):
-            self.objs_stats.append(rvd.get_list_attribute("ResultData")[: len(selectedProperties)])
-            self._get_result_data(rvd, len(selectedProperties))
+        self.objs_stats = self.view_reader.read(presentationResultQuery.ref, len(selectedProperties))
         self.statistics = dict(zip(selectedProperties, zip(*self.objs_stats)))
 
-    def _get_result_data(self, rvd, num_columns):
-        StcObject.project.command("ExpandResultViewDataCommand", ResultViewData=rvd.ref)
-        for child_rvd in rvd.get_children("ResultViewData"):
-            if is_false(child_rvd.get_attribute("IsDummy")):
-                self.objs_stats.append(child_rvd.get_list_attribute("ResultData")[:num_columns])
-            self._get_result_data(child_rvd, num_columns)
-
     def _read_view(self, obj_id_stat: Optional[str] = "topLevelName") -> None:
-        StcObject.project.command("RefreshResultView", ResultDataSet=self.rds.ref)
-        for page_number in range(1, int(self.rds.get_attribute("TotalPageCount")) + 1):
-            self.rds.set_attributes(apply_=True, PageNumber=page_number)
-            time.sleep(2)
-            for results in self.rds.get_objects_from_attribute("ResultHandleList"):
-                parent = results.get_object_from_attribute("parent")
-                parents = parent.ref
-                name = ""
-                while parent != StcObject.project:
-                    if not name and parent.obj_type().lower() in ("port", "emulateddevice", "streamblock"):
-                        name = parent.get_name()
-                    parent = parent.get_object_from_attribute("parent")
-                    parents = parent.ref + "/" + parents
-                obj_stats = {"object": results.ref, "parents": parents, "topLevelName": name}
-                obj_stats.update(results.get_attributes())
-                obj_stats.pop("parent", None)
-                obj_stats.pop("Name", None)
-                obj_stats.pop("resultchild-Sources", None)
-                for stat in obj_stats:
-                    try:
-                        obj_stats[stat] = int(obj_stats[stat])
-                    except ValueError:
-                        pass
-                self.statistics[StcObject.project.get_object_by_name(obj_stats[obj_id_stat])] = obj_stats
+        table = self.schema.parse_table(self.read_table())
+        for row in zip(*table.values()):
+            obj_stats = dict(zip(table, row))
+            self.statistics[StcObject.project.get_object_by_name(obj_stats[obj_id_stat])] = obj_stats
+
+    def _parse_page(self, results_refs: List[str], page_values: List[Dict[str, str]]) -> Dict[str, List[str]]:
+        """Return results objects values of single page as columnar table."""
+        page: Dict[str, List[str]] = {"object": results_refs, "parents": [], "topLevelName": []}
+        for results_values in page_values:
+            parents, name = self._get_parents(results_values.pop("parent"))
+            page["parents"].append(parents)
+            page["topLevelName"].append(name)
+            results_values.pop("Name", None)
+            results_values.pop("resultchild-Sources", None)
+            for stat, value in results_values.items():
+                page.setdefault(stat, []).append(value)
+        return page
+
+    def _get_parents(self, parent_ref: str) -> Tuple[str, str]:
+        """Return the parents path and the top level name of results object parent.
+
+        Resolving the parents requires multiple round trips so the result is cached for the subscription lifetime.
+
+        :param parent_ref: object reference of the results object parent.
+        """
+        if parent_ref not in self._parents:
+            parent = StcObject.project.get_object_by_ref(parent_ref)
+            if not parent:
+                parent = StcObject(objRef=parent_ref, parent=self.rds)
+            parents = parent.ref
+            name = ""
+            while parent != StcObject.project:
+                if not name and parent.obj_type().lower() in ("port", "emulateddevice", "streamblock"):
+                    name = parent.get_name()
+                parent = parent.get_object_from_attribute("parent")
+                parents = parent.ref + "/" + parents
+            self._parents[parent_ref] = (parents, name)
+        return self._parents[parent_ref]
 
 
 view_2_config_type = {
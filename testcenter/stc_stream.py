@@ -38,6 +38,8 @@ class StcStream(StcObject):
 class StcGroupCollection(StcObject):
     """Represent STC group collection."""
 
+    name_attribute = "GroupName"
+
     def __init__(self, **data) -> None:
         """Create new group collection on STC.
 
@@ -58,6 +60,8 @@ class StcGroupCollection(StcObject):
 class StcTrafficGroup(StcObject):
     """Represent STC traffic group."""
 
+    name_attribute = "GroupName"
+
     def __init__(self, **data) -> None:
         """Create new traffic group object.
 
@@ -76,8 +80,9 @@ class StcTrafficGroup(StcObject):
         return self.get_attribute("GroupName")
 
     def set_attributes(self, apply_=False, **attributes):
-        for sb in self.get_stream_blocks():
-            sb.set_attributes(apply_, **attributes)
+        with self.project.batch(apply_=apply_):
+            for sb in self.get_stream_blocks():
+                sb.set_attributes(**attributes)
 
     def get_stream_blocks(self) -> list:
         stream_blocks = self.get_list_attribute("AffiliationTrafficGroup-Targets")
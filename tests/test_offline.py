@@ -9,6 +9,7 @@ import pytest
 
 from testcenter.api.stc_rest import StcRestWrapper
 from testcenter.stc_app import StcApp
+from testcenter.stc_attribute_cache import StcAttributeCache
 from testcenter.stc_device import StcDevice
 from testcenter.stc_object import StcObject
 from testcenter.stc_port import StcPort
@@ -85,6 +86,29 @@ def test_children(stc: StcApp) -> None:
         assert len(port.stream_blocks) == 1
 
 
+def test_attribute_cache(stc: StcApp) -> None:
+    """Test attributes cache hits and invalidation."""
+    logger.info(test_attribute_cache.__doc__.strip())
+
+    stc.load_config(Path(__file__).parent.joinpath("configs").joinpath("test_config.xml").as_posix())
+    port = stc.project.ports["Port 1"]
+    port.attribute_cache = StcAttributeCache(max_size=2, ttl=60)
+    try:
+        assert port.get_name() == port.get_name() == "Port 1"
+        assert port.attribute_cache.hits == 1
+        port.set_attributes(Name="New Name")
+        assert port.get_name() == "New Name"
+        assert port.attribute_cache.misses == 2
+        port.get_attribute("Location")
+        port.get_attribute("Active")
+        assert port.attribute_cache.evictions == 1
+        stc.api.apply()
+        port.get_attribute("Active")
+        assert port.attribute_cache.statistics()["misses"] == 5
+    finally:
+        port.attribute_cache = None
+
+
 def test_build_config(stc: StcApp) -> None:
     """Build simple config from scratch."""
     logger.info(test_build_config.__doc__.strip())
@@ -124,6 +148,42 @@ def test_build_config(stc: StcApp) -> None:
     stc.save_config(Path(__file__).parent.joinpath("configs/temp", test_name + ".tcc").as_posix())
 
 
+def test_batch(stc: StcApp) -> None:
+    """Test write batching."""
+    logger.info(test_batch.__doc__.strip())
+
+    stc.load_config(Path(__file__).parent.joinpath("configs").joinpath("test_config.xml").as_posix())
+    with stc.project.batch() as batch:
+        for stream_block in stc.project.get_stream_blocks().values():
+            stream_block.set_attributes(Load=10)
+            stream_block.set_attributes(LoadUnit="FRAMES_PER_SECOND", apply_=True)
+        assert batch.pending
+    assert not batch.pending
+    assert batch.writes == 4
+    assert batch.configs == 2
+    for stream_block in stc.project.get_stream_blocks().values():
+        assert float(stream_block.get_attribute("Load")) == 10
+        assert stream_block.get_attribute("LoadUnit") == "FRAMES_PER_SECOND"
+
+
+def test_bulk_create(stc: StcApp) -> None:
+    """Create stream blocks and devices in bulk."""
+    logger.info(test_bulk_create.__doc__.strip())
+
+    port = StcPort(name="Port 1", parent=stc.project)
+    stream_blocks = port.create_stream_blocks([{"Load": 20}, {}, {}], name="SB {index}", Load=10)
+    devices = stc.project.create_devices(2, port=port, name="Device {index}")
+
+    assert [sb.name for sb in stream_blocks] == ["SB 1", "SB 2", "SB 3"]
+    assert float(stream_blocks[0].get_attribute("Load")) == 20
+    assert float(stream_blocks[1].get_attribute("Load")) == 10
+    assert not stream_blocks[0].get_children("ethernet:ethernetii")
+    assert list(port.stream_blocks) == ["SB 1", "SB 2", "SB 3"]
+    assert list(port.devices) == ["Device 1", "Device 2"]
+    assert devices[0].get_attribute("AffiliatedPort") == port.ref
+    assert len(port.get_children("emulateddevice")) == 2
+
+
 def test_stream_under_project(stc: StcApp) -> None:
     """Build simple config with ports under project object."""
     logger.info(test_stream_under_project.__doc__.strip())
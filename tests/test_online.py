@@ -4,13 +4,19 @@ TestCenter package tests that require actual TestCenter chassis and active ports
 Test setup:
 Two STC ports connected back to back.
 """
+import asyncio
 import json
 import logging
 from pathlib import Path
 from typing import List
 
+from testcenter.api.stc_rest import StcRestWrapper
+from testcenter.api.stc_rest_async import gather
 from testcenter.stc_app import StcApp, StcSequencerOperation
-from testcenter.stc_statistics_view import StcStats
+from testcenter.stc_statistics_export import StcStatsExporter, open_export
+from testcenter.stc_statistics_poller import StcStatsPoller
+from testcenter.stc_statistics_sampler import StcStatsSampler
+from testcenter.stc_statistics_view import StcResultViewReader, StcStats
 
 logger = logging.getLogger("tgn.testcenter")
 
@@ -37,6 +43,8 @@ def test_online(stc: StcApp, locations: List[str]) -> None:
 
     for port in stc.project.ports.values():
         assert port.is_online()
+    if isinstance(stc.api, StcRestWrapper):
+        assert all(asyncio.run(gather(*[port.ais_online() for port in stc.project.ports.values()], limit=8)))
 
     for port in stc.project.ports.values():
         port.release()
@@ -140,9 +148,15 @@ def test_traffic(stc: StcApp, locations: List[str]) -> None:
     print(gen_stats.get_column_stats("GeneratorFrameCount").dumps(indent=2))
     assert gen_stats.statistics["Port 1"]["GeneratorFrameCount"] == 0
     assert analyzer_stats.statistics["Port 2"]["SigFrameCount"] == 0
+    assert gen_stats.schema.column_types["GeneratorFrameCount"] == "int64"
+    assert isinstance(gen_stats.statistics["Port 1"]["GeneratorFrameCount"], int)
 
     sb_stats.read_stats()
     print(sb_stats.statistics.dumps(indent=2))
+    sb_table = sb_stats.read_table()
+    assert len(sb_table["object"]) == len(sb_stats.statistics)
+    assert sb_table["topLevelName"] == [sb.name for sb in sb_stats.statistics]
+    assert [t.page_number for t in sb_stats.pager.timings] == list(range(1, len(sb_stats.pager.timings) + 1))
 
     stc.project.ports["Port 1"].start()
     stc.project.ports["Port 1"].stop()
@@ -165,6 +179,71 @@ def test_traffic(stc: StcApp, locations: List[str]) -> None:
     analyzer_stats.read_stats()
     assert gen_stats.statistics["Port 1"]["GeneratorFrameCount"] == analyzer_stats.statistics["Port 2"]["SigFrameCount"]
 
+    gen_snapshot = gen_stats.read_snapshot()
+    assert gen_snapshot.row("Port 1")["GeneratorFrameCount"] == gen_stats.statistics["Port 1"]["GeneratorFrameCount"]
+    assert gen_snapshot.sum("GeneratorFrameCount") == sum(gen_stats.get_column_stats("GeneratorFrameCount").values())
+    assert not (gen_stats.read_snapshot() - gen_snapshot)["GeneratorFrameCount"].any()
+
+    shared_gen_stats = StcStats("generatorportresults")
+    assert shared_gen_stats.rds is gen_stats.rds
+    assert shared_gen_stats.read_stats() == gen_stats.read_stats()
+    gen_stats.unsubscribe()
+    assert shared_gen_stats.subscription.holders == 1
+    assert shared_gen_stats.subscription in StcStats.subscriptions.subscriptions.values()
+    shared_gen_stats.unsubscribe()
+    assert shared_gen_stats.subscription not in StcStats.subscriptions.subscriptions.values()
+
+    port_1_stats = StcStats("GeneratorPortResults", objects=[stc.project.ports["Port 1"]], counters=["GeneratorFrameCount"])
+    port_1_stats.read_stats()
+    assert list(port_1_stats.statistics.keys()) == [stc.project.ports["Port 1"]]
+    assert port_1_stats.statistics["Port 1"]["GeneratorFrameCount"] == gen_snapshot.row("Port 1")["GeneratorFrameCount"]
+
+
+def test_stats_poller(stc: StcApp, locations: List[str]) -> None:
+    """Test incremental statistics polling."""
+    logger.info(test_stats_poller.__doc__.strip())
+
+    stc.load_config(Path(__file__).parent.joinpath("configs").joinpath("test_config.xml").as_posix())
+    reserve_ports(stc, locations, wait_for_up=True)
+
+    gen_poller = StcStatsPoller(StcStats("GeneratorPortResults"))
+    gen_poller.poll()
+    assert not gen_poller.poll()
+
+    stc.project.ports["Port 1"].start()
+    gen_delta = gen_poller.poll()
+    stc.project.ports["Port 1"].stop()
+    assert gen_delta.changed["Port 1"]["GeneratorFrameCount"] > 0
+    assert gen_delta.rates["Port 1"]["GeneratorFrameCount"] > 0
+    assert "Port 2" not in gen_delta.changed
+
+
+def test_stats_sampler(stc: StcApp, locations: List[str]) -> None:
+    """Test background statistics sampling."""
+    logger.info(test_stats_sampler.__doc__.strip())
+    if not isinstance(stc.api, StcRestWrapper):
+        return
+
+    stc.load_config(Path(__file__).parent.joinpath("configs").joinpath("test_config.xml").as_posix())
+    reserve_ports(stc, locations, wait_for_up=True)
+
+    sampler = StcStatsSampler(StcStats("GeneratorPortResults"), interval=1, capacity=4)
+    sampler.start()
+    stc.start_traffic(blocking=True)
+    sampler.stop()
+    snapshots = sampler.drain()
+    assert 1 <= len(snapshots) <= 4
+    assert [s.timestamp for s in snapshots] == sorted(s.timestamp for s in snapshots)
+    assert not sampler.errors
+
+    temp_dir = Path(__file__).parent.joinpath("configs", "temp")
+    with StcStatsExporter(temp_dir.joinpath("generator_port_results.arrow"), chunk_rows=2) as exporter:
+        for snapshot in snapshots:
+            exporter.append(snapshot)
+    exported = open_export(exporter.path)
+    assert exported.num_rows == sum(len(s) for s in snapshots)
+    assert exported.column_names == ["timestamp"] + list(snapshots[0].columns)
+
 
 def test_capture(stc: StcApp, locations: List[str]) -> None:
     """Test traffic and capture."""
@@ -218,6 +297,11 @@ def test_custom_view(stc: StcApp, locations: List[str]) -> None:
     user_stats.read_stats()
     print(json.dumps(user_stats.statistics, indent=2))
 
+    if isinstance(stc.api, StcRestWrapper):
+        user_stats.view_reader = StcResultViewReader(apis=[stc.api.join() for _ in range(4)])
+        statistics = user_stats.statistics
+        assert user_stats.read_stats() == statistics
+
 
 def test_single_port_traffic(stc: StcApp, locations: List[str]) -> None:
     """Test traffic and counters in loopback mode.
@@ -260,9 +344,4 @@ def reserve_ports(stc: StcApp, locations: List[str], wait_for_up: bool = True) -
     :param locations: Ports locations as chassis/card/port.
     :param wait_for_up: True - wait for ports to come up (timeout after 80 seconds), False - return immediately.
     """
-    ports = stc.project.ports.values()
-    for port, location in list(zip(ports, locations)):
-        port.reserve(location, force=True, wait_for_up=False)
-    if wait_for_up:
-        for port in ports:
-            port.wait_for_states(40, "UP")
+    stc.project.reserve_ports(locations, force=True, timeout=80, wait_for_up=wait_for_up)
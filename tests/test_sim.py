@@ -0,0 +1,538 @@
+"""
+TestCenter package tests over the in-process STC simulator, run without STC installation or REST server.
+"""
+# pylint: disable=redefined-outer-name
+import csv
+import logging
+import time
+from pathlib import Path
+from typing import Iterable
+
+import pytest
+from trafficgenerator import TgnError
+
+from testcenter.api.stc_instrumentation import StcApiInstrumentation
+from testcenter.api.stc_sim import StcSimWrapper
+from testcenter.stc_app import StcApp
+from testcenter.stc_attribute_cache import StcAttributeCache
+from testcenter.stc_object import StcObject
+from testcenter.stc_port import StcPort
+from testcenter.stc_settle import StcSettlePolicy
+from testcenter.stc_statistics_export import StcStatsExporter, open_export
+from testcenter.stc_statistics_poller import StcStatsPoller
+from testcenter.stc_statistics_sampler import StcStatsSampler
+from testcenter.stc_statistics_schema import FLOAT64, INT64, STRING, TIMESTAMP
+from testcenter.stc_statistics_snapshot import StcStatsSnapshot
+from testcenter.stc_statistics_view import StcStats
+
+logger = logging.getLogger("tgn.testcenter")
+
+
+@pytest.fixture
+def stc() -> Iterable[StcApp]:
+    """Yield STC object connected to new simulator."""
+    _stc = StcApp(StcSimWrapper(logger))
+    _stc.connect()
+    _stc.project.wait_for_ports = 0
+    yield _stc
+    _stc.disconnect()
+
+
+def test_objects_tree(stc: StcApp) -> None:
+    """Objects, children and relations."""
+    port = StcPort(parent=stc.project, name="Port 1")
+    assert port.ref == "port1"
+    assert port.generator.ref == "generator1"
+    assert port.capture.ref == "capture1"
+
+    stream_blocks = port.create_stream_blocks(3, name="SB {index}")
+    devices = stc.project.create_devices(2, port=port, name="Device {index}")
+    stream_blocks[0].set_targets(ExpectedRx=devices[0].ref)
+    assert devices[0].get_attribute("ExpectedRx-sources") == stream_blocks[0].ref
+    children = stc.api.get_objects([port.ref], "children-StreamBlock")[0]["children-StreamBlock"]
+    assert children == " ".join(sb.ref for sb in stream_blocks)
+
+    stc.project.objects = {}
+    port = stc.project.get_children("port")[0]
+    assert [sb.name for sb in port.get_children("streamblock")] == ["SB 1", "SB 2", "SB 3"]
+    assert [device.name for device in stc.project.get_devices()] == ["Device 1", "Device 2"]
+    assert set(port.get_all_child_types()) == {"generator", "analyzer", "capture", "streamblock"}
+
+    stream_blocks[0].delete()
+    assert len(port.get_children("streamblock")) == 2
+    assert not devices[0].get_attribute("ExpectedRx-sources")
+    with pytest.raises(TgnError):
+        stream_blocks[0].get_attribute("Name")
+
+    stc.reset_config()
+    assert not stc.project.get_children("port")
+
+
+def test_bulk_create_names(stc: StcApp) -> None:
+    """Bulk created objects get unique names across the project."""
+    ports = [StcPort(parent=stc.project, name=f"Port {index}") for index in (1, 2)]
+    stream_blocks = [sb for port in ports for sb in port.create_stream_blocks(2)]
+    assert len({sb.name for sb in stream_blocks}) == 4
+    assert [sb.name for sb in stream_blocks] == [sb.get_attribute("Name") for sb in stream_blocks]
+    assert len(stc.project.get_stream_blocks()) == 4
+    assert [sb.name for sb in ports[1].create_stream_blocks(2, name="SB {index}")] == ["SB 5", "SB 6"]
+    stream_block = ports[0].create_stream_blocks([{"Name": "Upper"}])[0]
+    assert stream_block.name == stream_block.get_attribute("Name") == "Upper"
+
+    with pytest.raises(TgnError):
+        stc.project.create_devices(2)
+
+
+def test_objects_index(stc: StcApp) -> None:
+    """Project index follows create, rename, device re-parenting, delete and objects tree reset."""
+    index = stc.project.objects_index
+    port = StcPort(parent=stc.project, name="Port 1")
+    stream_blocks = port.create_stream_blocks(3, name="SB {index}")
+    device = stc.project.create_devices(1, port=port, name="Device 1")[0]
+    assert stc.project.get_object_by_ref(stream_blocks[1].ref) is stream_blocks[1]
+    assert stc.project.get_object_by_name("SB 3") is stream_blocks[2]
+    assert index.get_by_name("Port 1", "port") == [port]
+    assert index.get_by_type("streamblock") == stream_blocks
+    assert port.get_object_by_ref(device.ref) is device
+    assert [d.ref for d in stc.project.get_devices()] == [device.ref]
+    assert stc.project.get_object_by_ref(device.ref) is not device
+    device = port.get_devices()["Device 1"]
+    assert index.get(device.ref) is device
+    assert not port.generator.get_object_by_ref(stream_blocks[0].ref)
+
+    stream_blocks[0].delete()
+    assert not stc.project.get_object_by_ref(stream_blocks[0].ref)
+    assert index.get_by_type("streamblock") == stream_blocks[1:]
+
+    stc.project.objects = {}
+    assert len(index) == 1
+    port = stc.project.get_children("port")[0]
+    stream_blocks = port.get_children("streamblock")
+    assert [sb.name for sb in stream_blocks] == ["SB 2", "SB 3"]
+    assert stc.project.get_object_by_name("SB 2") is stream_blocks[0]
+    assert not index.get_by_name(stream_blocks[0].ref)
+    port.del_objects_by_type("streamblock")
+    assert not index.get_by_type("streamblock")
+    assert stc.project.get_object_by_ref(port.generator.ref) is port.generator
+
+
+def test_prefetch(stc: StcApp) -> None:
+    """Ports children are read on first access, prefetch reads subtrees with one read per tree level."""
+    for index in range(1, 5):
+        port = StcPort(parent=stc.project, name=f"Port {index}")
+        port.create_stream_blocks(10, name=f"Port {index} SB {{index}}")
+        stc.project.create_devices(2, port=port, name=f"Port {index} Device {{index}}")
+    instrumentation = StcApiInstrumentation(stc.api, callers=False)
+
+    def api_calls() -> int:
+        calls = sum(row["count"] for row in instrumentation.statistics())
+        instrumentation.reset()
+        return calls
+
+    stc.project.objects = {}
+    stc.project.prefetch(types=["port"])
+    assert api_calls() == 2
+    ports = stc.project.ports
+    assert list(ports) == ["Port 1", "Port 2", "Port 3", "Port 4"]
+    assert api_calls() == 0
+    assert ports["Port 2"].generator.config.type.lower() == "generatorconfig"
+    assert api_calls() == 4
+
+    stc.project.start_ports()
+    assert api_calls() == 4
+    stc.project.stop_ports()
+    assert api_calls() == 2
+
+    stc.project.objects = {}
+    new_objects = stc.project.prefetch(types=["port", "generator", "generatorconfig", "streamblock", "emulateddevice"])
+    assert len(new_objects) == 4 * (1 + 1 + 1 + 10 + 2)
+    assert api_calls() == 5
+    port = stc.project.ports["Port 3"]
+    assert port.generator.config.name
+    assert list(port.stream_blocks)[-1] == "Port 3 SB 30"
+    assert list(port.devices) == ["Port 3 Device 5", "Port 3 Device 6"]
+    assert stc.project.get_object_by_name("Port 3 Device 6").parent is port
+    assert api_calls() == 0
+
+    # Read names drop the offline tag, new ports without name get the inherited default name.
+    ports["Port 4"].set_attributes(Name="Port 4 (offline)")
+    assert ports["Port 4"].get_name() == "Port 4"
+    stc.project.objects = {}
+    assert [port.name for port in stc.project.prefetch(types=["port"])][-1] == "Port 4"
+    assert StcPort(parent=stc.project).name == f"{stc.project.name}/port"
+
+
+def test_batch(stc: StcApp) -> None:
+    """Failed flush detaches the batch, nested apply is honoured and create flushes its parent."""
+    port = StcPort(parent=stc.project, name="Port 1")
+    instrumentation = StcApiInstrumentation(stc.api, callers=False)
+
+    with pytest.raises(TgnError):
+        with stc.project.batch(apply_=False) as batch:
+            port.set_attributes(Location="10.0.0.1/1/1")
+            stc.api.config("port100", Name="No such port")
+    assert stc.api.batch is None
+    assert list(batch.pending) == ["port100"]
+    assert port.get_attribute("Location") == "10.0.0.1/1/1"
+    port.set_attributes(Name="Port 2")
+    assert port.get_attribute("Name") == "Port 2"
+
+    with stc.project.batch(apply_=False):
+        with stc.project.batch(apply_=True):
+            port.set_attributes(Name="Port 3")
+        stream_block = stc.api.create("StreamBlock", port.ref)
+        assert not stc.api.batch.pending
+    assert stc.api.get(stream_block, "parent") == port.ref
+    assert [row["count"] for row in instrumentation.statistics() if row["method"] == "apply"] == [1]
+
+
+def test_read_only_commands(stc: StcApp) -> None:
+    """Only commands that may change the configuration bump the API generation."""
+    port = StcPort(parent=stc.project, name="Port 1")
+    stats = StcStats("generatorportresults")
+    generation = stc.api.generation
+    stats.read_stats()
+    stc.api.perform("RefreshResultViewCommand", ResultDataSet=stats.rds.ref)
+    assert stc.api.generation == generation
+    stc.project.start_ports(False, port)
+    assert stc.api.generation > generation
+
+
+def test_attribute_cache(stc: StcApp) -> None:
+    """Writes invalidate cached attributes once they complete, statistics reads keep them, results are not cached."""
+    StcObject.attribute_cache = cache = StcAttributeCache()
+    try:
+        port = StcPort(parent=stc.project, name="Port 1")
+        stream_block = port.create_stream_blocks(1, name="SB 1")[0]
+        assert stream_block.get_attribute("Load") == "10"
+        stc.api.config(stream_block.ref, Load=20)
+        assert stream_block.get_attribute("Load") == "20"
+        with stc.project.batch(apply_=False):
+            stc.api.config(stream_block.ref, Load=30)
+            assert stream_block.get_attribute("Load") == "30"
+
+        stc.project.start_ports(False, port)
+        stats = StcStats("generatorportresults")
+        stream_block.get_attribute("Load")
+        hits = cache.hits
+        frame_counts = [stats.read_stats()["Port 1"]["GeneratorFrameCount"] for _ in range(3)]
+        assert stream_block.get_attribute("Load") == "30"
+        assert cache.hits == hits + 1
+        assert frame_counts[0] < frame_counts[1] < frame_counts[2]
+
+        results = stats.rds.get_attribute("ResultHandleList").split()[0]
+        assert cache.is_volatile("GeneratorFrameCount", results)
+        assert cache.is_volatile("Name", stats.rds.ref)
+        assert not cache.is_volatile("Load", stream_block.ref)
+        assert all(ref not in (results, stats.rds.ref) for ref, _ in list(cache._entries))  # pylint: disable=protected-access
+    finally:
+        StcObject.attribute_cache = None
+
+
+def test_traffic(stc: StcApp) -> None:
+    """Link state and generator state."""
+    ports = [StcPort(parent=stc.project, name=f"Port {index}") for index in (1, 2)]
+    for port in ports:
+        port.reserve(f"10.0.0.1/1/{port.ref[-1]}", wait_for_up=True, timeout=1)
+        assert port.is_online()
+
+    stc.project.start_ports(False, ports[0])
+    assert ports[0].is_running()
+    assert not ports[1].is_running()
+    stc.project.stop_ports()
+    assert not ports[0].is_running()
+
+    ports[1].generator.get_child("GeneratorConfig").set_attributes(DurationMode="SECONDS", Duration=0.1)
+    stc.project.start_ports(False, ports[1])
+    assert ports[1].is_running()
+    time.sleep(0.1)
+    assert not ports[1].is_running()
+
+
+def test_wait_traffic(stc: StcApp) -> None:
+    """Traffic wait returns when the last port stops, on STC or by polling generators states."""
+    ports = [StcPort(parent=stc.project, name=f"Port {index}") for index in (1, 2, 3)]
+    for duration, port in zip((0.1, 0.2, 0.3), ports):
+        port.generator.get_child("GeneratorConfig").set_attributes(DurationMode="SECONDS", Duration=duration)
+
+    stc.project.start_ports()
+    assert 0.3 <= stc.project.wait_traffic() < 1
+    assert stc.api.commands["generatorwaitforstop"] == 1
+    assert not any(port.is_running() for port in ports)
+
+    stc.project.start_ports()
+    assert 0.3 <= stc.project.wait_traffic(server_wait=False, max_interval=0.05) < 1
+    assert stc.api.commands["generatorwaitforstop"] == 1
+
+    ports[0].generator.get_child("GeneratorConfig").set_attributes(DurationMode="CONTINUOUS")
+    stc.project.start_ports(False, ports[0])
+    with pytest.raises(TgnError):
+        stc.project.wait_traffic(ports[0], timeout=0.1, server_wait=False)
+
+
+def test_wait_traffic_errors(stc: StcApp, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Traffic wait polls when the server wait is unsupported, waits again after timeout and raises other errors."""
+    port = StcPort(parent=stc.project, name="Port 1")
+    port.generator.get_child("GeneratorConfig").set_attributes(DurationMode="SECONDS", Duration=0.2)
+    perform = stc.api.perform
+    errors = []
+
+    def failing_perform(command: str, **arguments: object) -> dict:
+        if command == "GeneratorWaitForStop" and errors:
+            stc.api.commands["generatorwaitforstop"] += 1
+            raise errors.pop(0)
+        return perform(command, **arguments)
+
+    monkeypatch.setattr(stc.api, "perform", failing_perform)
+
+    errors.append(TgnError("invalid command GeneratorWaitForStop"))
+    stc.project.start_ports()
+    assert 0.15 <= stc.project.wait_traffic() < 1
+    assert stc.api.commands["generatorwaitforstop"] == 1
+
+    errors.append(TgnError("GeneratorWaitForStop timed out"))
+    stc.project.start_ports()
+    assert 0.15 <= stc.project.wait_traffic() < 1
+    assert stc.api.commands["generatorwaitforstop"] == 3
+
+    errors.append(TgnError("connection lost"))
+    stc.project.start_ports()
+    with pytest.raises(TgnError, match="connection lost"):
+        stc.project.wait_traffic()
+
+
+def test_settle_policy(stc: StcApp) -> None:
+    """Commands wait for steady state instead of the fixed delay."""
+    stc.project.wait_for_ports = 4
+    port = StcPort(parent=stc.project, name="Port 1")
+    device = stc.project.create_devices(1, port=port)[0]
+    router = StcObject(objType="BgpRouterConfig", parent=device)
+
+    stc.project.start_ports()
+    stc.project.stop_ports()
+    stc.project.command_devices("DeviceStart", 4, device)
+    statistics = stc.project.settle_policy.statistics()
+    assert statistics["GeneratorStart"]["settled"] == statistics["GeneratorStop"]["settled"] == 1
+    assert statistics["DeviceStart"]["settled"] == 1
+    assert statistics["GeneratorStart"]["max_time"] < 1
+
+    router.set_attributes(RouterState="PENDING_START")
+    timing = stc.project.settle_policy.settle("DeviceStart", [device], 0.2)
+    assert not timing.settled
+    assert 0.1 < timing.waited < 1
+
+    # Emulations that are not in the objects tree (e.g. after load_config) are read with the devices children.
+    del device.objects[router.ref]
+    assert not stc.project.settle_policy.settle("DeviceStart", [device], 0.2).settled
+    router.set_attributes(RouterState="UP")
+    timing = stc.project.settle_policy.settle("DeviceStart", [device], 0.2)
+    assert timing.settled
+    assert timing.waited < 0.1
+
+    # Generator that is still STOPPED right after GeneratorStart is not started.
+    assert not stc.project.settle_policy.settle("GeneratorStart", [port.generator], 0.2).settled
+
+    # Emulations settle in the target state of the command, intermediate states are not settled.
+    client = StcObject(objType="Dhcpv4BlockConfig", parent=device)
+    client.set_attributes(BlockState="REQUESTING")
+    assert not stc.project.settle_policy.settle("Dhcpv4Bind", [client], 0.1).settled
+    stc.project.command_emulations("Dhcpv4Bind", 4, client)
+    assert stc.project.settle_policy.timings[-1].settled
+    assert client.get_attribute("BlockState") == "BOUND"
+    stc.project.command_devices("DeviceStop", 4, device)
+    assert stc.project.settle_policy.timings[-1].settled
+    assert client.get_attribute("BlockState") == "IDLE"
+    assert router.get_attribute("RouterState") == "IDLE"
+    # Commands without target state wait the fixed delay.
+    timing = stc.project.settle_policy.settle("Dhcpv4Abort", [client], 0.1)
+    assert not timing.settled
+    assert timing.waited >= 0.1
+
+    stc.project.settle_policy = StcSettlePolicy(adaptive=False, delays={"GeneratorStart": 0.1})
+    stc.project.start_ports()
+    assert stc.project.settle_policy.timings[-1].waited >= 0.1
+
+
+def test_reserve_ports(stc: StcApp) -> None:
+    """All ports are attached with one command and their link states are read together."""
+    stc.api.link_up_delay = 0.2
+    ports = [StcPort(parent=stc.project, name=f"Port {index}") for index in range(1, 9)]
+    reservations = stc.project.reserve_ports([f"10.0.0.1/1/{index}" for index in range(1, 9)], poll_interval=0.05)
+    assert stc.api.commands["attachports"] == 1
+    assert all(port.is_online() for port in ports)
+    assert reservations["Port 8"].location == "10.0.0.1/1/8"
+    assert all(reservation.up >= 0.2 for reservation in reservations.values())
+
+    stc.api.link_up_delay = 10
+    stc.project.reserve_ports({"Port 1": "10.0.0.1/1/1"}, wait_for_up=False)
+    with pytest.raises(TgnError):
+        stc.project.reserve_ports({"Port 1": "10.0.0.1/1/1"}, timeout=0.1, poll_interval=0.05)
+    assert stc.project.reservations["Port 1"].link_status == "DOWN"
+
+
+def test_stats(stc: StcApp) -> None:
+    """ResultDataSets with synthetic counters and multiple pages."""
+    ports = [StcPort(parent=stc.project, name=f"Port {index}") for index in (1, 2)]
+    stream_blocks = ports[0].create_stream_blocks(300, name="SB {index}")
+    stc.project.start_ports(False, ports[0])
+
+    port_stats = StcStats("generatorportresults")
+    statistics = port_stats.read_stats()
+    assert statistics["Port 1"]["GeneratorFrameCount"] > 0
+    assert statistics["Port 2"]["GeneratorFrameCount"] == 0
+    assert port_stats.read_stats()["Port 1"]["GeneratorFrameCount"] > statistics["Port 1"]["GeneratorFrameCount"]
+
+    stream_stats = StcStats("txstreamresults", counters=["FrameCount"])
+    instrumentation = StcApiInstrumentation(stc.api, callers=False)
+    snapshot = stream_stats.read_snapshot()
+    assert len(snapshot) == 300
+    assert len(stream_stats.pager.timings) == 2
+    assert len(stream_stats.read_snapshot()) == 300
+    # One apply per read, page requests are not applied.
+    assert sum(row["count"] for row in instrumentation.statistics() if row["method"] == "apply") == 2
+    assert int(snapshot["FrameCount"].min()) > 0
+    assert set(stc.project.ports["Port 1"].get_objects_by_type("StreamBlock")) == set(stream_blocks)
+
+    port_stats.unsubscribe()
+    assert stc.api.commands["resultdatasetunsubscribe"] == 1
+
+
+def test_stats_release(stc: StcApp, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Subscriptions are not released at exit, after disconnect or without project API."""
+    StcPort(parent=stc.project, name="Port 1")
+    stats = StcStats("generatorportresults")
+    assert not stats._release.atexit
+    stc.disconnect()
+    stats.unsubscribe()
+    assert stc.api.commands["resultdatasetunsubscribe"] == 0
+
+    stats = StcStats("generatorportresults")
+    monkeypatch.setattr(StcObject, "project", None)
+    stats.unsubscribe()
+    assert not StcStats.subscriptions
+    assert stc.api.commands["resultdatasetunsubscribe"] == 0
+
+
+def test_stats_schema(stc: StcApp) -> None:
+    """Null values do not promote columns, schemas are per subscription."""
+    port = StcPort(parent=stc.project, name="Port 1")
+    stats = StcStats("generatorportresults")
+    schema = stats.schema
+    schema.learn({"FrameCount": ["", "N/A"]})
+    assert "FrameCount" not in schema.column_types
+
+    table = {
+        "topLevelName": ["Port 1", "Port 1"],
+        "FrameCount": ["10", "N/A"],
+        "Time": ["2024-01-01T02:00:00+02:00", ""],
+        "Rate": ["", "1.5"],
+    }
+    snapshot = StcStatsSnapshot.from_table(table, schema=schema)
+    assert schema.column_types["FrameCount"] == INT64
+    assert schema.column_types["Time"] == TIMESTAMP
+    assert snapshot.objects == [port, port]
+    assert snapshot["FrameCount"].dtype.kind == "i"
+    assert snapshot["FrameCount"].mask.tolist() == [False, True]
+    assert str(snapshot["Time"][0]) == "2024-01-01T00:00:00.000000"
+    assert str(snapshot["Time"][1]) == "NaT"
+    assert str(snapshot["Rate"][0]) == "nan"
+    assert schema.parse_table(table)["FrameCount"] == [10, None]
+
+    assert StcStats("generatorportresults").schema is schema
+    StcStats.subscriptions.clear()
+    assert StcStats("generatorportresults").schema is not schema
+
+
+def test_stats_poller(stc: StcApp, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Deltas and rates between polls, null counters are not reported as changed."""
+    ports = [StcPort(parent=stc.project, name=f"Port {index}") for index in (1, 2)]
+    stc.project.start_ports(False, ports[0])
+    stats = StcStats("generatorportresults")
+    read_table = stats.read_table
+    nulls = iter([["1", "1"], ["N/A", "N/A"], ["N/A", "N/A"]])
+
+    def read_table_with_nulls() -> dict:
+        table = read_table()
+        table["Errors"] = next(nulls)
+        table["Latency"] = [value if value == "N/A" else "1.5" for value in table["Errors"]]
+        return table
+
+    monkeypatch.setattr(stats, "read_table", read_table_with_nulls)
+    poller = StcStatsPoller(stats)
+    delta = poller.poll()
+    assert delta.interval is None
+    assert delta.changed["Port 2"]["GeneratorFrameCount"] == 0
+    assert not delta.rates
+
+    time.sleep(0.01)
+    for _ in range(2):
+        delta = poller.poll()
+        assert delta.interval > 0
+        assert set(delta.changed) == {"Port 1"}
+        assert delta.changed["Port 1"]["GeneratorFrameCount"] > 0
+        assert "Errors" not in delta.changed["Port 1"]
+        assert "Latency" not in delta.changed["Port 1"]
+        rates = delta.rates["Port 1"]
+        assert rates["GeneratorFrameCount"] == delta.changed["Port 1"]["GeneratorFrameCount"] / delta.interval
+        assert rates["GeneratorBitRate"] == rates["GeneratorOctetCount"] * 8
+
+
+def test_stats_export(stc: StcApp, tmp_path: Path) -> None:
+    """Export snapshots in several chunks while the view schema promotes a column mid-run."""
+    ports = [StcPort(parent=stc.project, name=f"Port {index}") for index in (1, 2)]
+    stc.project.start_ports(False, *ports)
+    stats = StcStats("generatorportresults", counters=["GeneratorFrameCount"])
+    snapshots = [stats.read_snapshot() for _ in range(2)]
+    for value, column_type in (("1.5", FLOAT64), ("bad", STRING)):
+        table = stats.read_table()
+        table["GeneratorFrameCount"][0] = value
+        snapshots.append(StcStatsSnapshot.from_table(table, schema=stats.schema))
+        assert stats.schema.column_types["GeneratorFrameCount"] == column_type
+
+    for fmt in ("arrow", "csv"):
+        with StcStatsExporter(tmp_path / f"stats.{fmt}", chunk_rows=3) as exporter:
+            for snapshot in snapshots:
+                exporter.append(snapshot)
+        assert exporter.rows == 8
+        if fmt == "arrow":
+            table = open_export(exporter.path)
+            assert str(table.schema.field("GeneratorFrameCount").type) == "int64"
+            frame_counts = table.column("GeneratorFrameCount").to_pylist()
+            assert exporter.invalid_values == {"GeneratorFrameCount": 2}
+        else:
+            with open(exporter.path, newline="") as f:
+                frame_counts = [row["GeneratorFrameCount"] for row in csv.DictReader(f)]
+        assert len(frame_counts) == 8
+        assert frame_counts[4] in (None, "1.5")
+        assert frame_counts[6] in (None, "bad")
+        assert all(frame_counts[i] for i in (0, 1, 2, 3, 5, 7))
+
+
+def test_scale(stc: StcApp) -> None:
+    """Large configurations load the package overhead only."""
+    port = StcPort(parent=stc.project, name="Port 1")
+    port.create_stream_blocks(10000)
+    stc.project.objects = {}
+    assert len(stc.project.get_children("port")[0].get_children("streamblock")) == 10000
+
+
+def test_sampler_during_batch(stc: StcApp, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Background sampler reads on its own session, does not flush or join the caller batch and closes its session."""
+    disconnected = []
+    monkeypatch.setattr(StcSimWrapper, "disconnect", lambda api, terminate: disconnected.append((api, terminate)))
+    port = StcPort(parent=stc.project, name="Port 1")
+    stc.project.start_ports(False, port)
+    sampler = StcStatsSampler(StcStats("generatorportresults"), interval=0.02)
+    sampler.start()
+    with stc.project.batch(apply_=False) as batch:
+        port.set_attributes(Name="Port 2")
+        time.sleep(0.2)
+        assert batch.pending == {port.ref: {"Name": "Port 2"}}
+    sampler.stop()
+    assert len(disconnected) == 1
+    assert disconnected[0][0] is not stc.api and disconnected[0][1] is False
+    snapshots = sampler.drain()
+    assert len(snapshots) > 3
+    assert not sampler.errors
+    assert snapshots[-1]["GeneratorFrameCount"][0] > snapshots[0]["GeneratorFrameCount"][0]
+    assert port.get_attribute("Name") == "Port 2"
@@ -0,0 +1,139 @@
+"""
+Tests for Tcl list decoder and Tcl commands pipeline against local stand-in for stc:: Tcl commands.
+"""
+# pylint: disable=redefined-outer-name
+import logging
+import tkinter
+
+import pytest
+from trafficgenerator import TgnError, tgn_tcl
+from trafficgenerator.tgn_tcl import TgnTclWrapper
+
+from testcenter.api.stc_replay import StcApiRecorder, StcTclReplayWrapper
+from testcenter.api.stc_tcl import StcTclWrapper, tcl_list_2_list, tcl_pairs_2_dict
+
+logger = logging.getLogger("tgn.testcenter")
+
+STC_STAND_IN = """
+namespace eval stc {variable objects; array set objects {}}
+proc stc::create {type -under parent args} {
+    set handle [string tolower $type][expr {[array size stc::objects] + 1}]
+    set stc::objects($handle) $args
+    return $handle
+}
+proc stc::config {handle args} {set stc::objects($handle) [concat $stc::objects($handle) $args]}
+proc stc::get {handle args} {
+    if {![info exists stc::objects($handle)]} {error "invalid handle $handle"}
+    if {$args eq ""} {return $stc::objects($handle)}
+    set result {}
+    foreach name $args {
+        set found 0
+        foreach {key value} $stc::objects($handle) {
+            if {[string equal -nocase $key $name]} {set found 1; set found_value $value}
+        }
+        if {!$found} {error "invalid attribute $name"}
+        lappend result $name $found_value
+    }
+    if {[llength $args] == 1} {return [lindex $result 1]}
+    return $result
+}
+proc stc::perform {command args} {return [concat [list -State {Command completed}] $args]}
+proc stc::apply {} {}
+"""
+
+
+class StcTclStandIn(StcTclWrapper):
+    """StcTclWrapper over plain Tcl interpreter with stand-in stc:: commands."""
+
+    def __init__(self) -> None:  # pylint: disable=super-init-not-called
+        TgnTclWrapper.__init__(self, logger, tkinter.Tcl())
+        tgn_tcl.tcl_interp_g = self.tcl_interp
+        self.eval(STC_STAND_IN)
+        self.ver = "5.00"
+        self.command_rc = None
+        self.generation = 0
+        self.batch = None
+
+
+@pytest.fixture
+def api() -> StcTclStandIn:
+    """Yield Tcl wrapper with stand-in stc:: commands."""
+    return StcTclStandIn()
+
+
+@pytest.mark.parametrize(
+    "tcl_list",
+    [
+        "port1 port2 port3",
+        "-name {Port 1} -location //10.0.0.1/1/1",
+        '{a {b c}} "d e" f\\ g {} ""',
+        'a\\tb "\\x41\\u00e9" \\{ {a\\}b}',
+    ],
+)
+def test_tcl_list_2_list(tcl_list: str) -> None:
+    """Pure Python decoder splits lists exactly as Tcl."""
+    assert tcl_list_2_list(tcl_list) == list(tkinter.Tcl().splitlist(tcl_list))
+
+
+def test_tcl_pairs_2_dict() -> None:
+    assert tcl_pairs_2_dict("-name {Port 1} -Active true -empty {}") == {"name": "Port 1", "Active": "true", "empty": ""}
+
+
+def test_get_attributes(api: StcTclStandIn) -> None:
+    """Lists of attributes are read in chunks, single attribute chunks return bare values."""
+    attributes = {f"Attr{index}": f"value {index}" for index in range(17)}
+    obj_ref = api.create("Port", "project1", **attributes)
+    assert api.get(obj_ref, ["attr3"]) == {"attr3": "value 3"}
+    assert api.get(obj_ref, list(attributes)) == attributes
+    assert api.max_get_attributes == 16
+
+
+def test_pipeline(api: StcTclStandIn) -> None:
+    """Queued commands are executed with one evaluation and their results are parsed per command."""
+    with api.pipeline() as pipeline:
+        port = pipeline.create("Port", "project1", Name="Port 1")
+        pipeline.config("port1", Location="//10.0.0.1/1/1")
+        name = pipeline.get("port1", "Name")
+        attributes = pipeline.get("port1")
+        rc = pipeline.perform("AttachPorts", PortList="port1")
+        with pytest.raises(TgnError):
+            _ = port.value
+    assert port.value == "port1"
+    assert name.value == "Port 1"
+    assert attributes.value == {"Name": "Port 1", "Location": "//10.0.0.1/1/1"}
+    assert rc.value["State"] == "Command completed"
+    assert api.command_rc == rc.value
+    assert api.generation == 1
+
+
+def test_pipeline_errors(api: StcTclStandIn) -> None:
+    """Execution stops at the first failed command."""
+    api.max_pipeline_commands = 2
+    pipeline = api.pipeline(raise_errors=False)
+    created = [pipeline.create("Port", "project1") for _ in range(3)]
+    failed = pipeline.get("port9", "Name")
+    skipped = pipeline.apply()
+    pipeline.execute()
+    assert [result.value for result in created] == ["port1", "port2", "port3"]
+    assert failed.error == "invalid handle port9"
+    assert not skipped.executed
+
+    pipeline = api.pipeline()
+    pipeline.get("port9", "Name")
+    with pytest.raises(TgnError):
+        pipeline.execute()
+
+
+def test_record_replay(api: StcTclStandIn) -> None:
+    """Recorded Tcl evaluations are replayed without Tcl interpreter."""
+
+    def session(api: StcTclWrapper) -> list:
+        with api.pipeline() as pipeline:
+            port = pipeline.create("Port", "project1", Name="Port 1")
+        return [port.value, api.get(port.value), api.get_objects([port.value], "Name"), api.get_list(port.value, "Name")]
+
+    recorder = StcApiRecorder(api)
+    recorded = session(api)
+    replay = StcTclReplayWrapper(logger, recorder.stop())
+    assert replay.ver == "5.00"
+    assert session(replay) == recorded